@@ -0,0 +1,425 @@
+"""
+Caching utilities: an in-process TTL/LRU cache and pluggable shared backends
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import json
+import logging
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+# Store a loaded value only if the key's generation hasn't changed since the load began
+SET_IF_GENERATION_SCRIPT = """
+local generation = redis.call('GET', KEYS[2]) or ''
+if generation ~= ARGV[1] then
+    return 0
+end
+if ARGV[3] == '' then
+    redis.call('SET', KEYS[1], ARGV[2])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return 1
+"""
+
+
+class _PendingLoad:
+    """A load in progress that other callers for the same key wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after being set.
+
+    ``get_or_load`` collapses concurrent loads of the same key into a single
+    call of the loader; everyone else waits for and shares its result.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, _PendingLoad] = {}
+        # Bumped on every invalidation so in-flight loads don't store stale values
+        self._version = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "collapsed_loads": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Get a live entry, or ``default`` if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store an entry, evicting the least recently used one if full.
+
+        ``ttl`` overrides the cache-wide TTL for this entry.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def delete(self, key: Hashable):
+        """Invalidate one entry"""
+        with self._lock:
+            self._version += 1
+            self._stats["invalidations"] += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Invalidate every entry"""
+        with self._lock:
+            self._version += 1
+            self._stats["invalidations"] += 1
+            self._data.clear()
+
+    def get_or_load(
+        self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """Get an entry, calling ``loader`` once on a miss.
+
+        Concurrent callers for the same key wait for the first caller's load
+        instead of issuing their own. ``None`` results are not cached.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            pending = self._loading.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._loading[key] = _PendingLoad()
+                version = self._version
+            else:
+                self._stats["collapsed_loads"] += 1
+
+        if not leader:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = loader()
+            return pending.value
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._loading[key]
+                if (
+                    pending.error is None
+                    and pending.value is not None
+                    and version == self._version
+                    and self.maxsize > 0
+                ):
+                    self._set_locked(key, pending.value, ttl)
+            pending.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._data)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["maxsize"] = self.maxsize
+        snapshot["ttl"] = self.ttl
+        snapshot["hit_ratio"] = round(snapshot["hits"] / lookups, 4) if lookups else None
+        return snapshot
+
+
+class CacheBackend(ABC):
+    """Key/value cache shared by the DatabaseAdapter.
+
+    Values must be JSON-serializable. ``delete`` is the write-side hook:
+    besides dropping the keys it tells every other worker to drop them too.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """The cached value, or MISSING"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Cache a value, for ``ttl`` seconds or the backend's default"""
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        """Drop keys here and in every other worker"""
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """Get a value, calling ``loader`` and caching its result on a miss"""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    def close(self):
+        pass
+
+
+class InMemoryCache(CacheBackend):
+    """Per-process LRU cache; invalidations only reach the current worker"""
+
+    def __init__(self, maxsize: int, ttl: float = 60.0):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Any:
+        return self.local.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.local.set(key, value, ttl)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self.local.delete(key)
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        return self.local.get_or_load(key, loader, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self.local.stats()}
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by all workers through a Redis-compatible server.
+
+    Each worker keeps a small near cache in front of Redis. Writes delete the
+    shared key and publish the key names on an invalidation channel; every
+    other worker's listener thread then evicts its near copy, so updates are
+    visible across ``--workers`` without waiting for the near TTL.
+
+    Deletes also bump a per-key generation counter. ``get_or_load`` reads it
+    before calling the loader and stores the result only if it is unchanged,
+    so a delete racing with a load can't leave a stale shared value behind.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        near_maxsize: int,
+        near_ttl: float,
+        prefix: str = "lma:",
+        channel: str = "lma:cache:invalidate",
+        generation_ttl: int = 86400,
+    ):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+
+        self.client = redis.Redis.from_url(url)
+        self.near = TTLCache(maxsize=near_maxsize, ttl=near_ttl)
+        self.prefix = prefix
+        self.channel = channel
+        self.generation_ttl = generation_ttl
+        self.origin = uuid.uuid4().hex
+        self._set_if_generation = self.client.register_script(SET_IF_GENERATION_SCRIPT)
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "errors": 0,
+            "invalidations_received": 0,
+            "stale_fills_skipped": 0,
+        }
+
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: self._on_invalidate})
+        self._listener = self._pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error
+        )
+
+    def _on_invalidate(self, message: Dict[str, Any]):
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if payload.get("origin") == self.origin:
+            return
+        self._stats["invalidations_received"] += 1
+        for key in payload.get("keys", []):
+            self.near.delete(key)
+
+    def _on_listener_error(self, error: Exception, pubsub, thread):
+        # Keep listening; entries missed meanwhile still expire after the near TTL
+        self._stats["errors"] += 1
+        logger.warning("Cache invalidation listener error: %s", error)
+        time.sleep(1.0)
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.prefix}gen:{key}"
+
+    def _get_shared(self, key: str) -> Any:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Cache get error: %s", e)
+            return MISSING
+        if raw is None:
+            self._stats["misses"] += 1
+            return MISSING
+        self._stats["hits"] += 1
+        return json.loads(raw)
+
+    def _get_shared_with_generation(self, key: str):
+        """The shared value (or MISSING) and the key's generation, read together"""
+        try:
+            raw, generation = self.client.mget(self.prefix + key, self._generation_key(key))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Cache get error: %s", e)
+            return MISSING, None
+        if raw is None:
+            self._stats["misses"] += 1
+            return MISSING, generation
+        self._stats["hits"] += 1
+        return json.loads(raw), generation
+
+    def _fill_shared(self, key: str, value: Any, ttl: Optional[float], generation: Optional[bytes]):
+        """Store a loaded value unless the key was deleted since ``generation`` was read"""
+        try:
+            stored = self._set_if_generation(
+                keys=[self.prefix + key, self._generation_key(key)],
+                args=[
+                    generation or b"",
+                    json.dumps(value, default=str),
+                    max(1, int(ttl)) if ttl else "",
+                ],
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Cache set error: %s", e)
+            return
+        if not stored:
+            self._stats["stale_fills_skipped"] += 1
+
+    def _set_shared(self, key: str, value: Any, ttl: Optional[float]):
+        try:
+            self.client.set(
+                self.prefix + key,
+                json.dumps(value, default=str),
+                ex=max(1, int(ttl)) if ttl else None,
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Cache set error: %s", e)
+
+    def get(self, key: str) -> Any:
+        value = self.near.get(key)
+        if value is MISSING:
+            value = self._get_shared(key)
+            if value is not MISSING:
+                self.near.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._set_shared(key, value, ttl)
+        self.near.set(key, value, min(ttl, self.near.ttl) if ttl else None)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self.near.delete(key)
+        try:
+            pipe = self.client.pipeline()
+            pipe.delete(*(self.prefix + key for key in keys))
+            for key in keys:
+                pipe.incr(self._generation_key(key))
+                pipe.expire(self._generation_key(key), self.generation_ttl)
+            pipe.execute()
+            self.client.publish(
+                self.channel, json.dumps({"origin": self.origin, "keys": list(keys)})
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Cache invalidation error: %s", e)
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        def load_shared():
+            value, generation = self._get_shared_with_generation(key)
+            if value is MISSING:
+                value = loader()
+                if value is not None:
+                    self._fill_shared(key, value, ttl, generation)
+            return value
+
+        return self.near.get_or_load(key, load_shared)
+
+    def stats(self) -> Dict[str, Any]:
+        shared = dict(self._stats)
+        lookups = shared["hits"] + shared["misses"]
+        shared["hit_ratio"] = round(shared["hits"] / lookups, 4) if lookups else None
+        return {"backend": "redis", "near": self.near.stats(), "shared": shared}
+
+    def close(self):
+        self._listener.stop()
+        self._listener.join(timeout=2.0)
+        self._pubsub.close()
+        self.client.close()
+
+
+def create_cache_backend() -> CacheBackend:
+    """Build the cache backend selected by CACHE_BACKEND"""
+    backend = settings.CACHE_BACKEND.lower()
+    if backend == "redis":
+        return RedisCache(
+            settings.CACHE_URL,
+            near_maxsize=settings.CACHE_MAX_ENTRIES,
+            near_ttl=settings.CACHE_NEAR_TTL,
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+    return InMemoryCache(maxsize=settings.CACHE_MAX_ENTRIES)
@@ -0,0 +1,195 @@
+"""
+Response compression middleware: brotli (when installed) or gzip above a size threshold
+"""
+from typing import List, Optional, Tuple
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: "br" is only offered when the package is installed
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def available_encodings(preferred: List[str]) -> List[str]:
+    """The configured encodings this process can actually produce, in preference order"""
+    return [e for e in preferred if e == "gzip" or (e == "br" and brotli is not None)]
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """Pick the first of ``encodings`` the client accepts (q > 0), or None"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for one response body"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gzip = None
+        else:
+            self._br = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so streamed chunks reach the client promptly"""
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.finish()
+        return self._gzip.compress(data) + self._gzip.flush()
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """Compress a complete body with ``encoding`` ("br" or "gzip")"""
+    return _Compressor(encoding, gzip_level, brotli_quality).finish(body)
+
+
+def weak_etag(etag: str) -> str:
+    """A compressed body isn't byte-identical to the original, so its ETag is weak"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def _client_holds_weak(if_none_match: str, etag: str) -> bool:
+    """Whether the client validated with the weakened form of ``etag`` only.
+
+    That is the tag this middleware put on a compressed 200, so the 304 must
+    carry it too; a strong tag means the client holds the uncompressed body.
+    """
+    if etag.startswith("W/"):
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return weak_etag(etag) in tags and etag not in tags
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts.
+
+    Bodies smaller than ``minimum_size`` are sent as-is (the framing overhead
+    outweighs the saving), as are responses that already carry a
+    Content-Encoding or aren't text-like. Streaming responses are compressed
+    chunk by chunk. Compressed responses get ``Vary: Accept-Encoding`` and a
+    weak ETag; a 304 keeps the route's ETag unless the client revalidated a
+    compressed 200 (its If-None-Match has only the weak form).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Tuple[str, ...] = ("br", "gzip"),
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.encodings = available_encodings(list(encodings))
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self, encoding, send, scope).run(scope, receive)
+
+
+class _CompressedResponse:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send, scope: Scope):
+        self.middleware = middleware
+        self.if_none_match = Headers(scope=scope).get("if-none-match", "")
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive):
+        await self.middleware.app(scope, receive, self.on_send)
+
+    def _new_compressor(self) -> _Compressor:
+        return _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+
+    def _mark_compressed(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = weak_etag(headers["etag"])
+
+    async def on_send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            if message["status"] == 304:
+                # Echo the ETag of the 200 the client holds: weak only if that one was compressed
+                if "etag" in headers and _client_holds_weak(self.if_none_match, headers["etag"]):
+                    MutableHeaders(scope=message)["ETag"] = weak_etag(headers["etag"])
+                self.passthrough = True
+            elif not _compressible(headers):
+                self.passthrough = True
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            headers = MutableHeaders(scope=self.start)
+            if not more_body:
+                if len(body) < self.middleware.minimum_size:
+                    self.passthrough = True
+                    await self.send(self.start)
+                    await self.send(message)
+                    return
+                body = compress(body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+                self._mark_compressed(headers)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            # Streaming: length is unknown until the end
+            self.compressor = self._new_compressor()
+            self._mark_compressed(headers)
+            if "content-length" in headers:
+                del headers["content-length"]
+            await self.send(self.start)
+
+        chunk = self.compressor.compress(body) if more_body else self.compressor.finish(body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -15,15 +15,93 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_ROLE_KEY: str = ""
     
+    # SQLite (used when running in "sqlite" mode)
+    SQLITE_DB_PATH: str = ""  # Defaults to backend/local.db
+    SQLITE_POOL_SIZE: int = 5  # Number of reader connections
+    SQLITE_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    
+    # SQLite pragma profile, applied to every connection at connect time
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -65536  # Negative values are KiB (64 MiB)
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Group commit: concurrent writes share one transaction, committed after the
+    # window (from the group's first write) or once MAX_OPS writes have joined; 0 disables
+    SQLITE_GROUP_COMMIT_WINDOW_MS: float = 0.0
+    SQLITE_GROUP_COMMIT_MAX_OPS: int = 32
+    
+    # Write-behind for progress-only goal/user updates: coalesced in memory and
+    # written every interval seconds (and on shutdown); 0 writes them immediately
+    PROGRESS_FLUSH_INTERVAL: float = 0.0
+    PROGRESS_BUFFER_MAX_ENTRIES: int = 10000  # Pending goals + users before an early flush
+    
+    # Delta sync change log: rows older than the retention are pruned every interval;
+    # clients with a cursor from before the pruned rows get a full resync. 0 keeps everything
+    CHANGE_LOG_RETENTION_DAYS: float = 30.0
+    CHANGE_LOG_PRUNE_INTERVAL: float = 3600.0
+    
+    # WAL checkpointing
+    SQLITE_CHECKPOINT_INTERVAL: float = 30.0  # Seconds between checkpoints, 0 disables
+    SQLITE_WAL_SIZE_LIMIT: int = 67108864  # Truncate the -wal file above 64 MiB
+    
     # JWT
     JWT_SECRET_KEY: str = "dev-secret-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24
+    TOKEN_CACHE_SIZE: int = 4096  # Verified tokens cached per worker, 0 disables
+    TOKEN_CACHE_TTL: float = 300.0  # Seconds, never beyond the token's own exp
+    
+    # Password hashing (bcrypt runs on a bounded worker pool)
+    BCRYPT_ROUNDS: int = 12  # Stored hashes with a different cost are rehashed on login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Queued operations before returning 429
+    
+    # Caching: "memory" (per worker) or "redis" (shared across workers)
+    CACHE_BACKEND: str = "memory"
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 4096  # Per-worker entries (near cache for redis), 0 disables
+    CACHE_NEAR_TTL: float = 5.0  # Seconds a redis-backed entry is kept in the worker
+    USER_CACHE_TTL: float = 60.0  # Seconds before a cached profile is reloaded
+    GOALS_CACHE_TTL: float = 60.0
+    COURSE_CATALOG_REFRESH_INTERVAL: float = 300.0  # Seconds between catalog reloads, 0 disables
+    COURSE_CATALOG_VERSION_CHECK_INTERVAL: float = 1.0  # Seconds between catalog version stamp checks, 0 disables
     
     # API
     API_V1_PREFIX: str = "/api/v1"
+    DEFAULT_PAGE_SIZE: int = 50  # Page size when a list endpoint gets after/fields without limit
+    MAX_PAGE_SIZE: int = 500
+    GOAL_BATCH_MAX_OPS: int = 500  # Ops accepted by one POST /goals/batch
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
+    # Response compression, in preference order ("br" needs the brotli package); empty disables
+    COMPRESSION_ENCODINGS: str = "br,gzip"
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Bytes; smaller bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher is smaller but much slower
+    
+    # Slow-query log (SQLite): statements at or above the threshold are logged
+    # with their parameter shape and EXPLAIN QUERY PLAN; 0 disables
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_EXPLAIN: bool = True
+    
+    # Per-request profiling: send "X-Profile: 1" (or PROFILING_TOKEN, if set) to get
+    # the request's profile instead of its response. Never enabled in production
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""
+    PROFILING_DIR: str = ""  # Also save each profile here when set
+    
+    # Metrics (GET /metrics). Off by default: they expose routes, traffic and pool
+    # internals. With METRICS_TOKEN set, scrapes must send "Authorization: Bearer <token>".
+    # With several --workers, set METRICS_DIR to a directory shared by them so each
+    # scrape aggregates every worker
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""
+    METRICS_DIR: str = ""
+    METRICS_FLUSH_INTERVAL: float = 5.0  # Seconds between per-worker snapshot writes
+    
     # Railway
     RAILWAY_ENVIRONMENT: str = "production"
     PORT: int = 8000
@@ -36,6 +114,11 @@ class Settings(BaseSettings):
         """Convert CORS origins string to list"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    @property
+    def compression_encodings_list(self) -> List[str]:
+        """Convert compression encodings string to list"""
+        return [e.strip().lower() for e in self.COMPRESSION_ENCODINGS.split(",") if e.strip()]
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -3,7 +3,7 @@ Dependency injection for authentication and database access
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.database.database_adapter import db
+from app.database.async_adapter import async_db
 from app.core.security import decode_access_token
 from app.database.supabase_client import get_supabase_client
 
@@ -12,7 +12,12 @@ security = HTTPBearer(auto_error=False)
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
-    """Get current authenticated user from JWT token"""
+    """Get current authenticated user from JWT token.
+
+    JSON columns come back as pre-encoded fragments (see
+    ``DatabaseAdapter.get_user_by_id``): return the profile through an
+    ``ORJSONResponse`` rather than reading nested values from it.
+    """
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,7 +44,7 @@ async def get_current_user(
     
     # Get user from database adapter
     try:
-        user = db.get_user_by_id(user_id)
+        user = await async_db.get_user_by_id(user_id, raw_json=True)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,432 @@
+"""
+Prometheus-style metrics: lock-free per-thread recording, aggregation across
+worker processes and text exposition for ``GET /metrics``
+"""
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import functools
+import glob
+import inspect
+import logging
+import os
+import threading
+import time
+
+import orjson
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BCRYPT_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+Sample = Tuple[str, str, float]  # (metric name, rendered labels, value)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def labels(**values: Any) -> str:
+    """Render label pairs as used in the exposition format"""
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in values.items())
+
+
+class _Shard:
+    """One thread's recorded values; only that thread ever writes to it"""
+
+    __slots__ = ("values", "histograms")
+
+    def __init__(self):
+        self.values: Dict[Tuple[str, str], float] = {}
+        self.histograms: Dict[Tuple[str, str], List[float]] = {}
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms recorded without locks.
+
+    Each thread records into its own shard, so the hot path is a thread-local
+    lookup and a dict update; shards are summed only when metrics are read.
+    Gauges recorded with ``inc`` are sums of +/- deltas. Collectors supply
+    values that other components already count (pool, cache and hashing
+    stats) at read time.
+
+    With several ``--workers``, each worker writes its snapshot to a file in
+    a shared directory every ``interval`` seconds; ``exposition`` merges the
+    live files of every worker. Gauges describing shared state (e.g. the WAL
+    size) are merged with ``max`` rather than summed.
+    """
+
+    def __init__(self):
+        # name -> (type, help, buckets, merge)
+        self._meta: Dict[str, Tuple[str, str, Tuple[float, ...], str]] = {}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+        self._collectors: List[Callable[[], List[Sample]]] = []
+        self._directory = ""
+        self._interval = 5.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # Definitions
+    def counter(self, name: str, help: str):
+        self._meta[name] = ("counter", help, (), "sum")
+
+    def gauge(self, name: str, help: str, merge: str = "sum"):
+        self._meta[name] = ("gauge", help, (), merge)
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self._meta[name] = ("histogram", help, tuple(buckets), "sum")
+
+    def add_collector(self, collector: Callable[[], List[Sample]]):
+        """Register a callable returning samples for already-counted values"""
+        self._collectors.append(collector)
+
+    # Recording
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def inc(self, name: str, label_values: str = "", amount: float = 1.0):
+        """Add ``amount`` to a counter (or a gauge, with negative amounts)"""
+        values = self._shard().values
+        key = (name, label_values)
+        values[key] = values.get(key, 0.0) + amount
+
+    def observe(self, name: str, label_values: str, value: float):
+        """Record one observation in a histogram"""
+        histograms = self._shard().histograms
+        key = (name, label_values)
+        counts = histograms.get(key)
+        buckets = self._meta[name][2]
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the sum
+            counts = histograms[key] = [0.0] * (len(buckets) + 2)
+        counts[bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    # Reading
+    def snapshot(self) -> Dict[str, Any]:
+        """This worker's values: summed shards plus collector samples"""
+        values: Dict[str, float] = {}
+        histograms: Dict[str, List[float]] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for (name, label_values), value in dict(shard.values).items():
+                key = f"{name}\t{label_values}"
+                values[key] = values.get(key, 0.0) + value
+            for (name, label_values), counts in dict(shard.histograms).items():
+                key = f"{name}\t{label_values}"
+                merged = histograms.get(key)
+                histograms[key] = list(counts) if merged is None else [a + b for a, b in zip(merged, counts)]
+        for collector in self._collectors:
+            try:
+                for name, label_values, value in collector():
+                    key = f"{name}\t{label_values}"
+                    values[key] = values.get(key, 0.0) + value
+            except Exception as e:
+                logger.exception("Metrics collector error: %s", e)
+        return {"values": values, "histograms": histograms}
+
+    def _merge(self, snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        values: Dict[str, float] = {}
+        histograms: Dict[str, List[float]] = {}
+        for snapshot in snapshots:
+            for key, value in snapshot["values"].items():
+                merge = self._meta.get(key.split("\t", 1)[0], ("", "", (), "sum"))[3]
+                if key not in values:
+                    values[key] = value
+                elif merge == "max":
+                    values[key] = max(values[key], value)
+                else:
+                    values[key] += value
+            for key, counts in snapshot["histograms"].items():
+                merged = histograms.get(key)
+                histograms[key] = list(counts) if merged is None else [a + b for a, b in zip(merged, counts)]
+        return {"values": values, "histograms": histograms, "workers": len(snapshots)}
+
+    def _path(self) -> str:
+        return os.path.join(self._directory, f"metrics-{os.getpid()}.json")
+
+    def write_snapshot(self) -> Dict[str, Any]:
+        """Publish this worker's snapshot to the shared directory and return it"""
+        snapshot = self.snapshot()
+        if self._directory:
+            path = self._path()
+            with open(path + ".tmp", "wb") as f:
+                f.write(orjson.dumps(snapshot))
+            os.replace(path + ".tmp", path)
+        return snapshot
+
+    def collect(self) -> Dict[str, Any]:
+        """Merged snapshot of every live worker (just this one without a directory)"""
+        snapshots = [self.write_snapshot()]
+        if self._directory:
+            own = self._path()
+            stale_before = time.time() - max(30.0, 3 * self._interval)
+            for path in glob.glob(os.path.join(self._directory, "metrics-*.json")):
+                try:
+                    if path == own or os.path.getmtime(path) < stale_before:
+                        continue
+                    with open(path, "rb") as f:
+                        snapshots.append(orjson.loads(f.read()))
+                except (OSError, orjson.JSONDecodeError):
+                    # The worker exited or is mid-write; it'll be back next scrape
+                    continue
+        return self._merge(snapshots)
+
+    def exposition(self) -> str:
+        """Render the merged metrics in the Prometheus text format"""
+        merged = self.collect()
+        by_name: Dict[str, List[Tuple[str, Any]]] = {}
+        for key, value in merged["values"].items():
+            name, label_values = key.split("\t", 1)
+            by_name.setdefault(name, []).append((label_values, value))
+        for key, counts in merged["histograms"].items():
+            name, label_values = key.split("\t", 1)
+            by_name.setdefault(name, []).append((label_values, counts))
+        by_name["metrics_workers"] = [("", merged["workers"])]
+        by_name.update(_derived(by_name))
+
+        lines = []
+        for name in sorted(by_name):
+            kind, help, buckets, _ = self._meta.get(name, ("untyped", "", (), "sum"))
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label_values, value in sorted(by_name[name], key=lambda item: item[0]):
+                if kind != "histogram":
+                    suffix = f"{{{label_values}}}" if label_values else ""
+                    lines.append(f"{name}{suffix} {_number(value)}")
+                    continue
+                sep = "," if label_values else ""
+                cumulative = 0.0
+                for bound, count in zip(buckets + (float("inf"),), value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{name}_bucket{{{label_values}{sep}le="{le}"}} {_number(cumulative)}')
+                suffix = f"{{{label_values}}}" if label_values else ""
+                lines.append(f"{name}_sum{suffix} {_number(value[-1])}")
+                lines.append(f"{name}_count{suffix} {_number(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+    # Worker snapshot publishing
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                logger.error("Metrics snapshot error: %s", e)
+
+    def start(self, directory: str, interval: float):
+        """Publish snapshots to ``directory`` for multi-worker aggregation (no-op without one)"""
+        self._directory = directory
+        self._interval = interval
+        if not directory or (self._thread and self._thread.is_alive()):
+            return
+        os.makedirs(directory, exist_ok=True)
+        self.write_snapshot()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop publishing and remove this worker's snapshot file"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._directory:
+            try:
+                os.remove(self._path())
+            except OSError:
+                pass
+
+
+metrics = MetricsRegistry()
+
+metrics.counter("http_requests_total", "HTTP requests by method, route template and status")
+metrics.histogram("http_request_duration_seconds", "HTTP request latency by method and route template")
+metrics.gauge("http_requests_in_flight", "HTTP requests currently being served")
+metrics.histogram("db_query_duration_seconds", "Database adapter call latency by method and backend")
+metrics.counter("db_query_errors_total", "Database adapter calls that raised, by method and backend")
+metrics.histogram("password_hash_duration_seconds", "bcrypt hash/verify time by operation", BCRYPT_BUCKETS)
+metrics.histogram("password_hash_queue_wait_seconds", "Time bcrypt operations waited for a worker")
+metrics.counter("password_hash_rejected_total", "bcrypt operations rejected because the queue was full")
+metrics.gauge("password_hash_in_flight", "bcrypt operations running or queued")
+metrics.counter("cache_lookups_total", "Cache lookups by cache and result (hit/miss)")
+metrics.gauge("cache_entries", "Entries currently held by each cache")
+metrics.gauge("cache_hit_ratio", "Hits / lookups for each cache, across all workers")
+metrics.gauge("sqlite_pool_connections", "SQLite connections by lane and state")
+metrics.counter("sqlite_pool_checkouts_total", "SQLite connection checkouts by lane")
+metrics.counter("sqlite_pool_waits_total", "SQLite checkouts that had to wait, by lane")
+metrics.counter("sqlite_pool_wait_seconds_total", "Time spent waiting for SQLite connections, by lane")
+metrics.counter("sqlite_pool_timeouts_total", "SQLite checkouts that timed out")
+metrics.counter("sqlite_group_commits_total", "Group-commit transactions committed")
+metrics.counter("sqlite_group_commit_writes_total", "Writes committed by group commits")
+metrics.counter("progress_updates_total", "Progress-only updates taken by the write-behind buffer")
+metrics.counter("progress_rows_written_total", "Rows written by progress buffer flushes")
+metrics.gauge("progress_pending", "Progress updates waiting to be written, by entity")
+metrics.gauge("sqlite_wal_size_bytes", "Size of the SQLite -wal file", merge="max")
+metrics.counter("sqlite_slow_queries_total", "SQLite statements logged by the slow-query log")
+metrics.gauge("metrics_workers", "Worker processes included in this scrape")
+
+
+def _derived(by_name: Dict[str, List[Tuple[str, Any]]]) -> Dict[str, List[Tuple[str, Any]]]:
+    """Values computed from the merged totals (ratios can't be summed per worker)"""
+    lookups: Dict[str, Dict[str, float]] = {}
+    for label_values, value in by_name.get("cache_lookups_total", []):
+        cache, result = label_values.split(",")
+        lookups.setdefault(cache, {})[result] = value
+    ratios = []
+    for cache, counts in lookups.items():
+        total = sum(counts.values())
+        if total:
+            ratios.append((cache, counts.get('result="hit"', 0.0) / total))
+    return {"cache_hit_ratio": ratios} if ratios else {}
+
+
+def _cache_samples(name: str, stats: Dict[str, Any]) -> List[Sample]:
+    return [
+        ("cache_lookups_total", labels(cache=name, result="hit"), stats["hits"]),
+        ("cache_lookups_total", labels(cache=name, result="miss"), stats["misses"]),
+    ] + ([("cache_entries", labels(cache=name), stats["size"])] if "size" in stats else [])
+
+
+def _collect_app_stats() -> List[Sample]:
+    """Pool, WAL, cache and password hashing stats of this worker"""
+    from app.database.database_adapter import db
+    from app.core.security import password_hasher, token_cache
+
+    samples: List[Sample] = []
+    cache = db.cache.stats()
+    if cache.get("backend") == "memory":
+        samples += _cache_samples("db", cache)
+    elif cache.get("backend") == "redis":
+        samples += _cache_samples("db_near", cache["near"]) + _cache_samples("db_shared", cache["shared"])
+    samples += _cache_samples("token", token_cache.stats())
+    samples.append(("password_hash_in_flight", "", password_hasher.stats()["in_flight"]))
+
+    pool = db.pool_stats()
+    if pool:
+        for lane in ("reader", "writer"):
+            samples += [
+                ("sqlite_pool_connections", labels(lane=lane, state="in_use"), pool[f"{lane}_in_use"]),
+                ("sqlite_pool_checkouts_total", labels(lane=lane), pool[f"{lane}_checkouts"]),
+                ("sqlite_pool_waits_total", labels(lane=lane), pool[f"{lane}_waits"]),
+                ("sqlite_pool_wait_seconds_total", labels(lane=lane), pool[f"{lane}_wait_time_ms"] / 1000),
+            ]
+        samples += [
+            ("sqlite_pool_connections", labels(lane="reader", state="open"), pool["readers_open"]),
+            ("sqlite_pool_connections", labels(lane="reader", state="idle"), pool["readers_idle"]),
+            ("sqlite_pool_timeouts_total", "", pool["timeouts"]),
+            ("sqlite_group_commits_total", "", pool["group_commits"]),
+            ("sqlite_group_commit_writes_total", "", pool["group_commit_ops"]),
+        ]
+    if db.checkpointer:
+        samples.append(("sqlite_wal_size_bytes", "", db.checkpointer.wal_size()))
+    if db.use_sqlite:
+        from app.database.slow_queries import slow_query_log
+        samples.append(("sqlite_slow_queries_total", "", slow_query_log.count))
+    if db.progress_buffer.enabled:
+        buffered = db.progress_buffer.stats()
+        samples += [
+            ("progress_updates_total", "", buffered["updates"]),
+            ("progress_rows_written_total", "", buffered["rows_written"]),
+            ("progress_pending", labels(entity="goal"), buffered["pending_goals"]),
+            ("progress_pending", labels(entity="user"), buffered["pending_users"]),
+        ]
+    return samples
+
+
+metrics.add_collector(_collect_app_stats)
+
+
+def observe_queries(exclude: Tuple[str, ...] = ()):
+    """Class decorator timing every public coroutine method into db_query_duration_seconds.
+
+    The backend label comes from the instance's ``use_sqlite``.
+    """
+    def decorate(cls):
+        for name, fn in list(vars(cls).items()):
+            if name.startswith("_") or name in exclude or not inspect.iscoroutinefunction(fn):
+                continue
+            setattr(cls, name, _observed(fn, name))
+        return cls
+    return decorate
+
+
+def _observed(fn: Callable, method: str) -> Callable:
+    label_values = {True: labels(method=method, backend="sqlite"), False: labels(method=method, backend="supabase")}
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        label = label_values[self.use_sqlite]
+        started = time.perf_counter()
+        try:
+            return await fn(self, *args, **kwargs)
+        except Exception:
+            metrics.inc("db_query_errors_total", label)
+            raise
+        finally:
+            metrics.observe("db_query_duration_seconds", label, time.perf_counter() - started)
+    return wrapper
+
+
+class MetricsMiddleware:
+    """Record per-route request counts, latency and in-flight requests.
+
+    Routes are labelled by their path template (``/api/v1/goals/{goal_id}``),
+    not the raw path, so label cardinality stays bounded; requests that match
+    no route are labelled ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # (method, route, status) -> rendered labels for the histogram and the counter
+        self._labels: Dict[Tuple[str, str, int], Tuple[str, str]] = {}
+
+    def _label_values(self, method: str, route: str, status_code: int) -> Tuple[str, str]:
+        key = (method, route, status_code)
+        rendered = self._labels.get(key)
+        if rendered is None:
+            base = labels(method=method, route=route)
+            rendered = self._labels[key] = (base, f'{base},status="{status_code}"')
+        return rendered
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.inc("http_requests_in_flight")
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.inc("http_requests_in_flight", amount=-1)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            by_route, by_status = self._label_values(scope["method"], route, status_code)
+            metrics.observe("http_request_duration_seconds", by_route, elapsed)
+            metrics.inc("http_requests_total", by_status)
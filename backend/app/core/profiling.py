@@ -0,0 +1,120 @@
+"""
+Opt-in per-request profiling for non-production environments
+"""
+from typing import List, Optional, Tuple
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # Optional: falls back to cProfile
+    SamplingProfiler = None
+
+PROFILE_HEADER = "x-profile"
+CPROFILE_TOP = 40
+
+
+class _Profile:
+    """One request's profiler: pyinstrument when installed, otherwise cProfile"""
+
+    def __init__(self):
+        if SamplingProfiler is not None:
+            self._profiler = SamplingProfiler(interval=0.001, async_mode="enabled")
+        else:
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if SamplingProfiler is not None:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> str:
+        """Stop profiling and render a plain-text report"""
+        if SamplingProfiler is not None:
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=True, color=False, show_all=False)
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(CPROFILE_TOP)
+        return out.getvalue()
+
+
+class ProfilerMiddleware:
+    """Profile requests that send ``X-Profile`` and return the report instead.
+
+    The header must be ``1``, or equal ``token`` when one is configured. The
+    handler runs as usual, but its response is replaced by a ``text/plain``
+    profile report; the original status is sent in ``X-Profiled-Status``.
+    Reports are also saved to ``directory`` when set. Only one request is
+    profiled at a time; others are served normally. Profiles cover the event
+    loop thread: time spent in executor threads (SQLite, bcrypt) shows up as
+    the awaits waiting for them.
+    """
+
+    def __init__(self, app: ASGIApp, token: str = "", directory: str = ""):
+        self.app = app
+        self.token = token
+        self.directory = directory
+        self._active = threading.Lock()
+
+    def _requested(self, scope: Scope) -> bool:
+        value = Headers(scope=scope).get(PROFILE_HEADER)
+        if value is None:
+            return False
+        return value == self.token if self.token else value == "1"
+
+    def _save(self, scope: Scope, report: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{slug}.txt")
+        with open(path, "w") as f:
+            f.write(report)
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._requested(scope) or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def capture(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profile = _Profile()
+        started = time.perf_counter()
+        try:
+            profile.start()
+            try:
+                await self.app(scope, receive, capture)
+            finally:
+                report = profile.stop()
+        finally:
+            self._active.release()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        header = f"{scope['method']} {scope['path']} -> {status_code} in {elapsed_ms:.1f}ms\n\n"
+        path = self._save(scope, header + report)
+        body = (header + report).encode("utf-8")
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+            (b"x-profiled-status", str(status_code).encode()),
+        ]
+        if path:
+            headers.append((b"x-profile-file", path.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
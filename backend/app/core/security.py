@@ -1,31 +1,51 @@
 """
 Security utilities for JWT tokens and password hashing
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Dict, Any, Callable
 from jose import JWTError, jwt
+import asyncio
 import bcrypt
+import hashlib
+import threading
+import time
 from app.core.config import settings
+from app.core.cache import TTLCache, MISSING
+from app.core.metrics import labels, metrics
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+# Built on first use of a non-bcrypt hash, then reused
+_legacy_context = None
+
+def _get_legacy_context():
+    """Get the passlib context used for legacy hash formats"""
+    global _legacy_context
+    if _legacy_context is None:
+        from passlib.context import CryptContext
+        _legacy_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _legacy_context
+
+def _is_bcrypt_hash(hashed_password: str) -> bool:
+    return hashed_password.startswith(BCRYPT_PREFIXES)
+
+def _password_bytes(password: str) -> bytes:
+    # Bcrypt has a 72-byte limit, so truncate if necessary
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) > 72:
+        password_bytes = password_bytes[:72]
+    return password_bytes
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     try:
-        # Handle both bcrypt direct format and passlib format
-        password_bytes = plain_password.encode('utf-8')
-        if len(password_bytes) > 72:
-            password_bytes = password_bytes[:72]
-        
-        # Try bcrypt directly first (new format)
-        try:
-            return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
-        except (ValueError, TypeError):
-            # If that fails, try passlib format (for backward compatibility)
-            try:
-                from passlib.context import CryptContext
-                pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-                return pwd_context.verify(plain_password, hashed_password)
-            except Exception:
-                return False
+        if _is_bcrypt_hash(hashed_password):
+            return bcrypt.checkpw(
+                _password_bytes(plain_password), hashed_password.encode('utf-8')
+            )
+        # Anything else goes through passlib (for backward compatibility)
+        return _get_legacy_context().verify(plain_password, hashed_password)
     except Exception as e:
         print(f"Password verification error: {e}")
         return False
@@ -35,15 +55,137 @@ def get_password_hash(password: str) -> str:
     # Ensure password is a string
     if not isinstance(password, str):
         password = str(password)
-    # Bcrypt has a 72-byte limit, so truncate if necessary
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
     # Generate salt and hash
-    salt = bcrypt.gensalt(rounds=12)
-    hashed = bcrypt.hashpw(password_bytes, salt)
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(_password_bytes(password), salt)
     return hashed.decode('utf-8')
 
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Get the bcrypt cost factor of a stored hash (None if not bcrypt)"""
+    if not _is_bcrypt_hash(hashed_password):
+        return None
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash differs from the configured bcrypt cost"""
+    return get_hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class PasswordHasher:
+    """Bounded worker pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL, so a small thread pool keeps ~250ms of CPU per
+    call off the event loop. At most ``workers + max_queue`` operations may be
+    in flight; beyond that callers get PasswordHasherBusy instead of queueing
+    without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _op_stats(self, op: str) -> Dict[str, float]:
+        if op not in self._stats:
+            self._stats[op] = {
+                "calls": 0,
+                "rejected": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "queue_wait_ms": 0.0,
+            }
+        return self._stats[op]
+
+    async def run(self, op: str, fn: Callable, *args):
+        """Run ``fn(*args)`` on the pool, timing queue wait and execution"""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._op_stats(op)["rejected"] += 1
+                metrics.inc("password_hash_rejected_total", labels(op=op))
+                raise PasswordHasherBusy(f"Password {op} queue is full")
+            self._in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+
+        submitted = time.perf_counter()
+        timing = {}
+
+        def timed():
+            timing["started"] = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timing["finished"] = time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, timed)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                if "finished" in timing:
+                    stats = self._op_stats(op)
+                    elapsed_ms = (timing["finished"] - timing["started"]) * 1000
+                    stats["calls"] += 1
+                    stats["total_ms"] += elapsed_ms
+                    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+                    stats["queue_wait_ms"] += (timing["started"] - submitted) * 1000
+            if "finished" in timing:
+                metrics.observe("password_hash_duration_seconds", labels(op=op), timing["finished"] - timing["started"])
+                metrics.observe("password_hash_queue_wait_seconds", labels(op=op), timing["started"] - submitted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-operation timing counters plus current queue depth"""
+        with self._lock:
+            ops = {}
+            for op, stats in self._stats.items():
+                calls = stats["calls"] or 1
+                ops[op] = {
+                    "calls": stats["calls"],
+                    "rejected": stats["rejected"],
+                    "avg_ms": round(stats["total_ms"] / calls, 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                    "avg_queue_wait_ms": round(stats["queue_wait_ms"] / calls, 3),
+                }
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "operations": ops,
+            }
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool (raises PasswordHasherBusy when saturated)"""
+    return await password_hasher.run("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool (raises PasswordHasherBusy when saturated)"""
+    return await password_hasher.run("hash", get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -60,15 +202,34 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     )
     return encoded_jwt
 
+# Verified token payloads keyed by SHA-256 of the token
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token"""
+    """Decode and verify a JWT token.
+
+    Successfully verified payloads are cached until the earlier of the cache
+    TTL and the token's ``exp``, so repeat requests skip signature checks.
+    Invalid tokens are never cached.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = token_cache.get(key)
+    if payload is not MISSING:
+        return dict(payload)
+
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
 
+    ttl = settings.TOKEN_CACHE_TTL
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return dict(payload)
+
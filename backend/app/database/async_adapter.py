@@ -0,0 +1,261 @@
+"""
+Async database adapter so request handlers never block the event loop
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable
+import asyncio
+import functools
+
+from app.core.config import settings
+from app.core.metrics import observe_queries
+from app.database.database_adapter import (
+    COURSE_FIELDS,
+    COURSE_PAGE_KEYS,
+    GOAL_FIELDS,
+    GOAL_PAGE_KEYS,
+    DatabaseAdapter,
+    changed_keys,
+    courses_page_request,
+    db,
+    first_row,
+    goal_request,
+    goals_key,
+    goals_page_request,
+    new_user_row,
+    owned_goal_request,
+    patch_preferences_request,
+    update_user_request,
+    user_goals_request,
+    user_key,
+    user_request,
+)
+from app.database.pagination import keyset_page, select_columns
+
+
+@observe_queries(exclude=("run_blocking", "aclose"))
+class AsyncDatabaseAdapter:
+    """Awaitable counterpart of DatabaseAdapter.
+
+    SQLite calls run the synchronous adapter on a dedicated thread pool sized
+    to the connection pool (readers + the writer, plus a full group of
+    writers when group commit is on), so blocking disk I/O never
+    runs on the event loop. Supabase calls go through PostgREST's httpx-based
+    async client instead of the synchronous supabase-py client. Every public
+    operation is timed into ``db_query_duration_seconds``.
+    """
+
+    def __init__(self, adapter: DatabaseAdapter):
+        self.adapter = adapter
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def use_sqlite(self) -> bool:
+        return self.adapter.use_sqlite
+
+    async def run_blocking(self, fn: Callable, *args, **kwargs):
+        """Run a blocking callable on the database executor"""
+        if self._executor is None:
+            # Writers waiting on a group commit hold a thread each, so leave room for a full group
+            group_writers = settings.SQLITE_GROUP_COMMIT_MAX_OPS if settings.SQLITE_GROUP_COMMIT_WINDOW_MS > 0 else 0
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.SQLITE_POOL_SIZE + 1 + group_writers,
+                thread_name_prefix="db",
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    @property
+    def _client(self):
+        from app.database.supabase_client import get_async_postgrest_client
+        return get_async_postgrest_client()
+
+    def _table(self, name: str):
+        return self._client.table(name)
+
+    async def _cached(self, key: str, load: Callable, ttl: float):
+        """``cache.get_or_load`` with an async loader, awaited on this event loop.
+
+        The cache call runs on the executor (shared backends block), and its
+        loader hands ``load()`` back to the loop, so concurrent misses on a
+        key collapse into one request and a write racing the load can't leave
+        a stale entry behind.
+        """
+        loop = asyncio.get_running_loop()
+        return await self.run_blocking(
+            self.adapter.cache.get_or_load,
+            key,
+            lambda: asyncio.run_coroutine_threadsafe(load(), loop).result(),
+            ttl,
+        )
+
+    async def aclose(self):
+        """Release the executor and async HTTP connections"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if not self.use_sqlite:
+            from app.database.supabase_client import close_async_postgrest_client
+            await close_async_postgrest_client()
+
+    # User operations
+    async def create_user(self, user_id: str, email: str, name: str, password_hash: str) -> Dict[str, Any]:
+        """Create a new user"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.create_user, user_id, email, name, password_hash)
+        return first_row(await self._table("users").insert(new_user_row(user_id, email, name)).execute())
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get user by email"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.get_user_by_email, email)
+        return first_row(await user_request(self._client, "email", email).execute())
+
+    async def get_user_by_id(self, user_id: str, raw_json: bool = False) -> Optional[Dict[str, Any]]:
+        """Get user by ID, served from the cache when possible"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.get_user_by_id, user_id, raw_json)
+        # PostgREST responses arrive parsed, so ``raw_json`` has nothing to skip
+        async def load():
+            return first_row(await user_request(self._client, "id", user_id).execute())
+        user = await self._cached(user_key(user_id), load, settings.USER_CACHE_TTL)
+        return dict(user) if user else None
+
+    async def update_user(
+        self,
+        user_id: str,
+        updates: Dict[str, Any],
+        raw_json: bool = False,
+        preference_keys: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Update user, replacing the ``preference_keys`` top-level preferences in the same write"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.update_user, user_id, updates, raw_json, preference_keys)
+        result = await update_user_request(self._client, user_id, updates, preference_keys).execute()
+        await self.run_blocking(self.adapter.cache.delete, user_key(user_id))
+        return first_row(result)
+
+    async def patch_user_preferences(self, user_id: str, patch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply an RFC 7396 merge patch to a user's preferences inside the database"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.patch_user_preferences, user_id, patch)
+        result = await patch_preferences_request(self._client, user_id, patch).execute()
+        if result.data is None:
+            return None
+        await self.run_blocking(self.adapter.cache.delete, user_key(user_id))
+        return changed_keys(result.data, patch)
+
+    async def get_user_password_hash(self, user_id: str) -> Optional[str]:
+        """Get user password hash (SQLite only)"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.get_user_password_hash, user_id)
+        return None
+
+    async def update_user_password_hash(self, user_id: str, password_hash: str) -> bool:
+        """Replace a user's password hash (SQLite only)"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.update_user_password_hash, user_id, password_hash)
+        return False
+
+    # Goal operations
+    async def get_user_goals(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all goals for a user, served from the cache when possible"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.get_user_goals, user_id)
+        async def load():
+            return (await user_goals_request(self._client, user_id).execute()).data or []
+        return list(await self._cached(goals_key(user_id), load, settings.GOALS_CACHE_TTL))
+
+    async def get_user_goals_page(
+        self,
+        user_id: str,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[str] = None,
+        raw_json: bool = False,
+    ) -> Dict[str, Any]:
+        """Get one page of a user's goals, oldest first, projected to ``fields``"""
+        if self.use_sqlite:
+            return await self.run_blocking(
+                self.adapter.get_user_goals_page, user_id, limit, after, fields, raw_json
+            )
+        columns, requested = select_columns(fields, GOAL_FIELDS, GOAL_PAGE_KEYS)
+        result = await goals_page_request(self._table("goals"), user_id, columns, limit, after).execute()
+        return keyset_page(result.data or [], limit, GOAL_PAGE_KEYS, requested)
+
+    async def create_goal(self, goal: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new goal"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.create_goal, goal)
+        result = await self._table("goals").insert(goal).execute()
+        await self.run_blocking(self.adapter.cache.delete, goals_key(goal["user_id"]))
+        return first_row(result)
+
+    async def get_goal_by_id(self, goal_id: str) -> Optional[Dict[str, Any]]:
+        """Get goal by ID"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.get_goal_by_id, goal_id)
+        return first_row(await goal_request(self._client, goal_id).execute())
+
+    async def update_goal(self, goal_id: str, updates: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Update a goal, returning None if it doesn't exist or isn't ``user_id``'s"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.update_goal, goal_id, updates, user_id)
+        goal = first_row(await owned_goal_request(self._table("goals").update(updates), goal_id, user_id).execute())
+        if goal:
+            await self.run_blocking(self.adapter.cache.delete, goals_key(goal["user_id"]))
+        return goal
+
+    async def delete_goal(self, goal_id: str, user_id: Optional[str] = None) -> bool:
+        """Delete a goal, returning False if it doesn't exist or isn't ``user_id``'s"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.delete_goal, goal_id, user_id)
+        goal = first_row(await owned_goal_request(self._table("goals").delete(), goal_id, user_id).execute())
+        if not goal:
+            return False
+        await self.run_blocking(self.adapter.cache.delete, goals_key(goal["user_id"]))
+        return True
+
+    async def apply_goal_batch(self, user_id: str, ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply mixed goal creates/updates/deletes for one user in bulk"""
+        return await self.run_blocking(self.adapter.apply_goal_batch, user_id, ops)
+
+    # Sync operations
+    async def get_changes(self, user_id: str, since: Optional[str] = None, raw_json: bool = False) -> Dict[str, Any]:
+        """Get what changed for a user since a sync cursor"""
+        return await self.run_blocking(self.adapter.get_changes, user_id, since, raw_json)
+
+    # Course operations
+    async def get_courses_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[str] = None,
+        raw_json: bool = False,
+    ) -> Dict[str, Any]:
+        """Get one page of the course catalog, ordered by id, projected to ``fields``"""
+        if self.use_sqlite:
+            return await self.run_blocking(self.adapter.get_courses_page, limit, after, fields, raw_json)
+        columns, requested = select_columns(fields, COURSE_FIELDS, COURSE_PAGE_KEYS)
+        result = await courses_page_request(self._table("courses"), columns, limit, after).execute()
+        return keyset_page(result.data or [], limit, COURSE_PAGE_KEYS, requested)
+
+    async def search_courses(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        level: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[str] = None,
+        raw_json: bool = False,
+    ) -> Dict[str, Any]:
+        """Search courses with facet counts and cursor pagination"""
+        return await self.run_blocking(
+            self.adapter.search_courses, query, category, level, tag, limit, after, raw_json
+        )
+
+
+# Global async database adapter instance
+async_db = AsyncDatabaseAdapter(db)
@@ -0,0 +1,295 @@
+"""
+Thread-safe SQLite connection pool with a single writer lane and many readers
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional, Tuple
+import queue
+import sqlite3
+import threading
+import time
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the pool timeout"""
+
+
+class _WriteGroup:
+    """Writes sharing one open transaction on the writer connection"""
+
+    def __init__(self):
+        self.opened = time.perf_counter()
+        self.ops = 0
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class SQLiteConnectionPool:
+    """Checkout/return pool of SQLite connections.
+
+    SQLite allows one writer at a time, so all writes go through a single
+    dedicated connection guarded by a lock, while reads are spread across up
+    to ``size`` reader connections. Connections are opened lazily and may be
+    used from any thread, but only by one thread at a time.
+
+    With ``group_commit_window`` > 0 (seconds), writes are group-committed:
+    each ``writer()`` block runs in a savepoint of a transaction shared with
+    the writes that follow it, and the transaction is committed once the
+    window has passed since its first write or ``group_commit_max_ops``
+    blocks have joined. Each block still returns only after that commit, so
+    callers see the same durability as before while paying for one commit
+    (and, with ``synchronous=FULL``, one fsync) per group.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        size: int = 5,
+        timeout: float = 30.0,
+        on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+        factory: type = sqlite3.Connection,
+        group_commit_window: float = 0.0,
+        group_commit_max_ops: int = 32,
+    ):
+        self.database = str(database)
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._on_connect = on_connect
+        self._factory = factory
+        self.group_commit_window = group_commit_window
+        self.group_commit_max_ops = max(1, group_commit_max_ops)
+
+        self._idle_readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers = []
+        self._create_lock = threading.Lock()
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+        self._group: Optional[_WriteGroup] = None
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "reader_checkouts": 0,
+            "reader_waits": 0,
+            "reader_wait_time_ms": 0.0,
+            "reader_in_use": 0,
+            "writer_checkouts": 0,
+            "writer_waits": 0,
+            "writer_wait_time_ms": 0.0,
+            "writer_in_use": 0,
+            "timeouts": 0,
+            "group_commits": 0,
+            "group_commit_ops": 0,
+        }
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a new connection configured like the pooled ones"""
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=256,
+            factory=self._factory,
+        )
+        conn.row_factory = sqlite3.Row
+        if self._on_connect:
+            self._on_connect(conn)
+        return conn
+
+    def _record(self, lane: str, waited: bool, wait_time: float):
+        with self._stats_lock:
+            self._stats[f"{lane}_checkouts"] += 1
+            self._stats[f"{lane}_in_use"] += 1
+            if waited:
+                self._stats[f"{lane}_waits"] += 1
+                self._stats[f"{lane}_wait_time_ms"] += wait_time * 1000
+
+    def _release(self, lane: str):
+        with self._stats_lock:
+            self._stats[f"{lane}_in_use"] -= 1
+
+    def _timed_out(self, lane: str):
+        with self._stats_lock:
+            self._stats["timeouts"] += 1
+        raise PoolTimeoutError(
+            f"Timed out after {self.timeout}s waiting for a {lane} connection"
+        )
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle_readers.get_nowait()
+            self._record("reader", False, 0.0)
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._create_lock:
+            if len(self._all_readers) < self.size:
+                conn = self.connect()
+                self._all_readers.append(conn)
+                self._record("reader", False, 0.0)
+                return conn
+
+        started = time.perf_counter()
+        try:
+            conn = self._idle_readers.get(timeout=self.timeout)
+        except queue.Empty:
+            self._timed_out("reader")
+        self._record("reader", True, time.perf_counter() - started)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Check out a reader connection for the duration of the block"""
+        conn = self._checkout_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._release("reader")
+            self._idle_readers.put(conn)
+
+    def _acquire_writer(self) -> bool:
+        """Take the writer lock, returning whether we had to wait"""
+        if self._writer_lock.acquire(blocking=False):
+            return False
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            self._timed_out("writer")
+        return True
+
+    def _commit_group(self):
+        """Commit the pending write group and wake its callers (writer lock held)"""
+        group, self._group = self._group, None
+        try:
+            self._writer.commit()
+        except BaseException as e:
+            self._writer.rollback()
+            group.error = e
+        finally:
+            with self._stats_lock:
+                self._stats["group_commits"] += 1
+                self._stats["group_commit_ops"] += group.ops
+            group.done.set()
+
+    def _join_group(self) -> Tuple[_WriteGroup, bool]:
+        """The write group for the next block, opening one if needed (writer lock held)"""
+        group = self._group
+        if group is not None and time.perf_counter() - group.opened >= self.group_commit_window:
+            # Overdue (its first writer couldn't get the lock back): commit it now
+            self._commit_group()
+            group = None
+        if group is None:
+            self._writer.execute("BEGIN IMMEDIATE")
+            group = self._group = _WriteGroup()
+            return group, True
+        return group, False
+
+    def _commit_if_open(self, group: _WriteGroup):
+        """Commit ``group`` unless it has been committed already"""
+        self._acquire_writer()
+        try:
+            if self._group is group:
+                self._commit_group()
+        finally:
+            self._writer_lock.release()
+
+    def _await_group(self, group: _WriteGroup, leader: bool):
+        """Block until ``group`` has committed; its first writer commits it after the window.
+
+        If that commit doesn't happen (the first writer timed out waiting for
+        the lock), every waiter tries to commit the group itself each
+        ``timeout`` seconds, so callers never hang on an abandoned group. A
+        timeout doesn't fail the caller: its write is already in the group.
+        """
+        remaining = group.opened + self.group_commit_window - time.perf_counter()
+        if leader and not group.done.wait(max(0.0, remaining)):
+            try:
+                self._commit_if_open(group)
+            except PoolTimeoutError:
+                pass
+        while not group.done.wait(self.timeout):
+            try:
+                self._commit_if_open(group)
+            except PoolTimeoutError:
+                pass
+        if group.error is not None:
+            raise group.error
+
+    @contextmanager
+    def writer(self, grouped: bool = True):
+        """Check out the writer connection; commits on success, rolls back on error.
+
+        In group-commit mode the block's changes are committed together with
+        other writers' (see the class docstring); ``grouped=False`` commits
+        any pending group first and runs the block in its own transaction.
+        """
+        started = time.perf_counter()
+        waited = self._acquire_writer()
+        group = None
+        try:
+            if self._writer is None:
+                self._writer = self.connect()
+            self._record("writer", waited, time.perf_counter() - started if waited else 0.0)
+            try:
+                if self.group_commit_window <= 0 or not grouped:
+                    if self._group is not None:
+                        self._commit_group()
+                    try:
+                        yield self._writer
+                        self._writer.commit()
+                    except BaseException:
+                        self._writer.rollback()
+                        raise
+                else:
+                    group, leader = self._join_group()
+                    self._writer.execute("SAVEPOINT grouped_write")
+                    try:
+                        yield self._writer
+                    except BaseException as e:
+                        if group.ops and self._writer.in_transaction:
+                            self._writer.execute("ROLLBACK TO grouped_write")
+                            self._writer.execute("RELEASE grouped_write")
+                        else:
+                            # Nothing else in the group yet, or SQLite already rolled the
+                            # whole transaction back (SQLITE_FULL, I/O error, interrupt):
+                            # drop it and fail every write in the group
+                            self._writer.rollback()
+                            group.error = e
+                            self._group = None
+                            group.done.set()
+                        raise
+                    self._writer.execute("RELEASE grouped_write")
+                    group.ops += 1
+                    if group.ops >= self.group_commit_max_ops:
+                        self._commit_group()
+            finally:
+                self._release("writer")
+        finally:
+            self._writer_lock.release()
+        if group is not None:
+            self._await_group(group, leader)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage counters"""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot["size"] = self.size
+        snapshot["readers_open"] = len(self._all_readers)
+        snapshot["readers_idle"] = self._idle_readers.qsize()
+        snapshot["reader_wait_time_ms"] = round(snapshot["reader_wait_time_ms"], 3)
+        snapshot["writer_wait_time_ms"] = round(snapshot["writer_wait_time_ms"], 3)
+        return snapshot
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        with self._create_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers = []
+            self._idle_readers = queue.LifoQueue()
+        with self._writer_lock:
+            if self._group is not None:
+                self._commit_group()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
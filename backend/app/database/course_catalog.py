@@ -0,0 +1,199 @@
+"""
+Versioned in-memory snapshot of the course catalog
+"""
+from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import logging
+import threading
+import time
+
+import orjson
+
+from app.core.compression import compress
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _encode(value: Any) -> bytes:
+    return orjson.dumps(value, default=str)
+
+
+class CatalogSnapshot:
+    """An immutable, pre-encoded view of the catalog at one version"""
+
+    def __init__(self, version: int, courses: List[Dict[str, Any]]):
+        self.version = version
+        self.courses = courses
+        self.loaded_at = time.time()
+        self.body = _encode(courses)
+        self.etag = _etag(self.body)
+        # course id -> (course, encoded body, etag)
+        self.by_id = {}
+        for course in courses:
+            body = _encode(course)
+            self.by_id[str(course.get("id"))] = (course, body, _etag(body))
+        self._compressed: Dict[str, bytes] = {}
+
+    def compressed(self, encoding: str) -> bytes:
+        """The full catalog body compressed with ``encoding``, computed once per snapshot"""
+        body = self._compressed.get(encoding)
+        if body is None:
+            body = compress(
+                self.body, encoding, settings.COMPRESSION_GZIP_LEVEL, settings.COMPRESSION_BROTLI_QUALITY
+            )
+            self._compressed[encoding] = body
+        return body
+
+
+class CourseCatalog:
+    """Serves course reads from a snapshot instead of the database.
+
+    The snapshot is loaded on first use, refreshed every ``refresh_interval``
+    seconds by a background thread, and reloaded on the next read after
+    ``invalidate()`` is called on course writes. Writes made by other
+    workers (or a reseed from the CLI) are picked up by the same thread,
+    which reads the database's catalog version stamp (``version_loader``)
+    every ``check_interval`` seconds and reloads when it moved. The version
+    only changes when the catalog content does, so ETags stay stable across
+    refreshes.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], List[Dict[str, Any]]],
+        refresh_interval: float,
+        version_loader: Optional[Callable[[], Any]] = None,
+        check_interval: float = 0.0,
+    ):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.version_loader = version_loader
+        self.check_interval = check_interval if version_loader else 0.0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._source_version: Any = None
+        self._stale = True
+        self._generation = 0  # Bumped by invalidate()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def current(self) -> Optional[CatalogSnapshot]:
+        """The loaded snapshot, or None if it must be (re)loaded first"""
+        return None if self._stale else self._snapshot
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Get the current snapshot, loading it if missing or invalidated"""
+        snapshot = self.current
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh(self) -> CatalogSnapshot:
+        """Reload the catalog, bumping the version only if it changed.
+
+        If the load fails, the previous snapshot is kept (an empty one is
+        returned, but not cached, when there is none) and the next read
+        tries again.
+        """
+        with self._lock:
+            # Taken before loading: a write landing mid-load moves both again
+            generation = self._generation
+            source_version = self._read_version()
+            try:
+                courses = self.loader() or []
+            except Exception as e:
+                logger.error("Course catalog refresh error: %s", e)
+                return self._snapshot or CatalogSnapshot(0, [])
+
+            previous = self._snapshot
+            candidate = CatalogSnapshot((previous.version if previous else 0) + 1, courses)
+            if previous is None or candidate.etag != previous.etag:
+                self._snapshot = candidate
+            self._source_version = source_version
+            if self._generation == generation:
+                self._stale = False
+            return self._snapshot
+
+    def invalidate(self):
+        """Mark the snapshot stale so the next read reloads it"""
+        self._generation += 1
+        self._stale = True
+
+    def _read_version(self) -> Any:
+        if self.version_loader is None:
+            return None
+        try:
+            return self.version_loader()
+        except Exception as e:
+            logger.warning("Course catalog version check error: %s", e)
+            return None
+
+    def source_changed(self) -> bool:
+        """Whether the catalog was written (by any process) since the snapshot was loaded"""
+        version = self._read_version()
+        return version is not None and version != self._source_version
+
+    def _run(self):
+        interval = min(i for i in (self.refresh_interval, self.check_interval) if i > 0)
+        last_refresh = time.monotonic()
+        while not self._stop.wait(interval):
+            due = self.refresh_interval > 0 and time.monotonic() - last_refresh >= self.refresh_interval
+            if due or (self.check_interval > 0 and self._snapshot is not None and self.source_changed()):
+                self.refresh()
+                last_refresh = time.monotonic()
+
+    def start(self):
+        """Start the refresh/version check thread (no-op when both are disabled or it's running)"""
+        if (
+            (self.refresh_interval <= 0 and self.check_interval <= 0)
+            or (self._thread and self._thread.is_alive())
+        ):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="course-catalog-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduled refresh thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "courses": len(snapshot.courses) if snapshot else 0,
+            "etag": snapshot.etag if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "source_version": self._source_version,
+            "stale": self._stale,
+        }
+
+
+def _load_courses() -> List[Dict[str, Any]]:
+    from app.database.database_adapter import db
+    return db.get_courses()
+
+
+def _load_version() -> Optional[int]:
+    from app.database.database_adapter import db
+    return db.get_catalog_version()
+
+
+# Global course catalog instance
+course_catalog = CourseCatalog(
+    loader=_load_courses,
+    refresh_interval=settings.COURSE_CATALOG_REFRESH_INTERVAL,
+    version_loader=_load_version,
+    check_interval=settings.COURSE_CATALOG_VERSION_CHECK_INTERVAL,
+)
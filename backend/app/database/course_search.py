@@ -0,0 +1,234 @@
+"""
+Course search: SQLite FTS5 index, ranked queries and facet counts
+"""
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import re
+import sqlite3
+
+from app.database.pagination import decode_cursor, encode_cursor
+
+FACET_LIMIT = 20
+
+# bm25 column weights, in courses_fts column order: a title hit outranks a tag
+# hit, which outranks category/level/instructor, which outrank the description
+BM25_WEIGHTS = (10.0, 1.0, 2.0, 2.0, 2.0, 5.0)
+
+# External-content FTS5 table over courses, kept in sync by triggers so every
+# course write (including the upsert's DO UPDATE) reindexes the row
+FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(
+        title, description, category, level, instructor, tags,
+        content='courses', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_fts_insert AFTER INSERT ON courses BEGIN
+        INSERT INTO courses_fts(rowid, title, description, category, level, instructor, tags)
+        VALUES (new.rowid, new.title, new.description, new.category, new.level, new.instructor, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_fts_delete AFTER DELETE ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, title, description, category, level, instructor, tags)
+        VALUES ('delete', old.rowid, old.title, old.description, old.category, old.level, old.instructor, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_fts_update AFTER UPDATE ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, title, description, category, level, instructor, tags)
+        VALUES ('delete', old.rowid, old.title, old.description, old.category, old.level, old.instructor, old.tags);
+        INSERT INTO courses_fts(rowid, title, description, category, level, instructor, tags)
+        VALUES (new.rowid, new.title, new.description, new.category, new.level, new.instructor, new.tags);
+    END
+    """,
+]
+
+
+def create_fts_index(cursor: sqlite3.Cursor):
+    """Create the FTS5 index and its triggers, indexing existing courses once"""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'courses_fts'"
+    ).fetchone()
+    for statement in FTS_SCHEMA:
+        cursor.execute(statement)
+    if not exists:
+        cursor.execute("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')")
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """Split free text into search terms, dropping FTS5 operators and punctuation"""
+    return re.findall(r"\w+", query or "")
+
+
+def match_expression(terms: List[str]) -> str:
+    """Build an FTS5 query matching every term as a prefix"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _facets(rows: List[Tuple[str, Any, int]]) -> Dict[str, List[Dict[str, Any]]]:
+    facets = {"category": [], "level": [], "tag": []}
+    for facet, value, count in rows:
+        facets[facet].append({"value": value, "count": count})
+    return facets
+
+
+def search_sqlite(
+    conn: sqlite3.Connection,
+    columns: str,
+    query: Optional[str],
+    category: Optional[str],
+    level: Optional[str],
+    tag: Optional[str],
+    limit: int,
+    after: Optional[str],
+) -> Dict[str, Any]:
+    """Ranked, filtered search over courses.
+
+    Results are ordered by bm25 score (best first) then rowid, and the cursor
+    is that sort key. The score isn't indexed, so every page re-scores the
+    whole match set and keeps the rows past the cursor: each page costs
+    O(matches), not O(limit). The cursor keeps pages stable and spares the
+    row-by-row skipping of OFFSET. Facet counts and the total are computed
+    for the first page only.
+    """
+    terms = search_terms(query)
+    filters, params = [], []
+    if category:
+        filters.append("c.category = ?")
+        params.append(category)
+    if level:
+        filters.append("c.level = ?")
+        params.append(level)
+    if tag:
+        filters.append("EXISTS (SELECT 1 FROM json_each(c.tags) WHERE value = ?)")
+        params.append(tag)
+
+    if terms:
+        params.insert(0, match_expression(terms))
+
+    def matched(score: bool) -> str:
+        if not terms:
+            return f"""
+                SELECT c.rowid AS rid, c.category, c.level, c.tags, 0.0 AS score
+                FROM courses c {"WHERE " + " AND ".join(filters) if filters else ""}
+            """
+        weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+        return f"""
+            SELECT c.rowid AS rid, c.category, c.level, c.tags,
+                   {f"bm25(courses_fts, {weights})" if score else "0.0"} AS score
+            FROM courses_fts JOIN courses c ON c.rowid = courses_fts.rowid
+            WHERE courses_fts MATCH ? {"".join(" AND " + f for f in filters)}
+        """
+
+    page_sql = f"""
+        WITH matched AS ({matched(score=True)})
+        SELECT {", ".join("c." + column.strip() for column in columns.split(","))},
+               m.score AS _score, m.rid AS _rid
+        FROM matched m JOIN courses c ON c.rowid = m.rid
+        {"WHERE m.score > ? OR (m.score = ? AND m.rid > ?)" if after else ""}
+        ORDER BY m.score, m.rid
+        LIMIT ?
+    """
+    page_params = list(params)
+    if after:
+        score, rid = decode_cursor(after, 2)
+        page_params += [score, score, rid]
+    rows = conn.execute(page_sql, page_params + [limit + 1]).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["_score"], rows[-1]["_rid"]])
+
+    total, facets = None, None
+    if not after:
+        # One pass over the unranked match set yields the total and every facet
+        facet_rows = conn.execute(
+            f"""
+            WITH matched AS MATERIALIZED ({matched(score=False)})
+            SELECT 'total', NULL, COUNT(*) FROM matched
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'category', category, COUNT(*) FROM matched
+                WHERE category IS NOT NULL GROUP BY category
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'level', level, COUNT(*) FROM matched
+                WHERE level IS NOT NULL GROUP BY level
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'tag', j.value, COUNT(*) AS n FROM matched, json_each(matched.tags) j
+                GROUP BY j.value ORDER BY n DESC, j.value LIMIT {FACET_LIMIT}
+            )
+            """,
+            params,
+        ).fetchall()
+        total = facet_rows[0][2]
+        facets = _facets(facet_rows[1:])
+
+    return {
+        "results": [{k: row[k] for k in row.keys() if k not in ("_score", "_rid")} for row in rows],
+        "next_cursor": next_cursor,
+        "total": total,
+        "facets": facets,
+    }
+
+
+def search_supabase(
+    client,
+    query: Optional[str],
+    category: Optional[str],
+    level: Optional[str],
+    tag: Optional[str],
+    limit: int,
+    after: Optional[str],
+) -> Dict[str, Any]:
+    """Filtered search over courses through PostgREST.
+
+    Every term must appear in the title or description (case-insensitive).
+    Results are unranked and ordered by id; the cursor is the last id.
+    """
+    def filtered(columns: str):
+        request = client.table("courses").select(columns)
+        for term in search_terms(query):
+            request = request.or_(f"title.ilike.*{term}*,description.ilike.*{term}*")
+        if category:
+            request = request.eq("category", category)
+        if level:
+            request = request.eq("level", level)
+        if tag:
+            request = request.contains("tags", [tag])
+        return request
+
+    page = filtered("*").order("id")
+    if after:
+        (last_id,) = decode_cursor(after, 1)
+        page = page.gt("id", last_id)
+    rows = page.limit(limit + 1).execute().data or []
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["id"]])
+
+    total, facets = None, None
+    if not after:
+        matched = filtered("category,level,tags").execute().data or []
+        total = len(matched)
+        counts = {
+            "category": Counter(row["category"] for row in matched if row.get("category")),
+            "level": Counter(row["level"] for row in matched if row.get("level")),
+            "tag": Counter(t for row in matched for t in (row.get("tags") or [])),
+        }
+        facets = {
+            name: [{"value": value, "count": count} for value, count in sorted(
+                counter.items(), key=lambda item: (-item[1], item[0])
+            )[:FACET_LIMIT if name == "tag" else None]]
+            for name, counter in counts.items()
+        }
+
+    return {"results": rows, "next_cursor": next_cursor, "total": total, "facets": facets}
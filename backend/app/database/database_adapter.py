@@ -9,16 +9,31 @@ from datetime import datetime
 from pathlib import Path
 import uuid
 
+import orjson
+
 from app.core.config import settings
+from app.core.cache import MISSING, create_cache_backend
+from app.database.change_log import ChangeLogPruner
+from app.database.connection_pool import SQLiteConnectionPool
+from app.database.course_catalog import course_catalog
+from app.database.course_search import search_sqlite, search_supabase
+from app.database.migrations import migrate
+from app.database.pagination import decode_cursor, encode_cursor, keyset_page, select_columns
+from app.database.slow_queries import connection_factory
+from app.database.sqlite_tuning import CheckpointManager, apply_pragmas, pragma_profile
+from app.database.write_behind import ProgressBuffer
 
 # SQLite database file path
-SQLITE_DB_PATH = Path(__file__).parent.parent.parent / "local.db"
+SQLITE_DB_PATH = Path(
+    os.getenv("SQLITE_DB_PATH", settings.SQLITE_DB_PATH)
+    or Path(__file__).parent.parent.parent / "local.db"
+)
 
 
 class DatabaseAdapter:
     """Adapter for database operations supporting both Supabase and SQLite"""
     
-    def __init__(self):
+    def __init__(self, db_path: Optional[Path] = None):
         # Check if we should use SQLite (either via env var, settings default, or if Supabase is not configured)
         use_sqlite_env = os.getenv("USE_SQLITE", settings.USE_SQLITE).lower() == "true"
         database_mode = os.getenv("DATABASE_MODE", settings.DATABASE_MODE).lower()
@@ -37,7 +52,16 @@ class DatabaseAdapter:
             database_mode == "sqlite" or 
             not supabase_configured
         )
-        self.conn = None
+        self.db_path = Path(db_path) if db_path else SQLITE_DB_PATH
+        self.cache = create_cache_backend()
+        self.pool: Optional[SQLiteConnectionPool] = None
+        self.checkpointer: Optional[CheckpointManager] = None
+        self.progress_buffer = ProgressBuffer(self._write_progress, interval=0)
+        self.change_log_pruner = ChangeLogPruner(
+            self.prune_change_log,
+            retention_days=settings.CHANGE_LOG_RETENTION_DAYS,
+            interval=settings.CHANGE_LOG_PRUNE_INTERVAL,
+        )
         
         if self.use_sqlite:
             self._init_sqlite()
@@ -51,124 +75,78 @@ class DatabaseAdapter:
                 self._init_sqlite()
     
     def _init_sqlite(self):
-        """Initialize SQLite database and create tables if needed"""
-        self.conn = sqlite3.connect(str(SQLITE_DB_PATH))
-        self.conn.row_factory = sqlite3.Row
-        self._create_tables()
-    
-    def _create_tables(self):
-        """Create SQLite tables"""
-        cursor = self.conn.cursor()
-        
-        # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id TEXT PRIMARY KEY,
-                email TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                password_hash TEXT NOT NULL,
-                preferences TEXT DEFAULT '{}',
-                goals TEXT DEFAULT '[]',
-                progress TEXT DEFAULT '[]',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Courses table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS courses (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                description TEXT,
-                category TEXT,
-                duration TEXT,
-                level TEXT,
-                lessons TEXT DEFAULT '[]',
-                image TEXT,
-                instructor TEXT,
-                tags TEXT DEFAULT '[]',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # User courses table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_courses (
-                user_id TEXT NOT NULL,
-                course_id TEXT NOT NULL,
-                progress INTEGER DEFAULT 0,
-                completed BOOLEAN DEFAULT FALSE,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                PRIMARY KEY (user_id, course_id),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Goals table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS goals (
-                id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                virtue_id TEXT,
-                sdg_ids TEXT DEFAULT '[]',
-                progress INTEGER DEFAULT 0,
-                completed BOOLEAN DEFAULT FALSE,
-                target INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        """)
-        
-        self.conn.commit()
+        """Initialize SQLite connection pool and apply pending schema migrations"""
+        profile = pragma_profile()
+        self.pool = SQLiteConnectionPool(
+            self.db_path,
+            size=settings.SQLITE_POOL_SIZE,
+            timeout=settings.SQLITE_POOL_TIMEOUT,
+            on_connect=lambda conn: apply_pragmas(conn, profile),
+            factory=connection_factory(),
+            group_commit_window=settings.SQLITE_GROUP_COMMIT_WINDOW_MS / 1000,
+            group_commit_max_ops=settings.SQLITE_GROUP_COMMIT_MAX_OPS,
+        )
+        self.checkpointer = CheckpointManager(
+            self.pool,
+            interval=settings.SQLITE_CHECKPOINT_INTERVAL,
+            wal_size_limit=settings.SQLITE_WAL_SIZE_LIMIT,
+        )
+        self.progress_buffer = ProgressBuffer(
+            self._write_progress,
+            interval=settings.PROGRESS_FLUSH_INTERVAL,
+            max_pending=settings.PROGRESS_BUFFER_MAX_ENTRIES,
+        )
+        migrate(self.pool)
     
     def get_connection(self):
-        """Get database connection"""
+        """Get database connection pool (SQLite) or client (Supabase)"""
         if self.use_sqlite:
-            if self.conn is None:
+            if self.pool is None:
                 self._init_sqlite()
-            return self.conn
+            return self.pool
         return self.supabase
     
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Get connection pool usage stats (SQLite only)"""
+        if self.use_sqlite and self.pool:
+            return self.pool.stats()
+        return None
+    
+    def startup(self):
+        """Start background maintenance (called from the app lifespan)"""
+        if self.use_sqlite and self.checkpointer:
+            self.checkpointer.start()
+        self.progress_buffer.start()
+        self.change_log_pruner.start()
+    
+    def shutdown(self):
+        """Stop background maintenance and release connections"""
+        self.change_log_pruner.stop()
+        self.progress_buffer.stop()
+        if self.use_sqlite and self.checkpointer:
+            self.checkpointer.stop()
+        if self.use_sqlite and self.pool:
+            self.pool.close()
+        self.cache.close()
+    
     # User operations
     def create_user(self, user_id: str, email: str, name: str, password_hash: str) -> Dict[str, Any]:
         """Create a new user"""
         if self.use_sqlite:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO users (id, email, name, password_hash, preferences, goals, progress)
-                VALUES (?, ?, ?, ?, '{}', '[]', '[]')
-            """, (user_id, email, name, password_hash))
-            self.conn.commit()
-            return {
-                "id": user_id,
-                "email": email,
-                "name": name,
-                "preferences": {},
-                "goals": [],
-                "progress": []
-            }
+            with self.pool.writer() as conn:
+                conn.execute("""
+                    INSERT INTO users (id, email, name, password_hash, preferences, goals, progress)
+                    VALUES (?, ?, ?, ?, '{}', '[]', '[]')
+                """, (user_id, email, name, password_hash))
+            return new_user_row(user_id, email, name)
         else:
-            result = self.supabase.table("users").insert({
-                "id": user_id,
-                "email": email,
-                "name": name,
-                "preferences": {},
-                "goals": [],
-                "progress": []
-            }).execute()
-            return result.data[0] if result.data else None
+            return first_row(self.supabase.table("users").insert(new_user_row(user_id, email, name)).execute())
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         if self.use_sqlite:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-            row = cursor.fetchone()
+            with self.pool.reader() as conn:
+                row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
             if row:
                 return {
                     "id": row["id"],
@@ -183,33 +161,71 @@ class DatabaseAdapter:
         else:
             # For Supabase, we'd need to query auth.users separately
             # This is a simplified version - you'd need to handle auth separately
-            result = self.supabase.table("users").select("*").eq("email", email).execute()
-            return result.data[0] if result.data else None
+            return first_row(user_request(self.supabase, "email", email).execute())
     
-    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user by ID"""
-        if self.use_sqlite:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "id": row["id"],
-                    "email": row["email"],
-                    "name": row["name"],
-                    "preferences": json.loads(row["preferences"]),
-                    "goals": json.loads(row["goals"]),
-                    "progress": json.loads(row["progress"])
-                }
+    def get_user_by_id(self, user_id: str, raw_json: bool = False) -> Optional[Dict[str, Any]]:
+        """Get user by ID, served from the user cache when possible.
+
+        On SQLite the cache holds preferences, goals and progress as their
+        stored JSON text. They are decoded per call, or with ``raw_json``
+        wrapped as ``orjson.Fragment`` values, so a request that only returns
+        the profile does no JSON parsing at all. Supabase profiles arrive
+        parsed and are shared between callers: don't mutate nested values.
+        """
+        user = self.cache.get_or_load(
+            user_key(user_id),
+            lambda: self._load_user_by_id(user_id),
+            settings.USER_CACHE_TTL,
+        )
+        if not user:
             return None
+        return self._decode_profile(user, raw_json) if self.use_sqlite else dict(user)
+    
+    def _decode_profile(self, user: Dict[str, Any], raw_json: bool = False) -> Dict[str, Any]:
+        """Copy of a SQLite profile row with JSON columns decoded and buffered progress applied"""
+        user = dict(user)
+        for field, default in USER_JSON_DEFAULTS.items():
+            user[field] = json_column(user[field], default, raw_json)
+        progress = self.progress_buffer.user(user["id"])
+        if progress is not MISSING:
+            user["progress"] = progress
+        return user
+    
+    def _load_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Load user by ID from the database (SQLite JSON columns left encoded)"""
+        if self.use_sqlite:
+            with self.pool.reader() as conn:
+                row = conn.execute(
+                    f"SELECT {USER_PROFILE_COLUMNS} FROM users WHERE id = ?", (user_id,)
+                ).fetchone()
+            return dict(row) if row else None
         else:
-            result = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            return result.data[0] if result.data else None
+            return first_row(user_request(self.supabase, "id", user_id).execute())
     
-    def update_user(self, user_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
-        """Update user"""
+    def update_user(
+        self,
+        user_id: str,
+        updates: Dict[str, Any],
+        raw_json: bool = False,
+        preference_keys: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Update user, returning the updated profile (one ``UPDATE ... RETURNING`` on SQLite).
+
+        ``preference_keys`` replaces those top-level preference keys (others
+        are kept, a None value is stored as null) in the same statement.
+        Progress-only updates are buffered when write-behind is enabled; any
+        other update writes a pending progress blob along with it.
+        """
         if self.use_sqlite:
-            cursor = self.conn.cursor()
+            if self.progress_buffer.enabled and set(updates) == {"progress"} and not preference_keys:
+                user = self.get_user_by_id(user_id, raw_json)
+                if user:
+                    self.progress_buffer.put_user(user_id, updates["progress"])
+                    user["progress"] = updates["progress"]
+                return user
+            pending = self.progress_buffer.user(user_id)
+            if pending is not MISSING and "progress" not in updates:
+                updates = dict(updates, progress=pending)
             set_clauses = []
             values = []
             
@@ -221,6 +237,10 @@ class DatabaseAdapter:
                 set_clauses.append("preferences = ?")
                 values.append(json.dumps(updates["preferences"]))
             
+            if preference_keys:
+                set_clauses.append(f"preferences = ({SET_PREFERENCE_KEYS_SQL})")
+                values += [json.dumps(preference_keys)] * 2
+            
             if "goals" in updates:
                 set_clauses.append("goals = ?")
                 values.append(json.dumps(updates["goals"]))
@@ -232,81 +252,231 @@ class DatabaseAdapter:
             set_clauses.append("updated_at = CURRENT_TIMESTAMP")
             values.append(user_id)
             
-            cursor.execute(
-                f"UPDATE users SET {', '.join(set_clauses)} WHERE id = ?",
-                values
-            )
-            self.conn.commit()
-            return self.get_user_by_id(user_id)
+            with self.pool.writer() as conn:
+                row = conn.execute(
+                    f"UPDATE users SET {', '.join(set_clauses)} WHERE id = ? RETURNING {USER_PROFILE_COLUMNS}",
+                    values
+                ).fetchone()
+            self.cache.delete(user_key(user_id))
+            if pending is not MISSING:
+                self.progress_buffer.discard_user(user_id, pending)
+            return self._decode_profile(dict(row), raw_json) if row else None
         else:
-            result = self.supabase.table("users").update(updates).eq("id", user_id).execute()
-            return result.data[0] if result.data else None
+            result = update_user_request(self.supabase, user_id, updates, preference_keys).execute()
+            self.cache.delete(user_key(user_id))
+            return first_row(result)
+    
+    def patch_user_preferences(self, user_id: str, patch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply an RFC 7396 merge patch to a user's preferences inside the database.
+
+        Returns the new values of the patched top-level keys (None for removed
+        keys), or None if the user doesn't exist.
+        """
+        if self.use_sqlite:
+            with self.pool.writer() as conn:
+                # RETURNING only the patched keys keeps the document itself in SQLite
+                row = conn.execute(
+                    """
+                    UPDATE users
+                    SET preferences = json_patch(COALESCE(preferences, '{}'), :patch),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = :user_id
+                    RETURNING (
+                        SELECT json_group_object(key, CASE type
+                            WHEN 'true' THEN json('true')
+                            WHEN 'false' THEN json('false')
+                            ELSE value
+                        END)
+                        FROM json_each(preferences)
+                        WHERE key IN (SELECT key FROM json_each(:patch))
+                    ) AS changed
+                    """,
+                    {"patch": json.dumps(patch), "user_id": user_id},
+                ).fetchone()
+            preferences = json.loads(row["changed"]) if row else None
+        else:
+            preferences = patch_preferences_request(self.supabase, user_id, patch).execute().data
+        if preferences is None:
+            return None
+        self.cache.delete(user_key(user_id))
+        return changed_keys(preferences, patch)
     
     def get_user_password_hash(self, user_id: str) -> Optional[str]:
         """Get user password hash (SQLite only)"""
         if self.use_sqlite:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,))
-            row = cursor.fetchone()
+            with self.pool.reader() as conn:
+                row = conn.execute(
+                    "SELECT password_hash FROM users WHERE id = ?", (user_id,)
+                ).fetchone()
             return row["password_hash"] if row else None
         return None
     
+    def update_user_password_hash(self, user_id: str, password_hash: str) -> bool:
+        """Replace a user's password hash (SQLite only)"""
+        if self.use_sqlite:
+            with self.pool.writer() as conn:
+                cursor = conn.execute(
+                    "UPDATE users SET password_hash = ? WHERE id = ?",
+                    (password_hash, user_id)
+                )
+            return cursor.rowcount > 0
+        return False
+    
     # Goal operations
     def get_user_goals(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get all goals for a user"""
+        """Get all goals for a user, served from the cache when possible"""
+        goals = self.cache.get_or_load(
+            goals_key(user_id),
+            lambda: self._load_user_goals(user_id),
+            settings.GOALS_CACHE_TTL,
+        )
+        return self._with_pending_progress(goals)
+    
+    def _load_user_goals(self, user_id: str) -> List[Dict[str, Any]]:
+        """Load all goals for a user from the database"""
         if self.use_sqlite:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM goals WHERE user_id = ?", (user_id,))
-            rows = cursor.fetchall()
+            with self.pool.reader() as conn:
+                rows = conn.execute("SELECT * FROM goals WHERE user_id = ?", (user_id,)).fetchall()
             return [dict(row) for row in rows]
         else:
-            result = self.supabase.table("goals").select("*").eq("user_id", user_id).execute()
-            return result.data if result.data else []
+            return user_goals_request(self.supabase, user_id).execute().data or []
+    
+    def _with_pending_progress(self, goals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Goals with any buffered progress applied (rows are copied, never mutated)"""
+        if not self.progress_buffer.has_pending():
+            return list(goals)
+        result = []
+        for goal in goals:
+            progress = self.progress_buffer.goal(goal.get("id"))
+            if progress is not MISSING and "progress" in goal:
+                goal = dict(goal, progress=progress)
+            result.append(goal)
+        return result
+    
+    def _write_progress(self, goals: Dict[str, Any], users: Dict[str, Any]):
+        """Write buffered progress (called by the progress buffer's flush)"""
+        with self.pool.writer() as conn:
+            if goals:
+                conn.executemany(
+                    "UPDATE goals SET progress = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    [(progress, goal_id) for goal_id, (_, progress) in goals.items()],
+                )
+            if users:
+                conn.executemany(
+                    "UPDATE users SET progress = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    [(json.dumps(progress), user_id) for user_id, progress in users.items()],
+                )
+        for user_id in {user_id for user_id, _ in goals.values()}:
+            self.cache.delete(goals_key(user_id))
+        for user_id in users:
+            self.cache.delete(user_key(user_id))
+    
+    def get_user_goals_page(
+        self,
+        user_id: str,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[str] = None,
+        raw_json: bool = False,
+    ) -> Dict[str, Any]:
+        """Get one page of a user's goals, oldest first, projected to ``fields``.
+
+        With ``raw_json``, stored JSON columns are returned as pre-encoded
+        ``orjson.Fragment`` values for responses that serialize them unchanged.
+        """
+        columns, requested = select_columns(fields, GOAL_FIELDS, GOAL_PAGE_KEYS)
+        if self.use_sqlite:
+            params: List[Any] = [user_id]
+            keyset = ""
+            if after:
+                keyset = "AND (created_at, id) > (?, ?)"
+                params += decode_cursor(after, 2)
+            with self.pool.reader() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT {', '.join(columns)} FROM goals
+                    WHERE user_id = ? {keyset}
+                    ORDER BY created_at, id
+                    LIMIT ?
+                    """,
+                    params + [limit + 1],
+                ).fetchall()
+            goals = self._with_pending_progress([dict(row) for row in rows])
+            for goal in goals:
+                if "sdg_ids" in goal:
+                    goal["sdg_ids"] = json_column(goal["sdg_ids"], "[]", raw_json)
+        else:
+            result = goals_page_request(
+                self.supabase.table("goals"), user_id, columns, limit, after
+            ).execute()
+            goals = result.data or []
+        return keyset_page(goals, limit, GOAL_PAGE_KEYS, requested)
     
     def create_goal(self, goal: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new goal"""
         if self.use_sqlite:
             goal_id = goal.get("id", str(uuid.uuid4()))
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO goals (id, user_id, title, description, virtue_id, sdg_ids, progress, completed, target)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                goal_id,
-                goal["user_id"],
-                goal.get("title", ""),
-                goal.get("description", ""),
-                goal.get("virtue_id"),
-                json.dumps(goal.get("sdg_ids", [])),
-                goal.get("progress", 0),
-                goal.get("completed", False),
-                goal.get("target", 1)
-            ))
-            self.conn.commit()
-            return self.get_goal_by_id(goal_id)
+            with self.pool.writer() as conn:
+                row = conn.execute(
+                    INSERT_GOAL_SQL + "RETURNING *", self._goal_params(dict(goal, id=goal_id))
+                ).fetchone()
+            self.cache.delete(goals_key(goal["user_id"]))
+            return self._goal_from_row(row)
         else:
             result = self.supabase.table("goals").insert(goal).execute()
-            return result.data[0] if result.data else None
+            self.cache.delete(goals_key(goal["user_id"]))
+            return first_row(result)
+    
+    def _goal_params(self, goal: Dict[str, Any]) -> tuple:
+        return (
+            goal["id"],
+            goal["user_id"],
+            goal.get("title", ""),
+            goal.get("description", ""),
+            goal.get("virtue_id"),
+            json.dumps(goal.get("sdg_ids", [])),
+            goal.get("progress", 0),
+            goal.get("completed", False),
+            goal.get("target", 1)
+        )
     
     def get_goal_by_id(self, goal_id: str) -> Optional[Dict[str, Any]]:
         """Get goal by ID"""
         if self.use_sqlite:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM goals WHERE id = ?", (goal_id,))
-            row = cursor.fetchone()
-            if row:
-                goal = dict(row)
-                goal["sdg_ids"] = json.loads(goal["sdg_ids"])
-                return goal
-            return None
+            with self.pool.reader() as conn:
+                row = conn.execute("SELECT * FROM goals WHERE id = ?", (goal_id,)).fetchone()
+            return self._goal_from_row(row) if row else None
         else:
-            result = self.supabase.table("goals").select("*").eq("id", goal_id).execute()
-            return result.data[0] if result.data else None
+            return first_row(goal_request(self.supabase, goal_id).execute())
     
-    def update_goal(self, goal_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
-        """Update a goal"""
+    def _goal_from_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """A goals row with sdg_ids decoded and buffered progress applied"""
+        goal = dict(row)
+        goal["sdg_ids"] = json.loads(goal["sdg_ids"])
+        progress = self.progress_buffer.goal(goal["id"])
+        if progress is not MISSING:
+            goal["progress"] = progress
+        return goal
+    
+    def update_goal(self, goal_id: str, updates: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Update a goal, returning it, or None if it doesn't exist or isn't ``user_id``'s.
+
+        On SQLite the ownership check, the write and the read-back are one
+        ``UPDATE ... WHERE id = ? AND user_id = ? RETURNING *``. Progress-only
+        updates are buffered when write-behind is enabled; any other update
+        writes a pending progress value along with it.
+        """
         if self.use_sqlite:
-            cursor = self.conn.cursor()
+            if self.progress_buffer.enabled and set(updates) == {"progress"}:
+                goal = self.get_goal_by_id(goal_id)
+                if not goal or (user_id is not None and goal["user_id"] != user_id):
+                    return None
+                self.progress_buffer.put_goal(goal_id, goal["user_id"], updates["progress"])
+                goal["progress"] = updates["progress"]
+                return goal
+            pending = self.progress_buffer.goal(goal_id)
+            if pending is not MISSING and "progress" not in updates:
+                updates = dict(updates, progress=pending)
             set_clauses = []
             values = []
             
@@ -319,28 +489,617 @@ class DatabaseAdapter:
                     values.append(value)
             
             set_clauses.append("updated_at = CURRENT_TIMESTAMP")
-            values.append(goal_id)
+            where, params = owned_goal(goal_id, user_id)
             
-            cursor.execute(
-                f"UPDATE goals SET {', '.join(set_clauses)} WHERE id = ?",
-                values
-            )
-            self.conn.commit()
-            return self.get_goal_by_id(goal_id)
+            with self.pool.writer() as conn:
+                row = conn.execute(
+                    f"UPDATE goals SET {', '.join(set_clauses)} WHERE {where} RETURNING *",
+                    values + params
+                ).fetchone()
+            if row is None:
+                return None
+            if pending is not MISSING:
+                self.progress_buffer.discard_goal(goal_id, pending)
+            goal = self._goal_from_row(row)
         else:
-            result = self.supabase.table("goals").update(updates).eq("id", goal_id).execute()
-            return result.data[0] if result.data else None
+            request = owned_goal_request(self.supabase.table("goals").update(updates), goal_id, user_id)
+            goal = first_row(request.execute())
+        if goal:
+            self.cache.delete(goals_key(goal["user_id"]))
+        return goal
     
-    def delete_goal(self, goal_id: str) -> bool:
-        """Delete a goal"""
+    def delete_goal(self, goal_id: str, user_id: Optional[str] = None) -> bool:
+        """Delete a goal, returning False if it doesn't exist or isn't ``user_id``'s"""
         if self.use_sqlite:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM goals WHERE id = ?", (goal_id,))
-            self.conn.commit()
-            return cursor.rowcount > 0
+            where, params = owned_goal(goal_id, user_id)
+            with self.pool.writer() as conn:
+                row = conn.execute(f"DELETE FROM goals WHERE {where} RETURNING user_id", params).fetchone()
+            if not row:
+                return False
+            self.progress_buffer.discard_goal(goal_id)
+            self.cache.delete(goals_key(row["user_id"]))
+            return True
+        else:
+            goal = first_row(owned_goal_request(self.supabase.table("goals").delete(), goal_id, user_id).execute())
+            if not goal:
+                return False
+            self.cache.delete(goals_key(goal["user_id"]))
+            return True
+    
+    def apply_goal_batch(self, user_id: str, ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply mixed goal creates/updates/deletes for one user.
+
+        ``ops`` are ``{"op": "create", "goal": {...}}``, ``{"op": "update",
+        "id": ..., "changes": {...}}`` or ``{"op": "delete", "id": ...}``.
+        Ownership of every referenced goal is checked with one query and each
+        op's outcome is decided in request order. Ops on the same goal are
+        then folded into one net change (later ops winning), and the changes
+        are written as bulk deletes, inserts and updates in a single
+        transaction. Returns one result per op, in order, with a ``status``
+        of created/updated/deleted, not_found, forbidden or conflict.
+        """
+        for op in ops:
+            if op["op"] == "create":
+                op["id"] = op["goal"].get("id") or str(uuid.uuid4())
+        if self.use_sqlite:
+            # Buffered progress goes first, so batch updates aren't overwritten by it later
+            self.progress_buffer.flush(user_id)
+            with self.pool.writer() as conn:
+                ids = json.dumps([op["id"] for op in ops])
+                owners = {
+                    row["id"]: row["user_id"] for row in conn.execute(
+                        "SELECT id, user_id FROM goals WHERE id IN (SELECT value FROM json_each(?))",
+                        (ids,),
+                    )
+                }
+                results = self._plan_goal_batch(user_id, ops, owners)
+                changes = self._fold_goal_batch(user_id, ops, results)
+                deletes = [goal_id for goal_id, (kind, _) in changes.items() if kind in ("delete", "replace")]
+                inserts = [goal for kind, goal in changes.values() if kind in ("insert", "replace")]
+                updates = {}
+                for goal_id, (kind, fields) in changes.items():
+                    if kind == "update" and fields:
+                        columns = tuple(sorted(fields))
+                        updates.setdefault(columns, []).append((goal_id, [fields[c] for c in columns]))
+                if deletes:
+                    conn.executemany("DELETE FROM goals WHERE id = ?", [(goal_id,) for goal_id in deletes])
+                if inserts:
+                    conn.executemany(
+                        INSERT_GOAL_SQL + "ON CONFLICT(id) DO NOTHING",
+                        [self._goal_params(goal) for goal in inserts],
+                    )
+                for columns, rows in updates.items():
+                    assignments = ", ".join(f"{column} = ?" for column in columns)
+                    conn.executemany(
+                        f"UPDATE goals SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                        [
+                            [json.dumps(v) if c == "sdg_ids" else v for c, v in zip(columns, values)] + [goal_id]
+                            for goal_id, values in rows
+                        ],
+                    )
+                changed = json.dumps([r["id"] for r in results if r["status"] in ("created", "updated")])
+                goals = {}
+                for row in conn.execute(
+                    "SELECT * FROM goals WHERE id IN (SELECT value FROM json_each(?))", (changed,)
+                ):
+                    goal = dict(row)
+                    goal["sdg_ids"] = json.loads(goal["sdg_ids"])
+                    goals[goal["id"]] = goal
+        else:
+            # PostgREST has no multi-statement transactions: one bulk request per kind of change
+            table = self.supabase.table("goals")
+            existing = table.select("*").in_("id", [op["id"] for op in ops]).execute().data or []
+            owners = {goal["id"]: goal["user_id"] for goal in existing}
+            results = self._plan_goal_batch(user_id, ops, owners)
+            changes = self._fold_goal_batch(user_id, ops, results)
+            current = {goal["id"]: goal for goal in existing}
+            deletes = [goal_id for goal_id, (kind, _) in changes.items() if kind in ("delete", "replace")]
+            inserts = [goal for kind, goal in changes.values() if kind in ("insert", "replace")]
+            # Partial updates are merged into the current rows and upserted together
+            updates = [
+                {**current[goal_id], **fields}
+                for goal_id, (kind, fields) in changes.items() if kind == "update"
+            ]
+            goals = {}
+            if deletes:
+                table.delete().in_("id", deletes).execute()
+            for rows, ignore_duplicates in ((inserts, True), (updates, False)):
+                if rows:
+                    written = table.upsert(rows, ignore_duplicates=ignore_duplicates).execute()
+                    goals.update({goal["id"]: goal for goal in written.data or []})
+        
+        # A create whose id was taken by a concurrent writer was skipped, not applied
+        skipped = {
+            goal_id for goal_id, (kind, _) in changes.items()
+            if kind in ("insert", "replace") and (goals.get(goal_id) or {}).get("user_id") != user_id
+        }
+        self.cache.delete(goals_key(user_id))
+        for result in results:
+            if result["id"] in skipped and result["status"] in ("created", "updated"):
+                result["status"] = "conflict"
+            elif result["status"] in ("created", "updated"):
+                result["goal"] = goals.get(result["id"])
+        return results
+    
+    def _plan_goal_batch(
+        self, user_id: str, ops: List[Dict[str, Any]], owners: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """Decide each op's outcome from the current owners of the referenced goals"""
+        owners = dict(owners)
+        results = []
+        for op in ops:
+            owner = owners.get(op["id"])
+            if op["op"] == "create":
+                status = "conflict" if owner else "created"
+                if not owner:
+                    owners[op["id"]] = user_id
+            elif owner is None:
+                status = "not_found"
+            elif owner != user_id:
+                status = "forbidden"
+            elif op["op"] == "update":
+                status = "updated"
+            else:
+                status = "deleted"
+                owners.pop(op["id"])
+            results.append({"op": op["op"], "id": op["id"], "status": status})
+        return results
+    
+    def _fold_goal_batch(
+        self, user_id: str, ops: List[Dict[str, Any]], results: List[Dict[str, Any]]
+    ) -> Dict[str, tuple]:
+        """Fold the permitted ops into one net change per goal, later ops winning.
+
+        Changes are ``("insert", goal)``, ``("replace", goal)`` (an existing
+        goal deleted then created again), ``("update", fields)`` or
+        ``("delete", None)``; a goal created then deleted needs no change.
+        """
+        changes = {}
+        for op, result in zip(ops, results):
+            goal_id, status = op["id"], result["status"]
+            change = changes.get(goal_id)
+            if status == "created":
+                goal = {**op["goal"], "id": goal_id, "user_id": user_id}
+                changes[goal_id] = ("replace" if change and change[0] == "delete" else "insert", goal)
+            elif status == "updated":
+                fields = {k: v for k, v in op["changes"].items() if k in GOAL_UPDATABLE_FIELDS}
+                changes[goal_id] = (change[0], {**change[1], **fields}) if change else ("update", fields)
+            elif status == "deleted":
+                if change and change[0] == "insert":
+                    del changes[goal_id]
+                else:
+                    changes[goal_id] = ("delete", None)
+        return changes
+    
+    # Sync operations
+    def get_changes(self, user_id: str, since: Optional[str] = None, raw_json: bool = False) -> Dict[str, Any]:
+        """Get what changed for a user since a sync cursor.
+
+        Without ``since`` this is a full snapshot (the profile and every goal).
+        With it, only the profile fields and goals changed after the cursor
+        are returned, plus the ids of deleted goals, read from the change log
+        in O(changes). Pass the returned ``cursor`` as ``since`` next time.
+        A cursor older than pruned change log rows gets a full snapshot with
+        ``cursor_expired`` set.
+        """
+        after = decode_cursor(since, 1)[0] if since else None
+        if self.use_sqlite:
+            # Buffered progress only reaches the change log when written
+            self.progress_buffer.flush(user_id)
+            with self.pool.reader() as conn:
+                # One read transaction, so the cursor matches the rows returned
+                conn.execute("BEGIN")
+                row = conn.execute(
+                    "SELECT seq FROM change_log_pruned WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                pruned = row[0] if row else 0
+                expired = after is not None and pruned > after
+                if after is None or expired:
+                    # Never below the pruned seq, or the next sync would expire again
+                    seq = conn.execute(
+                        "SELECT MAX(COALESCE(MAX(seq), 0), ?) FROM change_log WHERE user_id = ?", (pruned, user_id)
+                    ).fetchone()[0]
+                    user_fields, goal_ids, deleted = list(USER_SYNC_FIELDS), None, []
+                else:
+                    changes = conn.execute(
+                        """
+                        SELECT seq, entity, entity_id, op, fields FROM change_log
+                        WHERE user_id = ? AND seq > ? ORDER BY seq
+                        """,
+                        (user_id, after),
+                    ).fetchall()
+                    seq, user_fields, goal_ids, deleted = fold_changes(changes, after)
+                
+                user = None
+                if user_fields:
+                    row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+                    if row:
+                        user = {"id": row["id"]}
+                        for field in user_fields:
+                            user[field] = (
+                                json_column(row[field], USER_JSON_DEFAULTS[field], raw_json)
+                                if field in USER_JSON_DEFAULTS else row[field]
+                            )
+                
+                if goal_ids is None:
+                    rows = conn.execute("SELECT * FROM goals WHERE user_id = ?", (user_id,)).fetchall()
+                elif goal_ids:
+                    rows = conn.execute(
+                        "SELECT * FROM goals WHERE id IN (SELECT value FROM json_each(?)) AND user_id = ?",
+                        (json.dumps(goal_ids), user_id),
+                    ).fetchall()
+                else:
+                    rows = []
+            goals = []
+            for row in rows:
+                goal = dict(row)
+                goal["sdg_ids"] = json_column(goal["sdg_ids"], "[]", raw_json)
+                goals.append(goal)
+        else:
+            # Read the log first: rows changed after it are simply sent again next time
+            changes = None
+            if after is not None:
+                changes = (
+                    self.supabase.table("change_log").select("seq,entity,entity_id,op,fields")
+                    .eq("user_id", user_id).gt("seq", after).order("seq").execute().data or []
+                )
+            # After the log, so a prune that removed rows we missed is always seen
+            rows = self.supabase.table("change_log_pruned").select("seq").eq("user_id", user_id).execute().data
+            pruned = rows[0]["seq"] if rows else 0
+            expired = after is not None and pruned > after
+            if after is None or expired:
+                latest = (
+                    self.supabase.table("change_log").select("seq").eq("user_id", user_id)
+                    .order("seq", desc=True).limit(1).execute().data
+                )
+                seq = max(latest[0]["seq"] if latest else 0, pruned)
+                user_fields, goal_ids, deleted = list(USER_SYNC_FIELDS), None, []
+            else:
+                seq, user_fields, goal_ids, deleted = fold_changes(changes, after)
+            
+            user = None
+            if user_fields:
+                user = first_row(
+                    self.supabase.table("users").select(",".join(["id", *user_fields])).eq("id", user_id).execute()
+                )
+            goals_table = user_goals_request(self.supabase, user_id)
+            if goal_ids is None:
+                goals = goals_table.execute().data or []
+            elif goal_ids:
+                goals = goals_table.in_("id", goal_ids).execute().data or []
+            else:
+                goals = []
+        
+        # A goal in the log that no longer exists was deleted later on
+        found = {goal["id"] for goal in goals}
+        deleted += [goal_id for goal_id in goal_ids or [] if goal_id not in found]
+        return {
+            "cursor": encode_cursor([seq]),
+            "full": after is None or expired,
+            "cursor_expired": expired,
+            "user": user,
+            "goals": goals,
+            "deleted_goal_ids": deleted,
+        }
+    
+    def prune_change_log(self, retention_days: float) -> int:
+        """Delete change log rows older than ``retention_days``, returning the count.
+
+        The highest pruned seq is kept per user, so ``get_changes`` can answer
+        a cursor that points at pruned rows with a full resync.
+        """
+        if self.use_sqlite:
+            cutoff = f"-{retention_days} days"
+            with self.pool.writer() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO change_log_pruned (user_id, seq)
+                    SELECT user_id, MAX(seq) FROM change_log
+                    WHERE changed_at < datetime('now', ?) GROUP BY user_id
+                    ON CONFLICT (user_id) DO UPDATE SET seq = MAX(seq, excluded.seq)
+                    """,
+                    (cutoff,),
+                )
+                return conn.execute(
+                    "DELETE FROM change_log WHERE changed_at < datetime('now', ?)", (cutoff,)
+                ).rowcount
+        result = self.supabase.rpc("prune_change_log", {"p_retention_days": retention_days}).execute()
+        return result.data or 0
+    
+    # Course operations
+    def _course_from_row(self, row: sqlite3.Row, raw_json: bool = False) -> Dict[str, Any]:
+        course = dict(row)
+        for column in ("lessons", "tags"):
+            if column in course:
+                course[column] = json_column(course[column], "[]", raw_json)
+        return course
+    
+    def get_courses(self) -> List[Dict[str, Any]]:
+        """Get the full course catalog"""
+        if self.use_sqlite:
+            with self.pool.reader() as conn:
+                rows = conn.execute(SELECT_COURSES_SQL).fetchall()
+            return [self._course_from_row(row) for row in rows]
+        else:
+            result = self.supabase.table("courses").select("*").execute()
+            return result.data if result.data else []
+    
+    def get_catalog_version(self) -> Optional[int]:
+        """The catalog version stamp, bumped by every course write in any process"""
+        if self.use_sqlite:
+            with self.pool.reader() as conn:
+                row = conn.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+            return row[0] if row else None
+        else:
+            result = self.supabase.table("catalog_version").select("version").eq("id", 1).execute()
+            return result.data[0]["version"] if result.data else None
+    
+    def get_courses_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[str] = None,
+        raw_json: bool = False,
+    ) -> Dict[str, Any]:
+        """Get one page of the course catalog, ordered by id, projected to ``fields``"""
+        columns, requested = select_columns(fields, COURSE_FIELDS, COURSE_PAGE_KEYS)
+        if self.use_sqlite:
+            params: List[Any] = []
+            keyset = ""
+            if after:
+                keyset = "WHERE id > ?"
+                params += decode_cursor(after, 1)
+            with self.pool.reader() as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM courses {keyset} ORDER BY id LIMIT ?",
+                    params + [limit + 1],
+                ).fetchall()
+            courses = [self._course_from_row(row, raw_json) for row in rows]
+        else:
+            result = courses_page_request(
+                self.supabase.table("courses"), columns, limit, after
+            ).execute()
+            courses = result.data or []
+        return keyset_page(courses, limit, COURSE_PAGE_KEYS, requested)
+    
+    def get_course(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """Get course by ID"""
+        if self.use_sqlite:
+            with self.pool.reader() as conn:
+                row = conn.execute(SELECT_COURSE_SQL, (course_id,)).fetchone()
+            return self._course_from_row(row) if row else None
+        else:
+            return first_row(self.supabase.table("courses").select("*").eq("id", course_id).execute())
+    
+    def upsert_courses(self, courses: List[Dict[str, Any]]) -> int:
+        """Insert or replace courses in bulk (one transaction / one request)"""
+        if not courses:
+            return 0
+        if self.use_sqlite:
+            rows = [
+                (
+                    str(course["id"]),
+                    course["title"],
+                    course.get("description"),
+                    course.get("category"),
+                    course.get("duration"),
+                    course.get("level"),
+                    json.dumps(course.get("lessons", [])),
+                    course.get("image"),
+                    course.get("instructor"),
+                    json.dumps(course.get("tags", [])),
+                )
+                for course in courses
+            ]
+            with self.pool.writer() as conn:
+                conn.executemany(UPSERT_COURSE_SQL, rows)
+        else:
+            self.supabase.table("courses").upsert(courses).execute()
+        course_catalog.invalidate()
+        return len(courses)
+    
+    def search_courses(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        level: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[str] = None,
+        raw_json: bool = False,
+    ) -> Dict[str, Any]:
+        """Search courses with facet counts and cursor pagination"""
+        if self.use_sqlite:
+            with self.pool.reader() as conn:
+                page = search_sqlite(conn, COURSE_COLUMNS, query, category, level, tag, limit, after)
+            page["results"] = [self._course_from_row(row, raw_json) for row in page["results"]]
+            return page
         else:
-            result = self.supabase.table("goals").delete().eq("id", goal_id).execute()
-            return len(result.data) > 0 if result.data else False
+            return search_supabase(self.supabase, query, category, level, tag, limit, after)
+
+
+# Columns selectable through ``fields=`` projections, and the sort keys
+# that keyset pagination cursors are built from
+GOAL_FIELDS = (
+    "id", "user_id", "title", "description", "virtue_id", "sdg_ids",
+    "progress", "completed", "target", "created_at", "updated_at",
+)
+GOAL_PAGE_KEYS = ("created_at", "id")
+USER_SYNC_FIELDS = ("email", "name", "preferences", "goals", "progress")
+USER_JSON_DEFAULTS = {"preferences": "{}", "goals": "[]", "progress": "[]"}
+GOAL_UPDATABLE_FIELDS = ("title", "description", "virtue_id", "sdg_ids", "progress", "completed", "target")
+COURSE_FIELDS = (
+    "id", "title", "description", "category", "duration", "level",
+    "lessons", "image", "instructor", "tags", "created_at",
+)
+COURSE_PAGE_KEYS = ("id",)
+
+
+def fold_changes(changes: List[Dict[str, Any]], after: int):
+    """Collapse change log entries into the latest state per entity.
+
+    Returns ``(cursor seq, changed user fields, upserted goal ids, deleted goal ids)``.
+    """
+    seq = after
+    user_fields = set()
+    goal_ops: Dict[str, str] = {}
+    for change in changes:
+        seq = max(seq, change["seq"])
+        if change["entity"] == "user":
+            fields = change["fields"]
+            user_fields.update(json.loads(fields) if isinstance(fields, str) else fields or [])
+        else:
+            goal_ops[change["entity_id"]] = change["op"]
+    upserted = [goal_id for goal_id, op in goal_ops.items() if op != "delete"]
+    deleted = [goal_id for goal_id, op in goal_ops.items() if op == "delete"]
+    return seq, sorted(user_fields), upserted, deleted
+
+
+def changed_keys(document: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """The patched top-level keys of a merge-patched document"""
+    return {key: document.get(key) for key in patch}
+
+
+def owned_goal(goal_id: str, user_id: Optional[str]) -> tuple:
+    """WHERE clause and params matching a goal, and only if ``user_id`` owns it (when given)"""
+    if user_id is None:
+        return "id = ?", [goal_id]
+    return "id = ? AND user_id = ?", [goal_id, user_id]
+
+
+def json_column(value: Optional[str], default: str, raw: bool = False):
+    """Decode a stored JSON column, or wrap the stored text as a pre-encoded
+    ``orjson.Fragment`` when ``raw`` so it is never parsed and re-serialized"""
+    if value is not None and not isinstance(value, str):
+        # Already decoded (e.g. a cache entry written before columns were kept encoded)
+        return value
+    return orjson.Fragment(value or default) if raw else json.loads(value or default)
+
+
+def user_key(user_id: str) -> str:
+    """Cache key of a user's profile"""
+    return f"user:{user_id}"
+
+
+def goals_key(user_id: str) -> str:
+    """Cache key of a user's goal list"""
+    return f"goals:{user_id}"
+
+
+def first_row(result) -> Optional[Dict[str, Any]]:
+    """The first row of a PostgREST response, or None"""
+    return result.data[0] if result.data else None
+
+
+def new_user_row(user_id: str, email: str, name: str) -> Dict[str, Any]:
+    """A new users row with empty preferences, goals and progress"""
+    return {"id": user_id, "email": email, "name": name, "preferences": {}, "goals": [], "progress": []}
+
+
+# PostgREST requests shared by DatabaseAdapter (supabase-py) and
+# AsyncDatabaseAdapter (async postgrest client); ``client`` is either one
+def user_request(client, column: str, value: str):
+    """Select the user whose ``column`` (id or email) equals ``value``"""
+    return client.table("users").select("*").eq(column, value)
+
+
+def update_user_request(
+    client, user_id: str, updates: Dict[str, Any], preference_keys: Optional[Dict[str, Any]] = None
+):
+    """Update a user, replacing the ``preference_keys`` top-level preferences in the same write"""
+    if preference_keys:
+        return client.rpc("update_user_profile", {
+            "p_user_id": user_id, "p_updates": updates, "p_preference_keys": preference_keys,
+        })
+    return client.table("users").update(updates).eq("id", user_id)
+
+
+def patch_preferences_request(client, user_id: str, patch: Dict[str, Any]):
+    """Merge-patch a user's preferences, returning the new document"""
+    return client.rpc("patch_user_preferences", {"p_user_id": user_id, "p_patch": patch})
+
+
+def user_goals_request(client, user_id: str):
+    """Select every goal of a user"""
+    return client.table("goals").select("*").eq("user_id", user_id)
+
+
+def goal_request(client, goal_id: str):
+    """Select one goal by id"""
+    return client.table("goals").select("*").eq("id", goal_id)
+
+
+def owned_goal_request(request, goal_id: str, user_id: Optional[str]):
+    """Narrow an update/delete to one goal, and only if ``user_id`` owns it (when given)"""
+    request = request.eq("id", goal_id)
+    return request.eq("user_id", user_id) if user_id is not None else request
+
+
+def goals_page_request(table, user_id: str, columns: List[str], limit: int, after: Optional[str]):
+    """Build the PostgREST request for one page of a user's goals"""
+    request = table.select(",".join(columns)).eq("user_id", user_id)
+    if after:
+        created_at, goal_id = decode_cursor(after, 2)
+        request = request.or_(
+            f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt."{goal_id}")'
+        )
+    return request.order("created_at,id").limit(limit + 1)
+
+
+def courses_page_request(table, columns: List[str], limit: int, after: Optional[str]):
+    """Build the PostgREST request for one page of the course catalog"""
+    request = table.select(",".join(columns))
+    if after:
+        (course_id,) = decode_cursor(after, 1)
+        request = request.gt("id", course_id)
+    return request.order("id").limit(limit + 1)
+
+
+# Prepared statements, kept as constants so each pooled connection's
+# statement cache reuses the compiled query
+USER_PROFILE_COLUMNS = "id, email, name, preferences, goals, progress"
+# Replace the top-level keys of the bound object in users.preferences, keeping the others
+# in place (the object is bound twice). Objects, arrays and booleans are re-tagged
+# as JSON, which CASE and UNION would otherwise turn into strings and integers.
+SET_PREFERENCE_KEYS_SQL = """
+    SELECT json_group_object(key, CASE type
+        WHEN 'true' THEN json('true')
+        WHEN 'false' THEN json('false')
+        WHEN 'object' THEN json(value)
+        WHEN 'array' THEN json(value)
+        ELSE value
+    END) FROM (
+        SELECT cur.key AS key,
+               COALESCE(upd.type, cur.type) AS type,
+               CASE WHEN upd.key IS NULL THEN cur.value ELSE upd.value END AS value
+        FROM json_each(COALESCE(users.preferences, '{}')) cur
+        LEFT JOIN json_each(?) upd ON upd.key = cur.key
+        UNION ALL
+        SELECT upd.key, upd.type, upd.value FROM json_each(?) upd
+        WHERE upd.key NOT IN (SELECT key FROM json_each(COALESCE(users.preferences, '{}')))
+    )
+"""
+INSERT_GOAL_SQL = """
+    INSERT INTO goals (id, user_id, title, description, virtue_id, sdg_ids, progress, completed, target)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+COURSE_COLUMNS = ", ".join(COURSE_FIELDS)
+SELECT_COURSES_SQL = f"SELECT {COURSE_COLUMNS} FROM courses ORDER BY rowid"
+SELECT_COURSE_SQL = f"SELECT {COURSE_COLUMNS} FROM courses WHERE id = ?"
+UPSERT_COURSE_SQL = """
+    INSERT INTO courses (id, title, description, category, duration, level, lessons, image, instructor, tags)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title,
+        description = excluded.description,
+        category = excluded.category,
+        duration = excluded.duration,
+        level = excluded.level,
+        lessons = excluded.lessons,
+        image = excluded.image,
+        instructor = excluded.instructor,
+        tags = excluded.tags
+"""
 
 
 # Global database adapter instance
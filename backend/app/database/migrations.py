@@ -0,0 +1,259 @@
+"""
+Versioned schema migrations for the SQLite database
+
+Each migration runs once, in order, inside its own ``BEGIN IMMEDIATE``
+transaction on the pool's writer connection, and is recorded in the
+``schema_version`` table. Readers keep working while a migration runs (WAL),
+so additive changes (new tables, columns and indexes) can ship with a normal
+deploy. To change the schema, append a migration; never edit one that has
+already been released.
+
+    python -m app.database.migrations            # apply pending migrations
+    python -m app.database.migrations --status   # show applied/pending versions
+"""
+from typing import Callable, List, NamedTuple
+import argparse
+import logging
+import sqlite3
+
+from app.database.course_search import create_fts_index
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Cursor], None]
+
+
+def _initial_schema(cursor: sqlite3.Cursor):
+    # IF NOT EXISTS lets databases created before migrations adopt version 1
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            email TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            password_hash TEXT NOT NULL,
+            preferences TEXT DEFAULT '{}',
+            goals TEXT DEFAULT '[]',
+            progress TEXT DEFAULT '[]',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS courses (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            category TEXT,
+            duration TEXT,
+            level TEXT,
+            lessons TEXT DEFAULT '[]',
+            image TEXT,
+            instructor TEXT,
+            tags TEXT DEFAULT '[]',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_courses (
+            user_id TEXT NOT NULL,
+            course_id TEXT NOT NULL,
+            progress INTEGER DEFAULT 0,
+            completed BOOLEAN DEFAULT FALSE,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            PRIMARY KEY (user_id, course_id),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS goals (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            virtue_id TEXT,
+            sdg_ids TEXT DEFAULT '[]',
+            progress INTEGER DEFAULT 0,
+            completed BOOLEAN DEFAULT FALSE,
+            target INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+
+
+def _course_search_index(cursor: sqlite3.Cursor):
+    create_fts_index(cursor)
+
+
+def _secondary_indexes(cursor: sqlite3.Cursor):
+    # Per-user goal lists and keyset pages
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_goals_user_created ON goals (user_id, created_at, id)"
+    )
+    # Per-course lookups (the primary key only serves per-user ones)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_courses_course ON user_courses (course_id)"
+    )
+    # Filter-only course searches
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_courses_category ON courses (category)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_courses_level ON courses (level)")
+
+
+def _change_log(cursor: sqlite3.Cursor):
+    # Monotonic per-user change feed for delta sync; seq never goes backwards
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            entity TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            fields TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_user_seq ON change_log (user_id, seq)")
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS change_log_user_update AFTER UPDATE ON users
+        WHEN new.name IS NOT old.name OR new.email IS NOT old.email
+            OR new.preferences IS NOT old.preferences OR new.goals IS NOT old.goals
+            OR new.progress IS NOT old.progress
+        BEGIN
+            INSERT INTO change_log (user_id, entity, entity_id, op, fields)
+            SELECT new.id, 'user', new.id, 'upsert', json_group_array(field) FROM (
+                SELECT 'name' AS field WHERE new.name IS NOT old.name
+                UNION ALL SELECT 'email' WHERE new.email IS NOT old.email
+                UNION ALL SELECT 'preferences' WHERE new.preferences IS NOT old.preferences
+                UNION ALL SELECT 'goals' WHERE new.goals IS NOT old.goals
+                UNION ALL SELECT 'progress' WHERE new.progress IS NOT old.progress
+            );
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS change_log_goal_insert AFTER INSERT ON goals BEGIN
+            INSERT INTO change_log (user_id, entity, entity_id, op)
+            VALUES (new.user_id, 'goal', new.id, 'upsert');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS change_log_goal_update AFTER UPDATE ON goals BEGIN
+            INSERT INTO change_log (user_id, entity, entity_id, op)
+            VALUES (new.user_id, 'goal', new.id, 'upsert');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS change_log_goal_delete AFTER DELETE ON goals BEGIN
+            INSERT INTO change_log (user_id, entity, entity_id, op)
+            VALUES (old.user_id, 'goal', old.id, 'delete');
+        END
+    """)
+
+
+def _catalog_version(cursor: sqlite3.Cursor):
+    # Bumped by every course write, so each worker can cheaply tell when its catalog snapshot is stale
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS catalog_version_{event.lower()} AFTER {event} ON courses BEGIN
+                UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            END
+        """)
+
+
+def _change_log_retention(cursor: sqlite3.Cursor):
+    # Highest pruned seq per user: a cursor below it has missed changes and gets a full resync
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log_pruned (
+            user_id TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON change_log (changed_at)")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _initial_schema),
+    Migration(2, "course full-text search index", _course_search_index),
+    Migration(3, "secondary indexes", _secondary_indexes),
+    Migration(4, "change log for delta sync", _change_log),
+    Migration(5, "course catalog version stamp", _catalog_version),
+    Migration(6, "change log retention", _change_log_retention),
+]
+
+
+def _ensure_version_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration version (0 for a new database)"""
+    _ensure_version_table(conn)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(pool, migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    """Apply pending migrations in order, returning the versions applied.
+
+    The version is re-read after taking the write lock, so several workers
+    starting at once apply each migration exactly once.
+    """
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        with pool.writer(grouped=False) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if current_version(conn) >= migration.version:
+                continue
+            migration.apply(conn.cursor())
+            conn.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (migration.version, migration.name),
+            )
+        logger.info("Applied migration %s: %s", migration.version, migration.name)
+        applied.append(migration.version)
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply SQLite schema migrations")
+    parser.add_argument("--status", action="store_true", help="show versions without migrating")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    from app.database.database_adapter import db
+    if not db.use_sqlite:
+        print("Not using SQLite; the Supabase schema lives in supabase/schema.sql")
+        return
+
+    # Opening the adapter already applied pending migrations
+    with db.pool.reader() as conn:
+        version = current_version(conn)
+        rows = conn.execute("SELECT version, name, applied_at FROM schema_version ORDER BY version").fetchall()
+    if args.status:
+        for row in rows:
+            print(f"{row['version']:>4}  {row['name']}  (applied {row['applied_at']})")
+    pending = [m for m in MIGRATIONS if m.version > version]
+    for migration in pending:
+        print(f"{migration.version:>4}  {migration.name}  (pending)")
+    print(f"{db.db_path}: schema version {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Keyset pagination cursors and field projection for list queries
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a field projection names unknown fields"""
+
+
+def encode_cursor(key: List[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor`` holding ``size`` values"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if not isinstance(key, list) or len(key) != size:
+        raise InvalidCursorError("Invalid pagination cursor")
+    return key
+
+
+def select_columns(
+    fields: Optional[str], allowed: Sequence[str], keys: Sequence[str]
+) -> Tuple[List[str], Optional[List[str]]]:
+    """Resolve a comma-separated ``fields=`` projection.
+
+    Returns the columns to select (the requested fields plus the sort keys the
+    cursor is built from) and the requested fields, or None for all fields.
+    """
+    if not fields:
+        return list(allowed), None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown or not requested:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown) or fields}")
+    return list(dict.fromkeys(requested + list(keys))), requested
+
+
+def keyset_page(
+    rows: List[Dict[str, Any]],
+    limit: int,
+    keys: Sequence[str],
+    requested: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Build a page from up to ``limit + 1`` rows fetched in sort-key order"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][key] for key in keys])
+    if requested is not None:
+        rows = [{field: row[field] for field in requested} for row in rows]
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,149 @@
+"""
+Query plan check: fail if an adapter query scans a whole table
+
+Runs every SQLite adapter operation against a scratch database, records the
+SQL it issues, and runs EXPLAIN QUERY PLAN on each statement. Any full scan
+of a real table, other than the ones listed in ``ALLOWED_FULL_SCANS``, is
+reported and the command exits non-zero.
+
+    python -m app.database.query_plans
+"""
+from typing import Callable, Dict, List, Tuple
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import uuid
+
+os.environ["USE_SQLITE"] = "true"
+os.environ.setdefault(
+    "SQLITE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="lma-plans-"), "plans.db")
+)
+
+from app.database.database_adapter import DatabaseAdapter  # noqa: E402
+from app.database.pagination import encode_cursor  # noqa: E402
+from app.database.tracing import traced_adapter  # noqa: E402
+
+# Operations that read every row by design, with the reason
+ALLOWED_FULL_SCANS = {
+    "get_courses": "returns the whole catalog (served from the snapshot)",
+    "search_courses(no filters)": "facet counts cover the whole catalog",
+    "search_courses(tag)": "tags are a JSON array; matched with json_each per course",
+}
+
+SQL_KEYWORDS = {"WHERE", "JOIN", "ON", "ORDER", "GROUP", "LIMIT", "LEFT", "INNER", "SET", "UNION"}
+
+
+def scenario(adapter: DatabaseAdapter) -> List[Tuple[str, Callable[[], object]]]:
+    """Every adapter operation that touches SQLite, labelled by name"""
+    user_id, goal_id = str(uuid.uuid4()), str(uuid.uuid4())
+    goal = {"id": goal_id, "user_id": user_id, "title": "t", "sdg_ids": ["1"]}
+    course = {"id": "plan-course", "title": "Query plans", "category": "c", "level": "l", "tags": ["t"]}
+    return [
+        ("create_user", lambda: adapter.create_user(user_id, f"{user_id}@example.com", "P", "x")),
+        ("get_user_by_email", lambda: adapter.get_user_by_email(f"{user_id}@example.com")),
+        ("get_user_by_id", lambda: adapter._load_user_by_id(user_id)),
+        ("update_user", lambda: adapter.update_user(user_id, {"name": "Q"})),
+        ("update_user(preference_keys)", lambda: adapter.update_user(user_id, {"name": "Q"}, preference_keys={"a": None})),
+        ("patch_user_preferences", lambda: adapter.patch_user_preferences(user_id, {"theme": "dark"})),
+        ("get_user_password_hash", lambda: adapter.get_user_password_hash(user_id)),
+        ("update_user_password_hash", lambda: adapter.update_user_password_hash(user_id, "y")),
+        ("create_goal", lambda: adapter.create_goal(dict(goal))),
+        ("create_goal", lambda: adapter.create_goal(dict(goal, id=str(uuid.uuid4())))),
+        ("get_user_goals", lambda: adapter._load_user_goals(user_id)),
+        ("get_user_goals_page", lambda: adapter.get_user_goals_page(user_id, 1)),
+        ("get_user_goals_page(after)", lambda: adapter.get_user_goals_page(
+            user_id, 1, adapter.get_user_goals_page(user_id, 1)["next_cursor"]
+        )),
+        ("get_goal_by_id", lambda: adapter.get_goal_by_id(goal_id)),
+        ("update_goal", lambda: adapter.update_goal(goal_id, {"progress": 1})),
+        ("update_goal(owner)", lambda: adapter.update_goal(goal_id, {"progress": 1}, user_id)),
+        ("flush_progress", lambda: adapter._write_progress({goal_id: (user_id, 3)}, {user_id: []})),
+        ("upsert_courses", lambda: adapter.upsert_courses([course, dict(course, id="plan-2")])),
+        ("get_courses", adapter.get_courses),
+        ("get_catalog_version", adapter.get_catalog_version),
+        ("get_course", lambda: adapter.get_course("plan-course")),
+        ("get_courses_page", lambda: adapter.get_courses_page(1)),
+        ("get_courses_page(after)", lambda: adapter.get_courses_page(
+            1, adapter.get_courses_page(1)["next_cursor"]
+        )),
+        ("search_courses(text)", lambda: adapter.search_courses("query")),
+        ("search_courses(text, filters)", lambda: adapter.search_courses("query", "c", "l", "t")),
+        ("search_courses(category)", lambda: adapter.search_courses(category="c")),
+        ("search_courses(level)", lambda: adapter.search_courses(level="l")),
+        ("search_courses(tag)", lambda: adapter.search_courses(tag="t")),
+        ("search_courses(no filters)", lambda: adapter.search_courses()),
+        ("apply_goal_batch", lambda: adapter.apply_goal_batch(user_id, [
+            {"op": "create", "goal": {"title": "b"}},
+            {"op": "update", "id": goal_id, "changes": {"progress": 2}},
+            {"op": "delete", "id": "missing"},
+        ])),
+        ("delete_goal(other user)", lambda: adapter.delete_goal(goal_id, "someone-else")),
+        ("delete_goal", lambda: adapter.delete_goal(goal_id, user_id)),
+        ("get_changes", lambda: adapter.get_changes(user_id)),
+        ("get_changes(since)", lambda: adapter.get_changes(user_id, encode_cursor([0]))),
+        ("prune_change_log", lambda: adapter.prune_change_log(30)),
+    ]
+
+
+def _aliases(sql: str) -> Dict[str, str]:
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.I):
+        aliases[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn: sqlite3.Connection, sql: str, tables: set) -> List[str]:
+    """Tables that a statement reads without using an index"""
+    aliases = _aliases(sql)
+    scans = []
+    for _, _, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall():
+        match = re.fullmatch(r"SCAN (\w+)", detail)
+        if match and aliases.get(match.group(1), match.group(1)) in tables:
+            scans.append(aliases.get(match.group(1), match.group(1)))
+    return scans
+
+
+def check_query_plans(db_path: str) -> List[str]:
+    """Run the scenario against ``db_path`` and describe each unexpected full scan"""
+    statements: List[str] = []
+    adapter = traced_adapter(db_path, statements)
+    explain = sqlite3.connect(db_path)
+    tables = {
+        row[0] for row in explain.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'"
+        )
+    }
+
+    problems = []
+    try:
+        for name, operation in scenario(adapter):
+            statements.clear()
+            operation()
+            for sql in list(statements):
+                if not re.match(r"\s*(SELECT|WITH|UPDATE|DELETE|INSERT)", sql, re.I):
+                    continue
+                scans = full_scans(explain, sql, tables)
+                if scans and name not in ALLOWED_FULL_SCANS:
+                    problems.append(f"{name}: full scan of {', '.join(scans)}\n    {' '.join(sql.split())}")
+    finally:
+        explain.close()
+        adapter.shutdown()
+    return problems
+
+
+def main():
+    problems = check_query_plans(os.environ["SQLITE_DB_PATH"])
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"{len(problems)} adapter queries scan a whole table")
+        sys.exit(1)
+    print("No unexpected full table scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Bulk import of the course catalog from a JSON file
+
+    python -m app.database.seed_courses courses.json [--batch-size 500]
+
+The file holds a list of courses (or ``{"courses": [...]}``) using the
+``courses`` table columns; ``lessons`` and ``tags`` are lists. Existing
+courses with the same id are replaced.
+"""
+import argparse
+import json
+from typing import Any, Dict, List
+
+from app.database.database_adapter import db
+
+
+def seed_courses(courses: List[Dict[str, Any]], batch_size: int = 500) -> int:
+    """Upsert courses in batches, returning how many were written"""
+    written = 0
+    for start in range(0, len(courses), batch_size):
+        written += db.upsert_courses(courses[start:start + batch_size])
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import courses from a JSON file")
+    parser.add_argument("path", help="JSON file with a list of courses")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        data = json.load(f)
+    courses = data["courses"] if isinstance(data, dict) else data
+
+    written = seed_courses(courses, args.batch_size)
+    print(f"Imported {written} courses into {'sqlite' if db.use_sqlite else 'supabase'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Slow-query log for the SQLite adapter
+"""
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.I)
+ADAPTER_FILES = ("database_adapter.py", "course_search.py", "migrations.py")
+
+
+def params_shape(params: Any, many: int = 0) -> str:
+    """Describe bound parameters by type only; values are never logged"""
+    if isinstance(params, dict):
+        shape = "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    else:
+        shape = "(" + ", ".join(type(value).__name__ for value in params or ()) + ")"
+    return f"{many} x {shape}" if many else shape
+
+
+def _caller() -> str:
+    """The adapter function that issued the statement, e.g. ``get_user_goals_page``"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        if os.path.basename(frame.f_code.co_filename) in ADAPTER_FILES:
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "unknown"
+
+
+class SlowQueryLog:
+    """Records SQLite statements that take at least ``threshold_ms``.
+
+    Each entry has the SQL text, the shape of its parameters, the duration
+    (execution plus fetching), the adapter function that issued it and the
+    EXPLAIN QUERY PLAN output. Entries are logged, and the latest ``keep``
+    are reported by ``GET /health``. A threshold of 0 disables the log.
+    """
+
+    def __init__(self, threshold_ms: float, explain: bool = True, keep: int = 50):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def _plan(self, conn: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+        try:
+            rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+            return [row[3] for row in rows]
+        except sqlite3.Error as e:
+            return [f"(EXPLAIN QUERY PLAN failed: {e})"]
+
+    def record(self, conn: sqlite3.Connection, sql: str, params: Any, elapsed: float, many: int = 0):
+        """Log one slow statement"""
+        plan = self._plan(conn, sql, params) if self.explain and EXPLAINABLE.match(sql) else []
+        entry = {
+            "at": time.time(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "caller": _caller(),
+            "sql": " ".join(sql.split()),
+            "params": params_shape(params, many),
+            "plan": plan,
+        }
+        with self._lock:
+            self._count += 1
+            self._recent.append(entry)
+        logger.warning(
+            "Slow query (%.1fms in %s, params %s): %s%s",
+            entry["duration_ms"], entry["caller"], entry["params"], entry["sql"],
+            "".join(f"\n    {line}" for line in plan),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Threshold, count and the most recent slow statements"""
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "count": self._count,
+                "recent": list(self._recent),
+            }
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that times each statement, including its fetch calls.
+
+    The statement is reported once, when its accumulated time first reaches
+    the threshold. Rows read by iterating the cursor aren't timed; the
+    adapter always uses ``fetchone``/``fetchall``.
+    """
+
+    _sql: Optional[str] = None
+    _params: Any = ()
+    _many = 0
+    _elapsed = 0.0
+    _reported = False
+
+    def _start(self, sql: str, params: Any, many: int = 0):
+        self._sql, self._params, self._many = sql, params, many
+        self._elapsed, self._reported = 0.0, False
+
+    def _add(self, elapsed: float):
+        self._elapsed += elapsed
+        if not self._reported and self._elapsed >= slow_query_log.threshold and self._sql:
+            self._reported = True
+            first = self._params[0] if self._many and self._params else self._params
+            slow_query_log.record(self.connection, self._sql, first, self._elapsed, self._many)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        self._start(sql, parameters)
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._add(time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any):
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        self._start(sql, seq_of_parameters, len(seq_of_parameters))
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._add(time.perf_counter() - started)
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - started)
+        return row
+
+    def fetchmany(self, size: int = 1):
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add(time.perf_counter() - started)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - started)
+        return rows
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose statements go through TimedCursor (pass as ``factory``)"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# Global slow-query log
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_EXPLAIN)
+
+
+def connection_factory() -> type:
+    """The sqlite3 connection class for the pool: timed only when the log is enabled"""
+    return TimedConnection if slow_query_log.enabled else sqlite3.Connection
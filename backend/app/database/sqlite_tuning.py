@@ -0,0 +1,130 @@
+"""
+SQLite pragma profile and WAL checkpoint management
+"""
+from typing import Dict, Any, Optional
+from pathlib import Path
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def pragma_profile() -> Dict[str, Any]:
+    """Build the connect-time pragma profile from settings"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_size_limit": settings.SQLITE_WAL_SIZE_LIMIT,
+    }
+
+
+def apply_pragmas(conn: sqlite3.Connection, profile: Dict[str, Any]):
+    """Apply a pragma profile to a freshly opened connection.
+
+    ``busy_timeout`` goes first so that switching the journal mode waits for
+    other connections instead of failing with "database is locked".
+    """
+    ordered = sorted(profile.items(), key=lambda item: item[0] != "busy_timeout")
+    for name, value in ordered:
+        if value is None or value == "":
+            continue
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+class CheckpointManager:
+    """Background thread that keeps the WAL file bounded.
+
+    Every ``interval`` seconds it runs a PASSIVE checkpoint, which never blocks
+    readers or writers. When the -wal file has grown past ``wal_size_limit``
+    it escalates to a TRUNCATE checkpoint so the file shrinks back to zero.
+    """
+
+    def __init__(self, pool, interval: float, wal_size_limit: int):
+        self.pool = pool
+        self.interval = interval
+        self.wal_size_limit = wal_size_limit
+        self.wal_path = Path(f"{pool.database}-wal")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats = {
+            "checkpoints": 0,
+            "truncations": 0,
+            "errors": 0,
+            "last_busy": None,
+            "last_log_frames": None,
+            "last_checkpointed_frames": None,
+            "last_duration_ms": None,
+        }
+
+    def wal_size(self) -> int:
+        """Current size of the -wal file in bytes"""
+        try:
+            return self.wal_path.stat().st_size
+        except OSError:
+            return 0
+
+    def checkpoint(self, mode: Optional[str] = None):
+        """Run one checkpoint, choosing TRUNCATE when the WAL is oversized"""
+        if mode is None:
+            mode = "TRUNCATE" if self.wal_size() > self.wal_size_limit else "PASSIVE"
+        if self._conn is None:
+            self._conn = self.pool.connect()
+
+        started = time.perf_counter()
+        busy, log_frames, checkpointed = self._conn.execute(
+            f"PRAGMA wal_checkpoint({mode})"
+        ).fetchone()
+        self._stats["checkpoints"] += 1
+        if mode == "TRUNCATE":
+            self._stats["truncations"] += 1
+        self._stats["last_busy"] = busy
+        self._stats["last_log_frames"] = log_frames
+        self._stats["last_checkpointed_frames"] = checkpointed
+        self._stats["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.checkpoint()
+            except sqlite3.Error as e:
+                self._stats["errors"] += 1
+                logger.error("WAL checkpoint error: %s", e)
+
+    def start(self):
+        """Start the checkpoint thread (no-op when disabled or already running)"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sqlite-checkpoint", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread and truncate the WAL one last time"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.checkpoint("TRUNCATE")
+        except sqlite3.Error as e:
+            logger.error("WAL checkpoint error: %s", e)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of checkpoint counters plus the current WAL size"""
+        snapshot = dict(self._stats)
+        snapshot["wal_size_bytes"] = self.wal_size()
+        return snapshot
@@ -2,6 +2,7 @@
 Supabase client initialization and utilities
 """
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
 from app.core.config import settings
 from typing import Optional
 
@@ -28,3 +29,26 @@ def get_supabase_service_client() -> Client:
         )
     return _supabase_service_client
 
+
+_async_postgrest_client: Optional[AsyncPostgrestClient] = None
+
+def get_async_postgrest_client() -> AsyncPostgrestClient:
+    """Get async PostgREST client with service role key (admin access)"""
+    global _async_postgrest_client
+    if _async_postgrest_client is None:
+        key = settings.SUPABASE_SERVICE_ROLE_KEY
+        _async_postgrest_client = AsyncPostgrestClient(
+            f"{settings.SUPABASE_URL}/rest/v1",
+            headers={
+                "apiKey": key,
+                "Authorization": f"Bearer {key}",
+            },
+        )
+    return _async_postgrest_client
+
+async def close_async_postgrest_client():
+    """Close the async PostgREST client's HTTP connections"""
+    global _async_postgrest_client
+    if _async_postgrest_client is not None:
+        await _async_postgrest_client.aclose()
+        _async_postgrest_client = None
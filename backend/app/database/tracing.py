@@ -0,0 +1,32 @@
+"""
+Adapters that record every SQL statement they issue
+"""
+from typing import List
+import sqlite3
+
+from app.database.connection_pool import SQLiteConnectionPool
+from app.database.database_adapter import DatabaseAdapter
+from app.database.sqlite_tuning import CheckpointManager, apply_pragmas, pragma_profile
+
+
+def traced_adapter(db_path: str, statements: List[str], size: int = 1) -> DatabaseAdapter:
+    """A SQLite adapter on ``db_path`` whose pool appends each executed statement to ``statements``.
+
+    Used by the query plan check and the statement-counting benchmarks, so
+    both see the same connections (pragmas applied, trace callback set).
+    """
+    profile = pragma_profile()
+
+    def on_connect(conn: sqlite3.Connection):
+        apply_pragmas(conn, profile)
+        conn.set_trace_callback(statements.append)
+
+    adapter = DatabaseAdapter(db_path=db_path)
+    adapter.pool.close()
+    adapter.pool = SQLiteConnectionPool(db_path, size=size, on_connect=on_connect)
+    # The checkpointer was built on the closed pool; rebind it (not started yet)
+    checkpointer = adapter.checkpointer
+    adapter.checkpointer = CheckpointManager(
+        adapter.pool, interval=checkpointer.interval, wal_size_limit=checkpointer.wal_size_limit
+    )
+    return adapter
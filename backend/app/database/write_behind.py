@@ -0,0 +1,163 @@
+"""
+Write-behind buffer for high-frequency progress updates
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from app.core.cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    """Coalesces goal progress and user progress updates in memory.
+
+    ``put_goal``/``put_user`` replace any pending value for the same goal or
+    user, so a burst of updates costs one write when flushed. ``flush`` is
+    called every ``interval`` seconds by a background thread, when more than
+    ``max_pending`` entries are waiting, and on shutdown; it receives the
+    pending ``{goal_id: (user_id, progress)}`` and ``{user_id: progress}``
+    maps and writes them. Entries are dropped only once written, and only if
+    no newer value arrived meanwhile, so readers overlaying pending values
+    (``goal``/``user``) never see an older value than the last update.
+
+    Buffered values live in this worker only until flushed: other workers
+    see them up to ``interval`` seconds late, and a crash loses them.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Dict[str, Tuple[str, Any]], Dict[str, Any]], None],
+        interval: float,
+        max_pending: int = 10000,
+    ):
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self._goals: Dict[str, Tuple[str, Any]] = {}
+        self._users: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats = {
+            "updates": 0,
+            "flushes": 0,
+            "rows_written": 0,
+            "errors": 0,
+            "last_flush_ms": None,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def put_goal(self, goal_id: str, user_id: str, progress: Any):
+        """Buffer a goal's new progress"""
+        with self._lock:
+            self._goals[goal_id] = (user_id, progress)
+            self._stats["updates"] += 1
+            full = len(self._goals) + len(self._users) > self.max_pending
+        if full:
+            self.flush()
+
+    def put_user(self, user_id: str, progress: Any):
+        """Buffer a user's new progress blob"""
+        with self._lock:
+            self._users[user_id] = progress
+            self._stats["updates"] += 1
+            full = len(self._goals) + len(self._users) > self.max_pending
+        if full:
+            self.flush()
+
+    def goal(self, goal_id: str) -> Any:
+        """Pending progress for a goal, or MISSING"""
+        entry = self._goals.get(goal_id)
+        return MISSING if entry is None else entry[1]
+
+    def user(self, user_id: str) -> Any:
+        """Pending progress blob for a user, or MISSING"""
+        return self._users.get(user_id, MISSING)
+
+    def has_pending(self) -> bool:
+        return bool(self._goals or self._users)
+
+    def discard_goal(self, goal_id: str, progress: Any = MISSING):
+        """Drop a goal's pending progress (only if still ``progress``, when given)"""
+        with self._lock:
+            entry = self._goals.get(goal_id)
+            if entry is not None and (progress is MISSING or entry[1] is progress):
+                del self._goals[goal_id]
+
+    def discard_user(self, user_id: str, progress: Any = MISSING):
+        """Drop a user's pending progress (only if still ``progress``, when given)"""
+        with self._lock:
+            if user_id in self._users and (progress is MISSING or self._users[user_id] is progress):
+                del self._users[user_id]
+
+    def flush(self, user_id: Optional[str] = None) -> int:
+        """Write pending entries (all, or one user's), returning how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                goals = {
+                    goal_id: entry for goal_id, entry in self._goals.items()
+                    if user_id is None or entry[0] == user_id
+                }
+                users = {
+                    uid: progress for uid, progress in self._users.items()
+                    if user_id is None or uid == user_id
+                }
+            if not goals and not users:
+                return 0
+            started = time.perf_counter()
+            self._flush(goals, users)
+            with self._lock:
+                for goal_id, entry in goals.items():
+                    if self._goals.get(goal_id) is entry:
+                        del self._goals[goal_id]
+                for uid, progress in users.items():
+                    if uid in self._users and self._users[uid] is progress:
+                        del self._users[uid]
+                self._stats["flushes"] += 1
+                self._stats["rows_written"] += len(goals) + len(users)
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            return len(goals) + len(users)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.exception("Progress flush error: %s", e)
+
+    def start(self):
+        """Start the flush thread (no-op when disabled or already running)"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread and write everything still pending"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.exception("Progress flush error: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Update/flush counters plus what is pending now"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["pending_goals"] = len(self._goals)
+            snapshot["pending_users"] = len(self._users)
+        snapshot["interval"] = self.interval
+        return snapshot
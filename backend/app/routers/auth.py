@@ -1,15 +1,24 @@
 """
 Authentication routes for user signup, login, and token management
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr
-from app.database.database_adapter import db
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.database.async_adapter import async_db
+from app.core.security import (
+    create_access_token,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
+    PasswordHasherBusy,
+)
 from app.core.dependencies import get_current_user
 from datetime import timedelta
 from app.core.config import settings
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class UserSignup(BaseModel):
@@ -26,11 +35,30 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
     user: dict
 
+def raise_auth_busy():
+    """Reject the request with 429 when the password hashing pool is saturated"""
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+async def rehash_password(user_id: str, password: str):
+    """Re-hash a password with the configured bcrypt cost after a successful login"""
+    try:
+        password_hash = await get_password_hash_async(password)
+        await async_db.update_user_password_hash(user_id, password_hash)
+    except PasswordHasherBusy:
+        # Pool is saturated; the hash will be upgraded on a later login
+        pass
+    except Exception as e:
+        logger.exception("Password rehash error: %s", e)
+
 @router.post("/signup", response_model=TokenResponse)
 async def signup(user_data: UserSignup):
     """Create a new user account"""
     # Check if user already exists
-    existing_user = db.get_user_by_email(user_data.email)
+    existing_user = await async_db.get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,7 +70,7 @@ async def signup(user_data: UserSignup):
         user_id = str(uuid.uuid4())
         
         # Hash password
-        password_hash = get_password_hash(user_data.password)
+        password_hash = await get_password_hash_async(user_data.password)
         
         # Create user profile
         profile_data = {
@@ -75,14 +103,14 @@ async def signup(user_data: UserSignup):
         }
         
         # Create user in database
-        if db.use_sqlite:
+        if async_db.use_sqlite:
             # For SQLite, store password hash
-            db.create_user(user_id, user_data.email, user_data.name, password_hash)
+            await async_db.create_user(user_id, user_data.email, user_data.name, password_hash)
         else:
             # For Supabase, use Supabase Auth
             from app.database.supabase_client import get_supabase_client
             supabase = get_supabase_client()
-            auth_response = supabase.auth.sign_up({
+            auth_response = await async_db.run_blocking(supabase.auth.sign_up, {
                 "email": user_data.email,
                 "password": user_data.password,
             })
@@ -94,7 +122,7 @@ async def signup(user_data: UserSignup):
                 )
             
             user_id = auth_response.user.id
-            db.create_user(user_id, user_data.email, user_data.name, "")
+            await async_db.create_user(user_id, user_data.email, user_data.name, "")
         
         # Create access token
         access_token = create_access_token(
@@ -113,6 +141,8 @@ async def signup(user_data: UserSignup):
         
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise_auth_busy()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -120,12 +150,12 @@ async def signup(user_data: UserSignup):
         )
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, background_tasks: BackgroundTasks):
     """Authenticate user and return access token"""
     try:
-        if db.use_sqlite:
+        if async_db.use_sqlite:
             # SQLite authentication
-            user = db.get_user_by_email(credentials.email)
+            user = await async_db.get_user_by_email(credentials.email)
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -133,19 +163,21 @@ async def login(credentials: UserLogin):
                 )
             
             # Verify password
-            password_hash = db.get_user_password_hash(user["id"])
-            if not password_hash or not verify_password(credentials.password, password_hash):
+            password_hash = await async_db.get_user_password_hash(user["id"])
+            if not password_hash or not await verify_password_async(credentials.password, password_hash):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid email or password"
                 )
             
             user_id = user["id"]
+            if password_needs_rehash(password_hash):
+                background_tasks.add_task(rehash_password, user_id, credentials.password)
         else:
             # Supabase authentication
             from app.database.supabase_client import get_supabase_client
             supabase = get_supabase_client()
-            auth_response = supabase.auth.sign_in_with_password({
+            auth_response = await async_db.run_blocking(supabase.auth.sign_in_with_password, {
                 "email": credentials.email,
                 "password": credentials.password,
             })
@@ -157,7 +189,7 @@ async def login(credentials: UserLogin):
                 )
             
             user_id = auth_response.user.id
-            user = db.get_user_by_id(user_id)
+            user = await async_db.get_user_by_id(user_id)
             
             if not user:
                 raise HTTPException(
@@ -183,6 +215,8 @@ async def login(credentials: UserLogin):
         
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise_auth_busy()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,27 +1,107 @@
 """
 Course-related routes
 """
-from fastapi import APIRouter, Depends
-from app.core.dependencies import get_supabase
-from app.database.supabase_client import Client
+from typing import Callable, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from app.database.async_adapter import async_db
+from app.database.course_catalog import course_catalog, CatalogSnapshot
+from app.core.compression import available_encodings, negotiate, weak_etag
+from app.core.config import settings
+from app.database.pagination import InvalidCursorError, InvalidFieldsError
 
 router = APIRouter()
 
+COMPRESSION_ENCODINGS = available_encodings(settings.compression_encodings_list)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def etag_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    compressed: Optional[Callable[[str], bytes]] = None,
+) -> Response:
+    """Serve a pre-encoded JSON body, or 304 if the client already has it.
+
+    ``compressed`` returns the body precompressed for an encoding, so large
+    bodies are sent compressed without the middleware recompressing them.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if compressed and len(body) >= settings.COMPRESSION_MINIMUM_SIZE:
+        encoding = negotiate(request.headers.get("accept-encoding", ""), COMPRESSION_ENCODINGS)
+        if encoding:
+            body = compressed(encoding)
+            headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding", "ETag": weak_etag(etag)})
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def get_snapshot() -> CatalogSnapshot:
+    """Get the catalog snapshot, loading it off the event loop if needed"""
+    snapshot = course_catalog.current
+    if snapshot is None:
+        snapshot = await async_db.run_blocking(course_catalog.snapshot)
+    return snapshot
+
 @router.get("/")
-async def get_courses(supabase: Client = Depends(get_supabase)):
-    """Get all available courses"""
+async def get_courses(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Get all available courses.
+
+    The full catalog is served from the snapshot; ``limit``, ``after`` or
+    ``fields`` fetch one page (``{"items", "next_cursor"}``) from the database.
+    """
+    if limit is None and after is None and fields is None:
+        snapshot = await get_snapshot()
+        return etag_response(request, snapshot.body, snapshot.etag, snapshot.compressed)
+    try:
+        # Returned as a response so stored JSON columns pass through unparsed
+        return ORJSONResponse(await async_db.get_courses_page(
+            limit or settings.DEFAULT_PAGE_SIZE, after, fields, raw_json=True
+        ))
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/search")
+async def search_courses(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    level: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = None,
+):
+    """Search courses by text, with category/level/tag filters and facet counts"""
     try:
-        response = supabase.table("courses").select("*").execute()
-        return response.data
-    except Exception as e:
-        return []  # Return empty list if courses table doesn't exist yet
+        return ORJSONResponse(await async_db.search_courses(
+            q, category, level, tag, limit, after, raw_json=True
+        ))
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 @router.get("/{course_id}")
-async def get_course(course_id: str, supabase: Client = Depends(get_supabase)):
+async def get_course(course_id: str, request: Request):
     """Get a specific course by ID"""
-    try:
-        response = supabase.table("courses").select("*").eq("id", course_id).single().execute()
-        return response.data
-    except Exception as e:
+    snapshot = await get_snapshot()
+    entry = snapshot.by_id.get(course_id)
+    if entry is None:
         return None
-
+    _, body, etag = entry
+    return etag_response(request, body, etag)
@@ -1,11 +1,14 @@
 """
 Goal management routes
 """
-from fastapi import APIRouter, HTTPException, status, Depends
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Dict, Any, Literal, Optional
+from app.core.config import settings
 from app.core.dependencies import get_current_user
-from app.database.database_adapter import db
+from app.database.async_adapter import async_db
+from app.database.pagination import InvalidCursorError, InvalidFieldsError
 import uuid
 
 router = APIRouter()
@@ -24,14 +27,63 @@ class GoalUpdate(BaseModel):
     progress: Optional[int] = None
     completed: Optional[bool] = None
 
+class GoalBatchOp(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    goal: Optional[GoalCreate] = None
+    changes: Optional[GoalUpdate] = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op == "create" and self.goal is None:
+            raise ValueError("create ops need a goal")
+        if self.op == "update" and (self.id is None or self.changes is None):
+            raise ValueError("update ops need an id and changes")
+        if self.op == "delete" and self.id is None:
+            raise ValueError("delete ops need an id")
+        return self
+
+class GoalBatch(BaseModel):
+    ops: List[GoalBatchOp] = Field(..., min_length=1, max_length=settings.GOAL_BATCH_MAX_OPS)
+
+def goal_from_create(goal: GoalCreate, user_id: str, goal_id: Optional[str] = None) -> Dict[str, Any]:
+    """Map the API's goal fields onto a goals row"""
+    return {
+        "id": goal_id or str(uuid.uuid4()),
+        "user_id": user_id,
+        "title": goal.title,
+        "description": goal.description,
+        "virtue_id": goal.learningStyleId,
+        "sdg_ids": goal.sdgIds,
+        "progress": goal.progress,
+        "completed": goal.completed,
+        "target": 1
+    }
+
 @router.get("/")
 async def get_goals(
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all goals for current user"""
+    """Get goals for current user.
+
+    Returns every goal as a list, or one page (``{"items", "next_cursor"}``)
+    when ``limit``, ``after`` or ``fields`` is given.
+    """
     try:
-        goals = db.get_user_goals(current_user["id"])
-        return goals
+        if limit is None and after is None and fields is None:
+            return await async_db.get_user_goals(current_user["id"])
+        # Returned as a response so stored JSON columns pass through unparsed
+        return ORJSONResponse(await async_db.get_user_goals_page(
+            current_user["id"], limit or settings.DEFAULT_PAGE_SIZE, after, fields, raw_json=True
+        ))
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -45,19 +97,8 @@ async def create_goal(
 ):
     """Create a new goal"""
     try:
-        new_goal = {
-            "id": str(uuid.uuid4()),
-            "user_id": current_user["id"],
-            "title": goal.title,
-            "description": goal.description,
-            "virtue_id": goal.learningStyleId,
-            "sdg_ids": goal.sdgIds,
-            "progress": goal.progress,
-            "completed": goal.completed,
-            "target": 1
-        }
-        
-        created_goal = db.create_goal(new_goal)
+        new_goal = goal_from_create(goal, current_user["id"])
+        created_goal = await async_db.create_goal(new_goal)
         return created_goal
     except Exception as e:
         raise HTTPException(
@@ -65,6 +106,45 @@ async def create_goal(
             detail=f"Error creating goal: {str(e)}"
         )
 
+@router.post("/batch")
+async def batch_goals(
+    batch: GoalBatch,
+    current_user: dict = Depends(get_current_user)
+):
+    """Apply many goal creates/updates/deletes at once (e.g. after offline use).
+
+    Returns one result per op, in order: ``{"op", "id", "status", "goal"}``
+    where status is created, updated, deleted, not_found, forbidden or conflict.
+    """
+    try:
+        ops = []
+        for op in batch.ops:
+            if op.op == "create":
+                ops.append({"op": "create", "goal": goal_from_create(op.goal, current_user["id"], op.id)})
+            elif op.op == "update":
+                ops.append({"op": "update", "id": op.id, "changes": op.changes.dict(exclude_unset=True)})
+            else:
+                ops.append({"op": "delete", "id": op.id})
+        results = await async_db.apply_goal_batch(current_user["id"], ops)
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error applying goal batch: {str(e)}"
+        )
+
+async def raise_goal_miss(goal_id: str, forbidden_detail: str):
+    """Raise 404 or 403 for a goal mutation that matched no row"""
+    if not await async_db.get_goal_by_id(goal_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Goal not found"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=forbidden_detail
+    )
+
 @router.put("/{goal_id}")
 async def update_goal(
     goal_id: str,
@@ -73,22 +153,11 @@ async def update_goal(
 ):
     """Update a goal"""
     try:
-        # Verify goal belongs to user
-        goal = db.get_goal_by_id(goal_id)
-        if not goal:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Goal not found"
-            )
-        
-        if goal.get("user_id") != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this goal"
-            )
-        
+        # Ownership is checked by the UPDATE itself; only a miss needs a lookup
         updates = goal_update.dict(exclude_unset=True)
-        updated_goal = db.update_goal(goal_id, updates)
+        updated_goal = await async_db.update_goal(goal_id, updates, user_id=current_user["id"])
+        if not updated_goal:
+            await raise_goal_miss(goal_id, "Not authorized to update this goal")
         return updated_goal
     except HTTPException:
         raise
@@ -105,21 +174,8 @@ async def delete_goal(
 ):
     """Delete a goal"""
     try:
-        # Verify goal belongs to user
-        goal = db.get_goal_by_id(goal_id)
-        if not goal:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Goal not found"
-            )
-        
-        if goal.get("user_id") != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to delete this goal"
-            )
-        
-        db.delete_goal(goal_id)
+        if not await async_db.delete_goal(goal_id, user_id=current_user["id"]):
+            await raise_goal_miss(goal_id, "Not authorized to delete this goal")
         return {"message": "Goal deleted successfully"}
     except HTTPException:
         raise
@@ -0,0 +1,35 @@
+"""
+Delta sync routes
+"""
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from app.core.dependencies import get_current_user
+from app.database.async_adapter import async_db
+from app.database.pagination import InvalidCursorError
+
+router = APIRouter()
+
+@router.get("/")
+async def sync(
+    since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the profile fields and goals changed since a sync cursor.
+
+    Omit ``since`` for a full snapshot. Store the returned ``cursor`` and send
+    it as ``since`` on the next sync to receive only what changed, including
+    ``deleted_goal_ids`` for goals removed in the meantime.
+    """
+    try:
+        return ORJSONResponse(await async_db.get_changes(current_user["id"], since, raw_json=True))
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error syncing changes: {str(e)}"
+        )
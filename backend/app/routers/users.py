@@ -1,11 +1,12 @@
 """
 User profile management routes
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, Body, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from app.core.dependencies import get_current_user
-from app.database.database_adapter import db
+from app.database.async_adapter import async_db
 
 router = APIRouter()
 
@@ -15,27 +16,16 @@ class UserPreferencesUpdate(BaseModel):
 class UserProfileUpdate(BaseModel):
     name: Optional[str] = None
     preferences: Optional[Dict[str, Any]] = None
+    progress: Optional[List[Any]] = None
 
 @router.get("/me")
 async def get_current_user_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Get current user's profile"""
-    try:
-        user = db.get_user_by_id(current_user["id"])
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching profile: {str(e)}"
-        )
+    # get_current_user has already loaded (and cached) the profile; its
+    # stored JSON columns are spliced into the response without parsing
+    return ORJSONResponse(current_user)
 
 @router.put("/me")
 async def update_user_profile(
@@ -44,23 +34,25 @@ async def update_user_profile(
 ):
     """Update user profile"""
     try:
-        update_data = {}
+        updates = {}
         if profile_update.name:
-            update_data["name"] = profile_update.name
-        if profile_update.preferences:
-            # Merge preferences with existing ones
-            existing_user = db.get_user_by_id(current_user["id"])
-            existing_prefs = existing_user.get("preferences", {}) if existing_user else {}
-            existing_prefs.update(profile_update.preferences)
-            update_data["preferences"] = existing_prefs
-        
-        updated_user = db.update_user(current_user["id"], update_data)
+            updates["name"] = profile_update.name
+        if profile_update.progress is not None:
+            updates["progress"] = profile_update.progress
+        if updates or profile_update.preferences:
+            # Top-level preference keys are replaced (not merge-patched) in the same
+            # UPDATE as name/progress, so concurrent updates keep each other's keys
+            updated_user = await async_db.update_user(
+                current_user["id"], updates, raw_json=True, preference_keys=profile_update.preferences
+            )
+        else:
+            updated_user = await async_db.get_user_by_id(current_user["id"], raw_json=True)
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        return updated_user
+        return ORJSONResponse(updated_user)
     except HTTPException:
         raise
     except Exception as e:
@@ -76,15 +68,37 @@ async def update_user_preferences(
 ):
     """Update user preferences"""
     try:
-        updated_user = db.update_user(current_user["id"], {
+        updated_user = await async_db.update_user(current_user["id"], {
             "preferences": preferences_update.preferences
-        })
+        }, raw_json=True)
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        return updated_user
+        return ORJSONResponse(updated_user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating preferences: {str(e)}"
+        )
+
+@router.patch("/me/preferences")
+async def patch_user_preferences(
+    patch: Dict[str, Any] = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Merge-patch user preferences (RFC 7396) and return only the changed keys"""
+    try:
+        changed = await async_db.patch_user_preferences(current_user["id"], patch)
+        if changed is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return {"preferences": changed}
     except HTTPException:
         raise
     except Exception as e:
@@ -99,13 +113,13 @@ async def get_user_goals(
 ):
     """Get user's goals"""
     try:
-        user = db.get_user_by_id(current_user["id"])
+        user = await async_db.get_user_by_id(current_user["id"], raw_json=True)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        return user.get("goals", [])
+        return ORJSONResponse(user.get("goals", []))
     except HTTPException:
         raise
     except Exception as e:
@@ -121,15 +135,15 @@ async def update_user_goals(
 ):
     """Update user's goals"""
     try:
-        updated_user = db.update_user(current_user["id"], {
+        updated_user = await async_db.update_user(current_user["id"], {
             "goals": goals
-        })
+        }, raw_json=True)
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        return updated_user
+        return ORJSONResponse(updated_user)
     except HTTPException:
         raise
     except Exception as e:
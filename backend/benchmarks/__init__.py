@@ -0,0 +1,51 @@
+"""
+Benchmark scripts for the backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.bench_sqlite_pragmas``.
+Importing this package points ``SQLITE_DB_PATH`` at a scratch file so that
+benchmarks never touch ``local.db``.
+"""
+import os
+import tempfile
+
+os.environ.setdefault(
+    "SQLITE_DB_PATH",
+    os.path.join(tempfile.mkdtemp(prefix="lma-bench-"), "bench.db"),
+)
+
+
+def scratch_db(name: str) -> str:
+    """Return a fresh database path next to the benchmark scratch DB"""
+    path = os.path.join(os.path.dirname(os.environ["SQLITE_DB_PATH"]), name)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return path
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def start_server(app):
+    """Serve ``app`` with uvicorn on a free local port in a daemon thread.
+
+    Returns ``(server, thread, base_url)``; set ``server.should_exit = True``
+    and join the thread to stop it.
+    """
+    import socket
+    import threading
+    import time
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}"
@@ -0,0 +1,119 @@
+"""
+Request latency under concurrent load: blocking adapter calls vs async_db.
+
+Runs the app under uvicorn in a background thread. Workers hammer
+``GET /api/v1/goals/`` while a probe requests the cheap ``/`` endpoint every
+few milliseconds. With blocking database calls on the event loop the probe
+queues behind every query; with the async adapter it stays flat.
+
+    python -m benchmarks.bench_async_latency [--goals 200] [--workers 8] [--seconds 5]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from benchmarks import percentile, start_server
+import main
+from app.core import dependencies
+from app.core.security import create_access_token
+from app.database.async_adapter import async_db
+from app.database.database_adapter import db
+from app.routers import auth, goals, users
+
+PATCHED_MODULES = (dependencies, auth, goals, users)
+
+
+class InlineAdapter:
+    """Pre-async behaviour: synchronous adapter calls made on the event loop"""
+
+    def __init__(self, adapter):
+        self.adapter = adapter
+        self.use_sqlite = adapter.use_sqlite
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    def __getattr__(self, name):
+        fn = getattr(self.adapter, name)
+
+        async def call(*args, **kwargs):
+            return fn(*args, **kwargs)
+        return call
+
+
+def use_adapter(adapter):
+    for module in PATCHED_MODULES:
+        module.async_db = adapter
+
+
+def seed(goal_count: int) -> str:
+    user_id = str(uuid.uuid4())
+    db.create_user(user_id, f"{user_id}@example.com", "Bench", "x")
+    for i in range(goal_count):
+        db.create_goal({"user_id": user_id, "title": f"goal {i}", "sdg_ids": ["1", "4"]})
+    return create_access_token(data={"sub": user_id, "email": f"{user_id}@example.com"})
+
+
+async def run(base_url: str, token: str, workers: int, seconds: float) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.perf_counter() + seconds
+    probe_latencies = []
+    load_latencies = []
+    limits = httpx.Limits(max_connections=workers + 1)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        async def load():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/goals/", headers=headers)
+                response.raise_for_status()
+                load_latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(probe(), *(load() for _ in range(workers)))
+
+    return {
+        "probe_p50_ms": percentile(probe_latencies, 50) * 1000,
+        "probe_p99_ms": percentile(probe_latencies, 99) * 1000,
+        "goals_p50_ms": percentile(load_latencies, 50) * 1000,
+        "goals_p99_ms": percentile(load_latencies, 99) * 1000,
+        "goals_rps": len(load_latencies) / seconds,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--goals", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    token = seed(args.goals)
+    server, thread, base_url = start_server(main.app)
+    try:
+        for label, adapter in (("blocking", InlineAdapter(db)), ("async", async_db)):
+            use_adapter(adapter)
+            result = asyncio.run(run(base_url, token, args.workers, args.seconds))
+            print(
+                f"{label:>9}: / p50 {result['probe_p50_ms']:.1f}ms "
+                f"p99 {result['probe_p99_ms']:.1f}ms | "
+                f"goals p50 {result['goals_p50_ms']:.1f}ms "
+                f"p99 {result['goals_p99_ms']:.1f}ms {result['goals_rps']:.0f} req/s"
+            )
+    finally:
+        use_adapter(async_db)
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main_cli()
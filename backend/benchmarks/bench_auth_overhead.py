@@ -0,0 +1,56 @@
+"""
+Per-request overhead of the auth dependency with and without the token cache.
+
+Calls ``get_current_user`` directly with the same bearer token, the way a
+mobile client resends it on every request. The user cache is warm in both
+runs, so the difference is the JWT parse + HS256 signature check.
+
+    python -m benchmarks.bench_auth_overhead [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+import benchmarks  # noqa: F401  (points SQLITE_DB_PATH at a scratch file)
+from app.core import security
+from app.core.dependencies import get_current_user
+from app.core.security import create_access_token
+from app.database.database_adapter import db
+
+
+async def measure(credentials: HTTPAuthorizationCredentials, requests: int) -> float:
+    await get_current_user(credentials)  # warm the user cache
+    started = time.perf_counter()
+    for _ in range(requests):
+        await get_current_user(credentials)
+    return (time.perf_counter() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    db.create_user(user_id, f"{user_id}@example.com", "Bench", "x")
+    token = create_access_token(data={"sub": user_id, "email": f"{user_id}@example.com"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    cache_size = security.token_cache.maxsize
+    security.token_cache.maxsize = 0
+    security.token_cache.clear()
+    uncached = asyncio.run(measure(credentials, args.requests))
+
+    security.token_cache.maxsize = cache_size
+    cached = asyncio.run(measure(credentials, args.requests))
+
+    print(f"without token cache: {uncached * 1e6:.1f}us per request")
+    print(f"   with token cache: {cached * 1e6:.1f}us per request")
+    print(f"auth overhead reduced {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Course catalog list latency on a large table: direct adapter query vs snapshot.
+
+Seeds ``--courses`` synthetic courses with the bulk import path, then times
+``DatabaseAdapter.get_courses`` and ``GET /api/v1/courses/`` served from the
+catalog snapshot (full body and ``If-None-Match`` revalidation).
+
+    python -m benchmarks.bench_course_catalog [--courses 10000] [--iterations 50]
+"""
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks import percentile
+import main
+from app.database.database_adapter import db
+from app.database.seed_courses import seed_courses
+
+CATEGORIES = ["mindfulness", "leadership", "sustainability", "wellbeing", "communication"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+
+
+def synthetic_courses(count: int) -> list:
+    return [
+        {
+            "id": f"course-{i}",
+            "title": f"Course {i}: {CATEGORIES[i % 5].title()} in practice",
+            "description": "A short practical course. " * 8,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "duration": f"{15 + i % 45} min",
+            "level": LEVELS[i % len(LEVELS)],
+            "lessons": [{"id": f"l{j}", "title": f"Lesson {j}"} for j in range(5)],
+            "image": f"https://example.com/courses/{i}.png",
+            "instructor": f"Instructor {i % 50}",
+            "tags": [CATEGORIES[(i + 1) % 5], LEVELS[i % 3]],
+        }
+        for i in range(count)
+    ]
+
+
+def timed(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label: str, samples: list):
+    print(
+        f"{label:>26}: p50 {percentile(samples, 50) * 1000:.2f}ms "
+        f"p99 {percentile(samples, 99) * 1000:.2f}ms"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed_courses(synthetic_courses(args.courses))
+    print(f"seeded {args.courses} courses in {time.perf_counter() - started:.2f}s")
+
+    report("adapter get_courses", timed(db.get_courses, args.iterations))
+
+    with TestClient(main.app) as client:
+        etag = client.get("/api/v1/courses/").headers["etag"]
+        report("GET /courses (snapshot)", timed(lambda: client.get("/api/v1/courses/"), args.iterations))
+        report("GET /courses (304)", timed(
+            lambda: client.get("/api/v1/courses/", headers={"If-None-Match": etag}),
+            args.iterations,
+        ))
+        report("GET /courses/{id}", timed(lambda: client.get("/api/v1/courses/course-42"), args.iterations))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,67 @@
+"""
+Course search latency on a large catalog (FTS5 index + facets).
+
+Seeds ``--courses`` synthetic courses, then times ``GET /api/v1/courses/search``
+for text queries, filter-only queries and deep cursor pages.
+
+    python -m benchmarks.bench_course_search [--courses 50000] [--iterations 50]
+"""
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks import percentile
+from benchmarks.bench_course_catalog import synthetic_courses
+import main
+from app.database.seed_courses import seed_courses
+
+CASES = [
+    ("text, first page + facets", {"q": "leadership practice"}),
+    ("text prefix", {"q": "mind"}),
+    ("text + category + level", {"q": "course", "category": "wellbeing", "level": "advanced"}),
+    ("tag filter only", {"tag": "sustainability"}),
+    ("no match", {"q": "zzzyxw"}),
+]
+
+
+def timed(client: TestClient, params: dict, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get("/api/v1/courses/search", params=params)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    return samples
+
+
+def report(label: str, samples: list):
+    print(
+        f"{label:>28}: p50 {percentile(samples, 50) * 1000:.2f}ms "
+        f"p99 {percentile(samples, 99) * 1000:.2f}ms"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed_courses(synthetic_courses(args.courses))
+    print(f"seeded and indexed {args.courses} courses in {time.perf_counter() - started:.2f}s")
+
+    with TestClient(main.app) as client:
+        for label, params in CASES:
+            report(label, timed(client, {**params, "limit": 20}, args.iterations))
+
+        # Walk 50 pages deep, then time the next page from that cursor
+        params = {"q": "course", "limit": 20}
+        for _ in range(50):
+            params["after"] = client.get("/api/v1/courses/search", params=params).json()["next_cursor"]
+        report("text, page 51 (cursor)", timed(client, params, args.iterations))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,71 @@
+"""
+Resume cost for a power user: full refetch vs delta sync.
+
+Gives one user ``--goals`` goals, makes ``--changes`` edits (updates and
+deletes), then compares what the app fetched on resume before
+(``GET /users/me`` + ``GET /goals/``) with ``GET /sync?since=<cursor>``.
+
+    python -m benchmarks.bench_delta_sync [--goals 5000] [--changes 10] [--iterations 30]
+"""
+import argparse
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from benchmarks import percentile
+from benchmarks.bench_pagination import seed_goals
+import main
+from app.core.security import create_access_token
+from app.database.database_adapter import db
+
+
+def timed(fn, iterations: int):
+    samples, size = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        size = fn()
+        samples.append(time.perf_counter() - started)
+    return samples, size
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--goals", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    seed_goals(user_id, args.goals)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+    with TestClient(main.app) as client:
+        cursor = client.get("/api/v1/sync/", headers=headers).json()["cursor"]
+        goal_ids = [goal["id"] for goal in db.get_user_goals(user_id)[: args.changes]]
+        for i, goal_id in enumerate(goal_ids):
+            if i % 2:
+                db.delete_goal(goal_id)
+            else:
+                db.update_goal(goal_id, {"progress": 99})
+        db.patch_user_preferences(user_id, {"darkMode": True})
+
+        def full_refetch():
+            me = client.get("/api/v1/users/me", headers=headers)
+            goals = client.get("/api/v1/goals/", headers=headers)
+            return len(me.content) + len(goals.content)
+
+        def delta_sync():
+            return len(client.get("/api/v1/sync/", headers=headers, params={"since": cursor}).content)
+
+        print(f"{args.goals} goals, {args.changes} goal changes + 1 preference change since last sync")
+        for label, fetch in (("full refetch", full_refetch), ("delta sync", delta_sync)):
+            samples, size = timed(fetch, args.iterations)
+            print(
+                f"{label:>14}: {size / 1024:8.1f} KiB  p50 {percentile(samples, 50) * 1000:.2f}ms "
+                f"p99 {percentile(samples, 99) * 1000:.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,81 @@
+"""
+Offline-sync replay: one request per goal change vs POST /api/v1/goals/batch.
+
+Replays ``--changes`` mixed goal changes (creates, updates, deletes) through the
+single-goal endpoints and through one batch request, and reports wall time and
+SQLite writer transactions for each.
+
+    python -m benchmarks.bench_goal_batch [--changes 300]
+"""
+import argparse
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+import main
+from app.database.database_adapter import db
+
+
+def login(client: TestClient) -> dict:
+    email = f"batch-{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "bench-password", "name": "Batch"})
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": "bench-password"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def new_goal(i: int) -> dict:
+    return {"learningStyleId": "v1", "sdgIds": ["3"], "title": f"Goal {i}", "description": "Offline edit"}
+
+
+def seed(client: TestClient, headers: dict, count: int) -> list:
+    return [client.post("/api/v1/goals/", headers=headers, json=new_goal(i)).json()["id"] for i in range(count)]
+
+
+def changes(existing: list, count: int) -> list:
+    """A third creates, a third updates, a third deletes"""
+    ops = []
+    for i in range(count):
+        if i % 3 == 0:
+            ops.append({"op": "create", "goal": new_goal(i)})
+        elif i % 3 == 1:
+            ops.append({"op": "update", "id": existing[i // 3], "changes": {"progress": i, "completed": i % 2 == 0}})
+        else:
+            ops.append({"op": "delete", "id": existing[count // 3 + i // 3]})
+    return ops
+
+
+def one_by_one(client: TestClient, headers: dict, ops: list):
+    for op in ops:
+        if op["op"] == "create":
+            client.post("/api/v1/goals/", headers=headers, json=op["goal"])
+        elif op["op"] == "update":
+            client.put(f"/api/v1/goals/{op['id']}", headers=headers, json=op["changes"])
+        else:
+            client.delete(f"/api/v1/goals/{op['id']}", headers=headers)
+
+
+def batched(client: TestClient, headers: dict, ops: list):
+    response = client.post("/api/v1/goals/batch", headers=headers, json={"ops": ops})
+    assert response.status_code == 200, response.text
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--changes", type=int, default=300)
+    args = parser.parse_args()
+
+    with TestClient(main.app) as client:
+        for label, replay in (("one request per change", one_by_one), ("single batch request", batched)):
+            headers = login(client)
+            ops = changes(seed(client, headers, 2 * args.changes // 3 + 3), args.changes)
+            writes_before = db.pool_stats()["writer_checkouts"]
+            started = time.perf_counter()
+            replay(client, headers, ops)
+            elapsed = time.perf_counter() - started
+            writes = db.pool_stats()["writer_checkouts"] - writes_before
+            print(f"{label:>24}: {elapsed * 1000:8.1f}ms for {args.changes} changes, {writes} write transactions")
+
+
+if __name__ == "__main__":
+    main_cli()
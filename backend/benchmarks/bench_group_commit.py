@@ -0,0 +1,88 @@
+"""
+Concurrent progress-update throughput with and without group commit.
+
+``--threads`` writers each update random goals' progress for ``--seconds``
+(the burst pattern of many clients saving progress at once). Each run is
+repeated with ``synchronous=NORMAL`` (the default WAL profile) and ``FULL``
+(an fsync per commit), once committing every write on its own and once with
+group commit at each ``--windows`` window. Reports writes/s, per-write p50/p99
+latency and writes per commit.
+
+    python -m benchmarks.bench_group_commit [--threads 32] [--seconds 3] [--windows 1,2,5]
+"""
+import argparse
+import random
+import threading
+import time
+import uuid
+
+from benchmarks import percentile, scratch_db
+from app.core.config import settings
+from app.database.database_adapter import DatabaseAdapter
+
+GOALS = 500
+
+
+def run(synchronous: str, window_ms: float, max_ops: int, threads: int, seconds: float) -> dict:
+    settings.SQLITE_SYNCHRONOUS = synchronous
+    settings.SQLITE_GROUP_COMMIT_WINDOW_MS = window_ms
+    settings.SQLITE_GROUP_COMMIT_MAX_OPS = max_ops
+    adapter = DatabaseAdapter(db_path=scratch_db(f"group-commit-{synchronous}-{window_ms}.db"))
+    user_id = str(uuid.uuid4())
+    adapter.create_user(user_id, f"{user_id}@example.com", "Bench", "x")
+    goal_ids = [adapter.create_goal({"user_id": user_id, "title": f"goal {i}"})["id"] for i in range(GOALS)]
+    commits_before = adapter.pool.stats()["writer_checkouts"]
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        samples = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            adapter.update_goal(rng.choice(goal_ids), {"progress": rng.randrange(101)})
+            samples.append(time.perf_counter() - started)
+        latencies.extend(samples)
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    stats = adapter.pool.stats()
+    commits = stats["group_commits"] if window_ms > 0 else stats["writer_checkouts"] - commits_before
+    adapter.shutdown()
+    return {
+        "writes_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "writes_per_commit": len(latencies) / max(1, commits),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--windows", default="1,2,5", help="group-commit windows in ms, comma separated")
+    parser.add_argument("--max-ops", type=int, default=32)
+    args = parser.parse_args()
+
+    windows = [0.0] + [float(window) for window in args.windows.split(",") if window]
+    for synchronous in ("NORMAL", "FULL"):
+        for window_ms in windows:
+            result = run(synchronous, window_ms, args.max_ops, args.threads, args.seconds)
+            label = f"group {window_ms:g}ms" if window_ms else "per-write commit"
+            print(
+                f"synchronous={synchronous:<6} {label:>16}: {result['writes_per_sec']:7.0f} writes/s "
+                f"p50 {result['p50_ms']:6.2f}ms p99 {result['p99_ms']:6.2f}ms "
+                f"({result['writes_per_commit']:.1f} writes/commit)"
+            )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,104 @@
+"""
+Latency of other endpoints during a login storm: inline bcrypt vs the hashing pool.
+
+Runs the app under uvicorn in a background thread. A probe requests
+``GET /api/v1/users/me`` every few milliseconds, first with no other traffic
+(baseline), then while many clients hammer ``POST /api/v1/auth/login``.
+
+    python -m benchmarks.bench_login_storm [--logins 32] [--seconds 5]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from benchmarks import percentile, start_server
+import main
+from app.core import security
+from app.core.security import create_access_token, get_password_hash, verify_password
+from app.database.database_adapter import db
+from app.routers import auth
+
+PASSWORD = "correct horse battery staple"
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    """Pre-pool behaviour: bcrypt runs directly on the event loop"""
+    return verify_password(plain_password, hashed_password)
+
+
+def seed() -> tuple:
+    user_id = str(uuid.uuid4())
+    email = f"{user_id}@example.com"
+    db.create_user(user_id, email, "Bench", get_password_hash(PASSWORD))
+    token = create_access_token(data={"sub": user_id, "email": email})
+    return email, token
+
+
+async def run(base_url: str, email: str, token: str, logins: int, seconds: float) -> dict:
+    deadline = time.perf_counter() + seconds
+    probe_latencies = []
+    login_statuses = {}
+    limits = httpx.Limits(max_connections=logins + 1)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def login():
+            while time.perf_counter() < deadline:
+                response = await client.post(
+                    "/api/v1/auth/login", json={"email": email, "password": PASSWORD}
+                )
+                login_statuses[response.status_code] = login_statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            headers = {"Authorization": f"Bearer {token}"}
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/users/me", headers=headers)
+                response.raise_for_status()
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(probe(), *(login() for _ in range(logins)))
+
+    return {
+        "probe_p50_ms": percentile(probe_latencies, 50) * 1000,
+        "probe_p99_ms": percentile(probe_latencies, 99) * 1000,
+        "logins": login_statuses,
+    }
+
+
+def report(label: str, result: dict):
+    logins = ", ".join(f"{code}: {count}" for code, count in sorted(result["logins"].items()))
+    print(
+        f"{label:>14}: /users/me p50 {result['probe_p50_ms']:.1f}ms "
+        f"p99 {result['probe_p99_ms']:.1f}ms | logins {{{logins}}}"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    email, token = seed()
+    server, thread, base_url = start_server(main.app)
+    try:
+        report("baseline", asyncio.run(run(base_url, email, token, 0, args.seconds)))
+
+        auth.verify_password_async = inline_verify
+        report("inline bcrypt", asyncio.run(run(base_url, email, token, args.logins, args.seconds)))
+
+        auth.verify_password_async = security.verify_password_async
+        report("hashing pool", asyncio.run(run(base_url, email, token, args.logins, args.seconds)))
+        print(f"pool stats: {security.password_hasher.stats()}")
+    finally:
+        auth.verify_password_async = security.verify_password_async
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main_cli()
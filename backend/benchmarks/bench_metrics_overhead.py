@@ -0,0 +1,113 @@
+"""
+Cost of the metrics instrumentation on the request and query hot paths.
+
+Times, per call:
+
+- ``metrics.inc`` and ``metrics.observe`` from one thread and from several
+  threads at once (each thread records into its own shard, so there is no
+  lock to contend on)
+- a trivial ASGI app with and without ``MetricsMiddleware``
+- a no-op coroutine with and without the ``observe_queries`` wrapper
+- rendering ``GET /metrics`` after the recording above
+
+    python -m benchmarks.bench_metrics_overhead [--calls 200000] [--threads 8]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from app.core.metrics import MetricsMiddleware, labels, metrics, observe_queries
+
+LABELS = labels(method="GET", route="/api/v1/users/me")
+
+
+def per_call(fn, calls: int) -> float:
+    started = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def record(calls: int):
+    for _ in range(calls):
+        metrics.inc("http_requests_total", LABELS)
+        metrics.observe("http_request_duration_seconds", LABELS, 0.004)
+
+
+def threaded(calls: int, threads: int) -> float:
+    workers = [threading.Thread(target=record, args=(calls // threads,)) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+async def plain_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+@observe_queries()
+class Queries:
+    use_sqlite = True
+
+    async def get_user_by_id(self, user_id):
+        return None
+
+
+class PlainQueries:
+    async def get_user_by_id(self, user_id):
+        return None
+
+
+async def asgi_per_call(app, calls: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+async def query_per_call(queries, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        await queries.get_user_by_id("u")
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'inc + observe, 1 thread':>32}: {per_call(record, args.calls):7.0f}ns")
+    print(f"{f'inc + observe, {args.threads} threads':>32}: {threaded(args.calls, args.threads):7.0f}ns")
+
+    plain = asyncio.run(asgi_per_call(plain_app, args.calls))
+    wrapped = asyncio.run(asgi_per_call(MetricsMiddleware(plain_app), args.calls))
+    print(f"{'ASGI request, no metrics':>32}: {plain:7.0f}ns")
+    print(f"{'ASGI request, MetricsMiddleware':>32}: {wrapped:7.0f}ns  (+{wrapped - plain:.0f}ns)")
+
+    plain = asyncio.run(query_per_call(PlainQueries(), args.calls))
+    wrapped = asyncio.run(query_per_call(Queries(), args.calls))
+    print(f"{'adapter call, no metrics':>32}: {plain:7.0f}ns")
+    print(f"{'adapter call, observe_queries':>32}: {wrapped:7.0f}ns  (+{wrapped - plain:.0f}ns)")
+
+    metrics.exposition()  # the first render imports the adapter the collectors read
+    started = time.perf_counter()
+    body = metrics.exposition()
+    print(f"{'GET /metrics render':>32}: {(time.perf_counter() - started) * 1000:7.2f}ms ({len(body.splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    main_cli()
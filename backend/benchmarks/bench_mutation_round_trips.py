@@ -0,0 +1,98 @@
+"""
+Goal and profile mutations before and after ``RETURNING``.
+
+The old path is replayed with the statements it used to run: the adapter
+ran the write and then read the row back, and for ``update_goal`` the goals
+router also read the goal first to check ownership. The new path is the
+adapter call the routers make now, where the ownership check, write and
+read-back are one ``UPDATE ... WHERE id = ? AND user_id = ? RETURNING *``
+(``INSERT ... RETURNING *`` for ``create_goal``).
+Reports SQL statements per call (counted with a trace callback, including
+BEGIN/COMMIT) and p50/p99 latency.
+
+    python -m benchmarks.bench_mutation_round_trips [--iterations 2000]
+"""
+import argparse
+import time
+import uuid
+
+from benchmarks import percentile, scratch_db
+from app.database.database_adapter import DatabaseAdapter, INSERT_GOAL_SQL, goals_key, user_key
+from app.database.tracing import traced_adapter
+
+
+def old_update_goal(adapter: DatabaseAdapter, goal_id: str, user_id: str, progress: int):
+    goal = adapter.get_goal_by_id(goal_id)
+    assert goal["user_id"] == user_id
+    with adapter.pool.writer() as conn:
+        conn.execute(
+            "UPDATE goals SET progress = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (progress, goal_id),
+        )
+    adapter.cache.delete(goals_key(user_id))
+    return adapter.get_goal_by_id(goal_id)
+
+
+def old_create_goal(adapter: DatabaseAdapter, user_id: str):
+    goal_id = str(uuid.uuid4())
+    with adapter.pool.writer() as conn:
+        conn.execute(INSERT_GOAL_SQL, adapter._goal_params({"id": goal_id, "user_id": user_id, "title": "goal"}))
+    adapter.cache.delete(goals_key(user_id))
+    return adapter.get_goal_by_id(goal_id)
+
+
+def old_update_user(adapter: DatabaseAdapter, user_id: str, name: str):
+    with adapter.pool.writer() as conn:
+        conn.execute("UPDATE users SET name = ? WHERE id = ?", (name, user_id))
+    adapter.cache.delete(user_key(user_id))
+    return adapter.get_user_by_id(user_id)
+
+
+def measure(statements: list, call, iterations: int) -> dict:
+    latencies = []
+    del statements[:]
+    for i in range(iterations):
+        started = time.perf_counter()
+        assert call(i) is not None
+        latencies.append(time.perf_counter() - started)
+    return {
+        "statements": len(statements) / iterations,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    statements = []
+    adapter = traced_adapter(scratch_db("mutation-round-trips.db"), statements)
+    user_id = str(uuid.uuid4())
+    adapter.create_user(user_id, f"{user_id}@example.com", "Bench", "x")
+    goal_id = adapter.create_goal({"user_id": user_id, "title": "goal"})["id"]
+
+    cases = [
+        ("update_goal",
+         lambda i: old_update_goal(adapter, goal_id, user_id, i % 101),
+         lambda i: adapter.update_goal(goal_id, {"progress": i % 101}, user_id)),
+        ("create_goal",
+         lambda i: old_create_goal(adapter, user_id),
+         lambda i: adapter.create_goal({"user_id": user_id, "title": "goal"})),
+        ("update_user",
+         lambda i: old_update_user(adapter, user_id, f"name {i}"),
+         lambda i: adapter.update_user(user_id, {"name": f"name {i}"})),
+    ]
+    for name, old, new in cases:
+        for label, call in (("separate reads", old), ("RETURNING", new)):
+            result = measure(statements, call, args.iterations)
+            print(
+                f"{name:>12} {label:>14}: {result['statements']:.1f} statements, "
+                f"p50 {result['p50_us']:6.1f}us p99 {result['p99_us']:6.1f}us"
+            )
+    adapter.shutdown()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,95 @@
+"""
+Keyset pagination cost at increasing depth, compared with LIMIT/OFFSET.
+
+Gives one user ``--goals`` goals, then times fetching a page at several depths
+through ``DatabaseAdapter.get_user_goals_page`` (cursor) and through the
+equivalent OFFSET query. Keyset pages should cost the same at any depth.
+Also compares the full-list payload with a projected page.
+
+    python -m benchmarks.bench_pagination [--goals 100000] [--iterations 50]
+"""
+import argparse
+import json
+import time
+import uuid
+
+from benchmarks import percentile
+from app.database.database_adapter import db
+
+PAGE_SIZE = 50
+
+
+def seed_goals(user_id: str, count: int):
+    db.create_user(user_id, f"{user_id}@example.com", "Paginator", "x")
+    rows = [
+        (
+            str(uuid.uuid4()), user_id, f"Goal {i}", "Practise daily " * 10, "v1", '["3", "4"]',
+            i % 100, 0, 1, f"2025-01-01 00:{(i // 60) % 60:02d}:{i % 60:02d}.{i:06d}",
+        )
+        for i in range(count)
+    ]
+    with db.pool.writer() as conn:
+        conn.executemany(
+            """
+            INSERT INTO goals (id, user_id, title, description, virtue_id, sdg_ids,
+                               progress, completed, target, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+def timed(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def offset_page(user_id: str, offset: int):
+    with db.pool.reader() as conn:
+        return conn.execute(
+            "SELECT * FROM goals WHERE user_id = ? ORDER BY created_at, id LIMIT ? OFFSET ?",
+            (user_id, PAGE_SIZE, offset),
+        ).fetchall()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--goals", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    seed_goals(user_id, args.goals)
+    print(f"seeded {args.goals} goals, page size {PAGE_SIZE}")
+
+    # Collect the cursor at the start of each sampled depth in one walk
+    depths = [0, 10, 100, 1000, args.goals // PAGE_SIZE - 1]
+    cursors, after, page = {}, None, 0
+    while page <= depths[-1]:
+        if page in depths:
+            cursors[page] = after
+        after = db.get_user_goals_page(user_id, PAGE_SIZE, after, "id")["next_cursor"]
+        page += 1
+
+    print(f"{'page':>8} {'keyset p50':>12} {'keyset p99':>12} {'offset p50':>12} {'offset p99':>12}")
+    for depth in depths:
+        keyset = timed(lambda: db.get_user_goals_page(user_id, PAGE_SIZE, cursors[depth]), args.iterations)
+        offset = timed(lambda: offset_page(user_id, depth * PAGE_SIZE), args.iterations)
+        print(
+            f"{depth:>8} {percentile(keyset, 50) * 1000:>10.2f}ms {percentile(keyset, 99) * 1000:>10.2f}ms"
+            f" {percentile(offset, 50) * 1000:>10.2f}ms {percentile(offset, 99) * 1000:>10.2f}ms"
+        )
+
+    full = len(json.dumps(db.get_user_goals(user_id), default=str))
+    page = len(json.dumps(db.get_user_goals_page(user_id, PAGE_SIZE)))
+    projected = len(json.dumps(db.get_user_goals_page(user_id, PAGE_SIZE, fields="id,title,progress")))
+    print(f"payload: full list {full / 1024:.0f} KiB, page {page / 1024:.1f} KiB, "
+          f"projected page {projected / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,103 @@
+"""
+Bytes moved per preference update: read-modify-write vs in-database merge patch.
+
+Gives a user a realistically large preferences document, then toggles one flag
+``--updates`` times each way:
+
+- read-modify-write: load the user, merge in Python, write the whole document
+  back (the old ``PUT /users/me`` path)
+- merge patch: ``DatabaseAdapter.patch_user_preferences`` (SQLite ``json_patch``)
+
+and reports, per update, the bytes sent to and read from the database, the
+response payload, the WAL bytes appended, and latency. SQLite rewrites the
+whole row either way, so WAL bytes stay the same; the savings are in what
+crosses the Python/database boundary and the wire.
+
+    python -m benchmarks.bench_preferences_patch [--updates 500] [--courses 500]
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+
+from benchmarks import percentile
+from app.database.database_adapter import db
+
+
+def large_preferences(completed_courses: int) -> dict:
+    return {
+        "theme": "light",
+        "notifications": True,
+        "language": "en",
+        "selectedSDGs": [str(i) for i in range(1, 18)],
+        "newGoal": {"title": "", "description": "", "target": 0},
+        "completedCourses": [f"course-{i}" for i in range(completed_courses)],
+        "lessonNotes": {f"course-{i}": "Remember to revisit the breathing exercise." for i in range(completed_courses // 5)},
+    }
+
+
+def wal_size() -> int:
+    try:
+        return os.path.getsize(f"{db.db_path}-wal")
+    except OSError:
+        return 0
+
+
+def read_modify_write(user_id: str, flag: bool) -> dict:
+    user = db._load_user_by_id(user_id)
+    db_read = len(json.dumps(user))
+    preferences = {**user["preferences"], "darkMode": flag}
+    db_sent = len(json.dumps(preferences))
+    updated = db.update_user(user_id, {"preferences": preferences})
+    # update_user reads the row back to return it
+    db_read += len(json.dumps(updated))
+    return {"db_sent": db_sent, "db_read": db_read, "response": len(json.dumps(updated))}
+
+
+def merge_patch(user_id: str, flag: bool) -> dict:
+    patch = {"darkMode": flag}
+    changed = db.patch_user_preferences(user_id, patch)
+    # Only the patched keys come back from the database
+    return {"db_sent": len(json.dumps(patch)), "db_read": len(json.dumps(changed)), "response": len(json.dumps(changed))}
+
+
+def run(label: str, update, user_id: str, updates: int):
+    totals = {"db_sent": 0, "db_read": 0, "response": 0}
+    samples = []
+    wal_before = wal_size()
+    for i in range(updates):
+        started = time.perf_counter()
+        sizes = update(user_id, i % 2 == 0)
+        samples.append(time.perf_counter() - started)
+        for key, value in sizes.items():
+            totals[key] += value
+    wal_per_update = (wal_size() - wal_before) / updates
+    print(
+        f"{label:>18}: sent {totals['db_sent'] / updates:>8.0f} B  read {totals['db_read'] / updates:>8.0f} B  "
+        f"response {totals['response'] / updates:>8.0f} B  WAL {wal_per_update:>8.0f} B  "
+        f"p50 {percentile(samples, 50) * 1000:.2f}ms p99 {percentile(samples, 99) * 1000:.2f}ms"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=500)
+    parser.add_argument("--courses", type=int, default=500)
+    args = parser.parse_args()
+
+    # Keep every WAL frame so the file size measures bytes written
+    with db.pool.writer() as conn:
+        conn.execute("PRAGMA wal_autocheckpoint = 0")
+
+    preferences = large_preferences(args.courses)
+    print(f"preferences document: {len(json.dumps(preferences))} bytes, {args.updates} updates each")
+    for label, update in (("read-modify-write", read_modify_write), ("merge patch", merge_patch)):
+        user_id = str(uuid.uuid4())
+        db.create_user(user_id, f"{user_id}@example.com", "Bench", "x")
+        db.update_user(user_id, {"preferences": preferences})
+        run(label, update, user_id, args.updates)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,100 @@
+"""
+Profile read cost with large preferences: parsed JSON columns vs raw passthrough.
+
+Gives a user a ``--kib`` KiB preferences document, then times producing the
+``GET /users/me`` body from a cached profile three ways:
+
+- parsed + stdlib: decoded columns through ``jsonable_encoder`` and
+  ``json.dumps`` (FastAPI's default before orjson)
+- parsed + orjson: decoded columns, orjson response
+- raw passthrough: ``get_user_by_id(raw_json=True)``; the stored text is
+  spliced in as ``orjson.Fragment`` values
+
+It also counts JSON parse calls made while serving ``GET /users/me`` through
+the app, which should be zero.
+
+    python -m benchmarks.bench_profile_passthrough [--kib 50] [--iterations 500]
+"""
+import argparse
+import json
+import time
+import uuid
+from unittest import mock
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from benchmarks import percentile
+from benchmarks.bench_preferences_patch import large_preferences
+import main
+from app.core.security import create_access_token
+from app.database.database_adapter import db
+
+
+def preferences_of_size(kib: int) -> dict:
+    courses = 100
+    while len(json.dumps(large_preferences(courses))) < kib * 1024:
+        courses += 100
+    return large_preferences(courses)
+
+
+def timed(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label: str, samples: list):
+    print(
+        f"{label:>22}: p50 {percentile(samples, 50) * 1000:.3f}ms "
+        f"p99 {percentile(samples, 99) * 1000:.3f}ms"
+    )
+
+
+def count_parses(fn) -> int:
+    """Run ``fn`` and count json/orjson parse calls it made"""
+    calls = []
+    real_json, real_orjson = json.loads, orjson.loads
+    with mock.patch("json.loads", lambda *a, **k: calls.append(1) or real_json(*a, **k)), \
+         mock.patch("orjson.loads", lambda *a, **k: calls.append(1) or real_orjson(*a, **k)):
+        fn()
+    return len(calls)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kib", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    db.create_user(user_id, f"{user_id}@example.com", "Passthrough", "x")
+    db.update_user(user_id, {"preferences": preferences_of_size(args.kib)})
+    size = len(orjson.dumps(db.get_user_by_id(user_id, raw_json=True)))
+    print(f"profile body: {size / 1024:.1f} KiB")
+
+    def parsed_stdlib():
+        user = db.get_user_by_id(user_id)
+        return json.dumps(jsonable_encoder(user), ensure_ascii=False, separators=(",", ":"))
+
+    report("parsed + stdlib", timed(parsed_stdlib, args.iterations))
+    report("parsed + orjson", timed(lambda: orjson.dumps(db.get_user_by_id(user_id)), args.iterations))
+    report("raw passthrough", timed(
+        lambda: orjson.dumps(db.get_user_by_id(user_id, raw_json=True)), args.iterations
+    ))
+
+    token = create_access_token({"sub": user_id, "email": f"{user_id}@example.com"})
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "identity"}
+    with TestClient(main.app) as client:
+        client.get("/api/v1/users/me", headers=headers)
+        parses = count_parses(lambda: client.get("/api/v1/users/me", headers=headers))
+        print(f"JSON parse calls per GET /users/me: {parses}")
+        report("GET /users/me", timed(lambda: client.get("/api/v1/users/me", headers=headers), args.iterations))
+
+
+if __name__ == "__main__":
+    main_cli()
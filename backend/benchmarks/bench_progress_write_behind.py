@@ -0,0 +1,85 @@
+"""
+Progress updates written straight through vs through the write-behind buffer.
+
+Simulates ``--users`` learners stepping through lessons: each of their
+``--goals`` goals gets ``--steps`` progress updates and their progress blob
+gets one per step, interleaved over ``--seconds``. Runs once with
+``PROGRESS_FLUSH_INTERVAL=0`` (every update is a write) and once with the
+buffer flushing every ``--interval`` seconds. Reports update latency, rows
+written and writer transactions, and checks that reads return the latest
+buffered values.
+
+    python -m benchmarks.bench_progress_write_behind [--users 20] [--goals 5] [--steps 50] [--interval 1]
+"""
+import argparse
+import time
+import uuid
+
+from benchmarks import percentile, scratch_db
+from app.core.config import settings
+from app.database.database_adapter import DatabaseAdapter
+
+
+def run(label: str, interval: float, users: int, goals: int, steps: int, seconds: float) -> dict:
+    settings.PROGRESS_FLUSH_INTERVAL = interval
+    adapter = DatabaseAdapter(db_path=scratch_db(f"progress-{label}.db"))
+    learners = []
+    for _ in range(users):
+        user_id = str(uuid.uuid4())
+        adapter.create_user(user_id, f"{user_id}@example.com", "Learner", "x")
+        goal_ids = [adapter.create_goal({"user_id": user_id, "title": f"goal {i}"})["id"] for i in range(goals)]
+        learners.append((user_id, goal_ids))
+    adapter.startup()
+
+    writes_before = adapter.pool.stats()["writer_checkouts"]
+    latencies = []
+    pause = seconds / steps
+    for step in range(1, steps + 1):
+        for user_id, goal_ids in learners:
+            for goal_id in goal_ids:
+                started = time.perf_counter()
+                adapter.update_goal(goal_id, {"progress": step})
+                latencies.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            adapter.update_user(user_id, {"progress": [{"lesson": step, "goals": goal_ids}]})
+            latencies.append(time.perf_counter() - started)
+        time.sleep(pause)
+
+    user_id, goal_ids = learners[-1]
+    assert adapter.get_goal_by_id(goal_ids[-1])["progress"] == steps
+    assert all(goal["progress"] == steps for goal in adapter.get_user_goals(user_id))
+    assert adapter.get_user_by_id(user_id)["progress"][0]["lesson"] == steps
+
+    adapter.progress_buffer.stop()
+    transactions = adapter.pool.stats()["writer_checkouts"] - writes_before
+    result = {
+        "updates": len(latencies),
+        "rows_written": adapter.progress_buffer.stats()["rows_written"] if interval else len(latencies),
+        "transactions": transactions,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+    adapter.shutdown()
+    return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--goals", type=int, default=5)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5.0, help="time the steps are spread over")
+    parser.add_argument("--interval", type=float, default=1.0, help="buffer flush interval in seconds")
+    args = parser.parse_args()
+
+    for label, interval in (("write-through", 0.0), ("write-behind", args.interval)):
+        result = run(label, interval, args.users, args.goals, args.steps, args.seconds)
+        print(
+            f"{label:>14}: {result['updates']} updates, {result['rows_written']} rows written in "
+            f"{result['transactions']} transactions, "
+            f"p50 {result['p50_ms']:.3f}ms p99 {result['p99_ms']:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,95 @@
+"""
+Response encoding cost: stdlib JSON vs orjson vs raw-JSON passthrough, and
+compression throughput per Accept-Encoding.
+
+Seeds ``--courses`` synthetic courses, then:
+
+* times encoding one ``--page``-sized course page the old way (JSON columns
+  decoded, ``jsonable_encoder`` + ``json.dumps``), with orjson on the decoded
+  page, and with orjson on the ``raw_json`` page whose columns are spliced in;
+* drives ``GET /api/v1/courses/?limit=...`` and the full catalog through the
+  app with each Accept-Encoding, reporting requests/s and bytes on the wire.
+
+    python -m benchmarks.bench_response_encoding [--courses 5000] [--page 500] [--iterations 50]
+"""
+import argparse
+import json
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from benchmarks import percentile
+from benchmarks.bench_course_catalog import synthetic_courses
+import main
+from app.database.database_adapter import db
+from app.database.seed_courses import seed_courses
+
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def timed(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label: str, samples: list):
+    print(
+        f"{label:>34}: p50 {percentile(samples, 50) * 1000:.2f}ms "
+        f"p99 {percentile(samples, 99) * 1000:.2f}ms"
+    )
+
+
+def stdlib_encode(page: dict) -> bytes:
+    # What FastAPI's default JSONResponse did with a returned dict
+    return json.dumps(
+        jsonable_encoder(page), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def throughput(client: TestClient, path: str, encoding: str, iterations: int):
+    wire_bytes = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        response = client.get(path, headers={"Accept-Encoding": encoding})
+        wire_bytes = response.num_bytes_downloaded
+    elapsed = time.perf_counter() - started
+    print(f"{path + ' [' + encoding + ']':>34}: {iterations / elapsed:7.1f} req/s, {wire_bytes / 1024:8.1f} KiB on the wire")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=5000)
+    parser.add_argument("--page", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    seed_courses(synthetic_courses(args.courses))
+
+    decoded = db.get_courses_page(args.page)
+    raw = db.get_courses_page(args.page, raw_json=True)
+    assert orjson.loads(orjson.dumps(raw)) == orjson.loads(stdlib_encode(decoded))
+
+    print(f"encoding one {args.page}-course page ({len(orjson.dumps(raw)) / 1024:.0f} KiB)")
+    report("read + stdlib json", timed(lambda: stdlib_encode(db.get_courses_page(args.page)), args.iterations))
+    report("read + jsonable_encoder + orjson", timed(
+        lambda: orjson.dumps(jsonable_encoder(db.get_courses_page(args.page))), args.iterations
+    ))
+    report("read + orjson", timed(lambda: orjson.dumps(db.get_courses_page(args.page)), args.iterations))
+    report("read raw_json + orjson", timed(
+        lambda: orjson.dumps(db.get_courses_page(args.page, raw_json=True)), args.iterations
+    ))
+
+    with TestClient(main.app) as client:
+        for path in (f"/api/v1/courses/?limit={args.page}", "/api/v1/courses/"):
+            for encoding in ENCODINGS:
+                throughput(client, path, encoding, args.iterations)
+
+
+if __name__ == "__main__":
+    main_cli()
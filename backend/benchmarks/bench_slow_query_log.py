@@ -0,0 +1,58 @@
+"""
+Cost of timing every SQLite statement for the slow-query log.
+
+Runs the same adapter reads (a profile lookup and a 50-goal page) on a pool
+of plain ``sqlite3.Connection`` objects and on a pool of ``TimedConnection``
+objects with a threshold no statement reaches, and reports the per-call
+difference.
+
+    python -m benchmarks.bench_slow_query_log [--iterations 20000]
+"""
+import argparse
+import sqlite3
+import time
+import uuid
+
+from benchmarks import scratch_db
+from app.database.database_adapter import DatabaseAdapter
+from app.database.slow_queries import TimedConnection
+
+
+def per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    adapter = DatabaseAdapter(db_path=scratch_db("slow-query-log.db"))
+    user_id = str(uuid.uuid4())
+    adapter.create_user(user_id, f"{user_id}@example.com", "Bench", "x")
+    for i in range(50):
+        adapter.create_goal({"user_id": user_id, "title": f"Goal {i}", "progress": i})
+    pool = adapter.pool
+
+    results = {}
+    for name, factory in (("sqlite3.Connection", sqlite3.Connection), ("TimedConnection", TimedConnection)):
+        pool.close()
+        pool._factory = factory
+        results[name] = (
+            per_call(lambda: adapter._load_user_by_id(user_id), args.iterations),
+            per_call(lambda: adapter.get_user_goals_page(user_id, limit=50), args.iterations // 10),
+        )
+
+    base_lookup, base_page = results["sqlite3.Connection"]
+    for name, (lookup, page) in results.items():
+        print(
+            f"{name:>18}: profile lookup {lookup:6.1f}us (+{lookup - base_lookup:.1f}), "
+            f"50-goal page {page:6.1f}us (+{page - base_page:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
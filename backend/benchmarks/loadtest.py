@@ -0,0 +1,407 @@
+"""
+Load test: a weighted mix of API requests against a seeded database.
+
+Seeds ``--users`` users with ``--goals`` goals each and ``--courses``
+courses (existing seed data is reused), then runs ``--concurrency`` virtual
+users for ``--seconds``. Each virtual user acts as one seeded user and picks
+requests by weight from ``MIX`` (or ``--mix me=5,login=1,...``). The report
+gives throughput and p50/p95/p99 latency per endpoint and overall.
+
+By default the app runs in-process: requests go through httpx's ASGI
+transport on one event loop, with no sockets. ``--processes N`` serves the
+app with uvicorn (``--server-workers`` workers) and drives it from N
+load-generator processes. ``--url`` targets a server that is already
+running; seed its database first with ``--seed-only`` and the same
+``SQLITE_DB_PATH`` and JWT settings, since tokens are minted locally.
+
+``--save-baseline`` stores the results; later runs compare against the
+stored baseline and exit with status 1 when an endpoint's p95 grows, or its
+throughput falls, by more than ``--tolerance``.
+
+    python -m benchmarks.loadtest [--users 200] [--goals 50] [--courses 2000]
+        [--concurrency 32] [--seconds 20] [--processes 0] [--save-baseline]
+    SQLITE_DB_PATH=local.db python -m benchmarks.loadtest --seed-only
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks import percentile
+from benchmarks.bench_course_catalog import CATEGORIES, synthetic_courses
+from app.core.security import create_access_token, get_password_hash
+from app.database.database_adapter import db
+from app.database.seed_courses import seed_courses
+
+PASSWORD = "load-password"
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadtest_baseline.json")
+
+# Relative weight of each action in the default mix
+MIX = {
+    "me": 30,
+    "goals_list": 20,
+    "goal_update": 12,
+    "goal_create": 8,
+    "goal_delete": 5,
+    "courses_catalog": 8,
+    "courses_page": 7,
+    "course_search": 5,
+    "course_get": 3,
+    "login": 2,
+}
+
+Sample = Tuple[str, int, float]
+
+
+def email_for(index: int) -> str:
+    return f"load-{index}@example.com"
+
+
+def user_id_for(index: int) -> str:
+    return f"load-user-{index}"
+
+
+def goal_id_for(user_index: int, goal_index: int) -> str:
+    return f"load-goal-{user_index}-{goal_index}"
+
+
+def seed(users: int, goals: int, courses: int):
+    """Create the synthetic users, goals and courses that are missing"""
+    started = time.perf_counter()
+    password_hash = None
+    created = 0
+    for i in range(users):
+        if db.get_user_by_email(email_for(i)):
+            continue
+        password_hash = password_hash or get_password_hash(PASSWORD)
+        db.create_user(user_id_for(i), email_for(i), f"Load User {i}", password_hash)
+        rows = [
+            (
+                goal_id_for(i, j), user_id_for(i), f"Goal {j}", "Practise daily " * 10, "v1", '["3", "4"]',
+                j % 100, 0, 1, f"2025-01-01 00:00:00.{j:06d}",
+            )
+            for j in range(goals)
+        ]
+        with db.pool.writer() as conn:
+            conn.executemany(
+                """
+                INSERT INTO goals (id, user_id, title, description, virtue_id, sdg_ids,
+                                   progress, completed, target, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        created += 1
+    if db.get_course(f"course-{courses - 1}") is None:
+        seed_courses(synthetic_courses(courses))
+    print(
+        f"seeded {created} new users ({users} total, {goals} goals each) and {courses} courses "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in MIX:
+            raise argparse.ArgumentTypeError(f"unknown action {name!r} (choose from {', '.join(MIX)})")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+class VirtualUser:
+    """One simulated client: a seeded user issuing requests from the mix"""
+
+    def __init__(self, client: httpx.AsyncClient, index: int, goals: int, courses: int, rng: random.Random):
+        self.client = client
+        self.index = index
+        self.courses = courses
+        self.rng = rng
+        self.headers = {
+            "Authorization": "Bearer " + create_access_token({"sub": user_id_for(index), "email": email_for(index)})
+        }
+        self.seeded_goals = [goal_id_for(index, j) for j in range(goals)]
+        self.own_goals: List[str] = []
+        self.catalog_etag: Optional[str] = None
+
+    async def me(self):
+        response = await self.client.get("/api/v1/users/me", headers=self.headers)
+        return "GET /api/v1/users/me", response
+
+    async def goals_list(self):
+        response = await self.client.get("/api/v1/goals/", params={"limit": 50}, headers=self.headers)
+        return "GET /api/v1/goals/", response
+
+    async def goal_create(self):
+        response = await self.client.post("/api/v1/goals/", headers=self.headers, json={
+            "learningStyleId": "v1", "sdgIds": ["3"], "title": "Load goal", "description": "Created under load",
+        })
+        if response.status_code == 200:
+            self.own_goals.append(response.json()["id"])
+        return "POST /api/v1/goals/", response
+
+    async def goal_update(self):
+        targets = self.own_goals or self.seeded_goals
+        if not targets:
+            return await self.goal_create()
+        goal_id = self.rng.choice(targets)
+        response = await self.client.put(
+            f"/api/v1/goals/{goal_id}", headers=self.headers, json={"progress": self.rng.randrange(101)}
+        )
+        return "PUT /api/v1/goals/{goal_id}", response
+
+    async def goal_delete(self):
+        if not self.own_goals:
+            return await self.goal_create()
+        goal_id = self.own_goals.pop(self.rng.randrange(len(self.own_goals)))
+        response = await self.client.delete(f"/api/v1/goals/{goal_id}", headers=self.headers)
+        return "DELETE /api/v1/goals/{goal_id}", response
+
+    async def courses_catalog(self):
+        headers = {"If-None-Match": self.catalog_etag} if self.catalog_etag else {}
+        response = await self.client.get("/api/v1/courses/", headers=headers)
+        self.catalog_etag = response.headers.get("etag", self.catalog_etag)
+        return "GET /api/v1/courses/", response
+
+    async def courses_page(self):
+        response = await self.client.get("/api/v1/courses/", params={"limit": 20})
+        return "GET /api/v1/courses/?limit", response
+
+    async def course_search(self):
+        response = await self.client.get("/api/v1/courses/search", params={"q": self.rng.choice(CATEGORIES)})
+        return "GET /api/v1/courses/search", response
+
+    async def course_get(self):
+        course_id = f"course-{self.rng.randrange(max(1, self.courses))}"
+        response = await self.client.get(f"/api/v1/courses/{course_id}")
+        return "GET /api/v1/courses/{course_id}", response
+
+    async def login(self):
+        response = await self.client.post(
+            "/api/v1/auth/login", json={"email": email_for(self.index), "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return "POST /api/v1/auth/login", response
+
+
+async def drive(client: httpx.AsyncClient, options: dict, first_vu: int, vus: int, seed_value: int) -> List[Sample]:
+    """Run ``vus`` virtual users until the deadline, returning post-warmup samples"""
+    mix = options["mix"]
+    actions, weights = list(mix), list(mix.values())
+    samples: List[Sample] = []
+    measure_from = time.perf_counter() + options["warmup"]
+    deadline = measure_from + options["seconds"]
+
+    async def run_vu(vu: int):
+        rng = random.Random(seed_value * 100003 + vu)
+        user = VirtualUser(client, vu % options["users"], options["goals"], options["courses"], rng)
+        while time.perf_counter() < deadline:
+            action = getattr(user, rng.choices(actions, weights)[0])
+            started = time.perf_counter()
+            try:
+                label, response = await action()
+                status_code = response.status_code
+            except httpx.HTTPError:
+                label, status_code = action.__name__, 0
+            if started >= measure_from:
+                samples.append((label, status_code, time.perf_counter() - started))
+
+    await asyncio.gather(*(run_vu(first_vu + i) for i in range(vus)))
+    return samples
+
+
+async def run_in_process(options: dict) -> List[Sample]:
+    import main
+
+    limits = httpx.Limits(max_connections=None)
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits) as client:
+            return await drive(client, options, 0, options["concurrency"], options["seed"])
+
+
+def run_generator(args: tuple) -> List[Sample]:
+    """Entry point of one load-generator process"""
+    url, options, first_vu, vus = args
+
+    async def run():
+        limits = httpx.Limits(max_connections=vus, max_keepalive_connections=vus)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+            return await drive(client, options, first_vu, vus, options["seed"])
+    return asyncio.run(run())
+
+
+def start_uvicorn(workers: int) -> Tuple[subprocess.Popen, str]:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=backend,
+        env=dict(os.environ),
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            if httpx.get(f"{url}/").status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def run_processes(options: dict, processes: int, url: Optional[str], server_workers: int) -> List[Sample]:
+    server = None
+    if url is None:
+        server, url = start_uvicorn(server_workers)
+    try:
+        share, extra = divmod(options["concurrency"], processes)
+        jobs, first_vu = [], 0
+        for i in range(processes):
+            vus = share + (1 if i < extra else 0)
+            jobs.append((url, dict(options, seed=options["seed"] + i), first_vu, vus))
+            first_vu += vus
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            return [sample for samples in pool.map(run_generator, jobs) for sample in samples]
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def summarize(samples: List[Sample], seconds: float) -> Dict[str, dict]:
+    """Throughput, latency percentiles and status counts per endpoint and overall"""
+    by_endpoint = defaultdict(list)
+    for label, status_code, elapsed in samples:
+        by_endpoint[label].append((status_code, elapsed))
+        by_endpoint["ALL"].append((status_code, elapsed))
+    results = {}
+    for label, entries in sorted(by_endpoint.items()):
+        latencies = [elapsed for _, elapsed in entries]
+        statuses = defaultdict(int)
+        for status_code, _ in entries:
+            statuses[str(status_code)] += 1
+        results[label] = {
+            "requests": len(entries),
+            "rps": round(len(entries) / seconds, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "errors": sum(count for code, count in statuses.items() if code == "0" or int(code) >= 400),
+            "statuses": dict(statuses),
+        }
+    return results
+
+
+def report(results: Dict[str, dict]):
+    print(f"{'endpoint':>34} {'requests':>9} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for label, row in results.items():
+        print(
+            f"{label:>34} {row['requests']:>9} {row['rps']:>8.1f} {row['p50_ms']:>6.1f}ms "
+            f"{row['p95_ms']:>6.1f}ms {row['p99_ms']:>6.1f}ms {row['errors']:>7}"
+        )
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regressions against a baseline: p95 up, or throughput down, by more than ``tolerance``"""
+    regressions = []
+    print(f"\n{'vs baseline':>34} {'p95':>20} {'req/s':>20}")
+    for label, row in results.items():
+        base = baseline.get(label)
+        if base is None:
+            continue
+        p95_change = row["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = row["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        flags = []
+        if p95_change > tolerance and row["p95_ms"] - base["p95_ms"] > min_delta_ms:
+            flags.append("p95")
+        if rps_change < -tolerance:
+            flags.append("req/s")
+        print(
+            f"{label:>34} {base['p95_ms']:>7.1f} -> {row['p95_ms']:>6.1f}ms {p95_change:>+5.0%}"
+            f" {base['rps']:>7.1f} -> {row['rps']:>7.1f} {rps_change:>+5.0%}"
+            + (f"  REGRESSION ({', '.join(flags)})" if flags else "")
+        )
+        if flags:
+            regressions.append(label)
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--goals", type=int, default=50, help="seeded goals per user")
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds excluded from the results")
+    parser.add_argument("--mix", type=parse_mix, default=dict(MIX), help="e.g. me=5,goals_list=3,login=1")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the request sequence")
+    parser.add_argument("--processes", type=int, default=0, help="load-generator processes (0 = in-process)")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers with --processes")
+    parser.add_argument("--url", help="drive an already running server instead")
+    parser.add_argument("--seed-only", action="store_true", help="seed the database and exit")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative change (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 changes smaller than this")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.url is None:
+        seed(args.users, args.goals, args.courses)
+    if args.seed_only:
+        return
+
+    options = {
+        "users": args.users, "goals": args.goals, "courses": args.courses, "concurrency": args.concurrency,
+        "seconds": args.seconds, "warmup": args.warmup, "mix": args.mix, "seed": args.seed,
+    }
+    mode = f"{args.processes} processes" if args.processes or args.url else "in-process"
+    print(f"running {args.concurrency} virtual users for {args.seconds:g}s ({mode})")
+    if args.processes or args.url:
+        samples = run_processes(options, max(1, args.processes), args.url, args.server_workers)
+    else:
+        samples = asyncio.run(run_in_process(options))
+
+    results = summarize(samples, args.seconds)
+    report(results)
+    config = dict(options, mode=mode, processes=args.processes, server_workers=args.server_workers)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"\nsaved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            print("\nwarning: baseline was recorded with different settings:", baseline["config"])
+        regressions = compare(results, baseline["results"], args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint(s) regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,231 @@
+"""
+Microbenchmarks for the adapter, token and JSON hot paths.
+
+Each benchmark times one call repeatedly (calibrated so a round lasts about
+a millisecond) for at least ``--min-time`` seconds and reports per-call
+min/median/mean/stddev and ops/s. Adapter benchmarks run against a scratch
+database holding each of ``--db-sizes`` users (10 goals each); document
+benchmarks run for each preferences document size in ``--doc-kib``.
+
+- adapter: ``create_user``, ``get_user_by_id`` and ``get_user_goals``
+  (cache hit and cold), ``update_user`` (preferences of each size),
+  ``update_goal``
+- security: ``create_access_token``, ``decode_access_token`` (token cache
+  hit and cold)
+- json: ``json``/``orjson`` encode and decode of a preferences document
+
+``--json`` writes the results in pytest-benchmark's layout (``machine_info``,
+``benchmarks[].stats``), so runs can be diffed or fed to the same tooling.
+
+    python -m benchmarks.micro [--db-sizes 1000,100000] [--doc-kib 1,16,64]
+        [--min-time 0.5] [-k update_user] [--json micro.json]
+"""
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List
+
+import orjson
+
+from benchmarks import scratch_db
+from benchmarks.bench_preferences_patch import large_preferences
+from app.core.security import create_access_token, decode_access_token, token_cache
+from app.database.database_adapter import DatabaseAdapter, goals_key, user_key
+
+GOALS_PER_USER = 10
+SAMPLE_USERS = 1000
+ADAPTER_METHODS = ("create_user", "get_user_by_id", "get_user_goals", "update_goal", "update_user")
+
+
+def preferences_of_kib(kib: int) -> dict:
+    courses = 10
+    while len(json.dumps(large_preferences(courses))) < kib * 1024:
+        courses += 10
+    return large_preferences(courses)
+
+
+def measure(fn: Callable[[], object], min_time: float, min_rounds: int = 5) -> Dict[str, float]:
+    """Per-call timing statistics for ``fn``"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= 0.001 or loops >= 1 << 16:
+            break
+        loops *= 2
+
+    rounds: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(rounds) < min_rounds or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        rounds.append((time.perf_counter() - started) / loops)
+
+    mean = statistics.fmean(rounds)
+    return {
+        "min": min(rounds),
+        "max": max(rounds),
+        "mean": mean,
+        "stddev": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+        "median": statistics.median(rounds),
+        "rounds": len(rounds),
+        "iterations": loops,
+        "ops": 1 / mean if mean else 0.0,
+    }
+
+
+def seed_adapter(size: int) -> DatabaseAdapter:
+    """A fresh adapter whose database holds ``size`` users with their goals"""
+    adapter = DatabaseAdapter(db_path=scratch_db(f"micro-{size}.db"))
+    with adapter.pool.writer() as conn:
+        conn.executemany(
+            "INSERT INTO users (id, email, name, password_hash) VALUES (?, ?, ?, ?)",
+            ((f"user-{i}", f"user-{i}@example.com", f"User {i}", "x") for i in range(size)),
+        )
+        conn.executemany(
+            """
+            INSERT INTO goals (id, user_id, title, description, virtue_id, sdg_ids, progress, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (f"goal-{i}-{j}", f"user-{i}", f"Goal {j}", "Practise daily " * 10, "v1", '["3", "4"]',
+                 j * 10, f"2025-01-01 00:00:00.{j:06d}")
+                for i in range(size) for j in range(GOALS_PER_USER)
+            ),
+        )
+    return adapter
+
+
+def adapter_benchmarks(adapter: DatabaseAdapter, size: int, documents: Dict[int, dict]) -> Dict[str, Callable]:
+    """Benchmark name -> call, cycling through up to SAMPLE_USERS existing users"""
+    user_ids = itertools.cycle([f"user-{i}" for i in range(min(size, SAMPLE_USERS))])
+    goal_ids = itertools.cycle([f"goal-{i}-{i % GOALS_PER_USER}" for i in range(min(size, SAMPLE_USERS))])
+    progress = itertools.cycle(range(101))
+    hot_user = "user-0"
+    adapter.get_user_by_id(hot_user)
+    adapter.get_user_goals(hot_user)
+
+    def get_user_cold():
+        user_id = next(user_ids)
+        adapter.cache.delete(user_key(user_id))
+        return adapter.get_user_by_id(user_id)
+
+    def get_goals_cold():
+        user_id = next(user_ids)
+        adapter.cache.delete(goals_key(user_id))
+        return adapter.get_user_goals(user_id)
+
+    benchmarks = {
+        "create_user": lambda: adapter.create_user(str(uuid.uuid4()), f"{uuid.uuid4()}@example.com", "New", "x"),
+        "get_user_by_id[cached]": lambda: adapter.get_user_by_id(hot_user),
+        "get_user_by_id[cold]": get_user_cold,
+        "get_user_goals[cached]": lambda: adapter.get_user_goals(hot_user),
+        "get_user_goals[cold]": get_goals_cold,
+        "update_goal": lambda: adapter.update_goal(next(goal_ids), {"progress": next(progress)}),
+    }
+    for kib, document in documents.items():
+        benchmarks[f"update_user[doc={kib}KiB]"] = (
+            lambda document=document: adapter.update_user(next(user_ids), {"preferences": document})
+        )
+    return benchmarks
+
+
+def security_benchmarks() -> Dict[str, Callable]:
+    token = create_access_token({"sub": "user-0", "email": "user-0@example.com"})
+    decode_access_token(token)
+
+    def decode_cold():
+        token_cache.clear()
+        return decode_access_token(token)
+
+    return {
+        "create_access_token": lambda: create_access_token({"sub": "user-0", "email": "user-0@example.com"}),
+        "decode_access_token[cached]": lambda: decode_access_token(token),
+        "decode_access_token[cold]": decode_cold,
+    }
+
+
+def json_benchmarks(documents: Dict[int, dict]) -> Dict[str, Callable]:
+    benchmarks = {}
+    for kib, document in documents.items():
+        text = json.dumps(document)
+        data = orjson.dumps(document)
+        benchmarks[f"json.dumps[doc={kib}KiB]"] = lambda document=document: json.dumps(document)
+        benchmarks[f"json.loads[doc={kib}KiB]"] = lambda text=text: json.loads(text)
+        benchmarks[f"orjson.dumps[doc={kib}KiB]"] = lambda document=document: orjson.dumps(document)
+        benchmarks[f"orjson.loads[doc={kib}KiB]"] = lambda data=data: orjson.loads(data)
+    return benchmarks
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.2f}us"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db-sizes", default="1000,100000", help="users in the database, comma separated")
+    parser.add_argument("--doc-kib", default="1,16,64", help="preferences document sizes, comma separated")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--json", help="write pytest-benchmark style results to this file")
+    args = parser.parse_args()
+
+    db_sizes = [int(size) for size in args.db_sizes.split(",") if size]
+    documents = {int(kib): preferences_of_kib(int(kib)) for kib in args.doc_kib.split(",") if kib}
+
+    groups = [("security", {}, security_benchmarks()), ("json", {}, json_benchmarks(documents))]
+    for size in db_sizes:
+        if not args.filter or any(args.filter in name or name in args.filter for name in ADAPTER_METHODS):
+            started = time.perf_counter()
+            adapter = seed_adapter(size)
+            print(f"seeded {size} users in {time.perf_counter() - started:.1f}s")
+            groups.append((f"adapter[db={size}]", {"db_size": size}, adapter_benchmarks(adapter, size, documents)))
+
+    results = []
+    print(f"{'benchmark':>44} {'min':>10} {'median':>10} {'mean':>10} {'stddev':>10} {'ops/s':>10}")
+    for group, params, benchmarks in groups:
+        for name, fn in benchmarks.items():
+            if args.filter not in name:
+                continue
+            stats = measure(fn, args.min_time)
+            full_name = f"{group}/{name}"
+            print(
+                f"{full_name:>44} {format_time(stats['min']):>10} {format_time(stats['median']):>10} "
+                f"{format_time(stats['mean']):>10} {format_time(stats['stddev']):>10} {stats['ops']:>10.0f}"
+            )
+            doc_kib = name.partition("[doc=")[2].partition("KiB]")[0]
+            results.append({
+                "group": group,
+                "name": name,
+                "fullname": full_name,
+                "params": dict(params, **({"doc_kib": int(doc_kib)} if doc_kib else {})),
+                "stats": stats,
+            })
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "machine_info": {
+                    "python_version": platform.python_version(),
+                    "python_implementation": platform.python_implementation(),
+                    "machine": platform.machine(),
+                    "system": platform.system(),
+                    "processor": platform.processor(),
+                },
+                "datetime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "benchmarks": results,
+            }, f, indent=2)
+        print(f"wrote {len(results)} results to {args.json}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -2,36 +2,87 @@
 FastAPI Backend for Learning Micro-Academy
 Handles authentication, user profiles, and course data
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
+import logging
 import os
+import secrets
 from dotenv import load_dotenv
 
 try:
-    from app.routers import auth, users, courses, goals
+    from app.routers import auth, users, courses, goals, sync
     from app.database.supabase_client import get_supabase_client
     from app.core.config import settings
+    from app.core.compression import CompressionMiddleware
+    from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, metrics
+    from app.core.profiling import ProfilerMiddleware
 except ImportError:
     # For running from backend directory
     import sys
     import os
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    from app.routers import auth, users, courses, goals
+    from app.routers import auth, users, courses, goals, sync
     from app.database.supabase_client import get_supabase_client
     from app.core.config import settings
+    from app.core.compression import CompressionMiddleware
+    from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, metrics
+    from app.core.profiling import ProfilerMiddleware
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop database background maintenance"""
+    from app.database.database_adapter import db
+    from app.database.async_adapter import async_db
+    from app.core.security import password_hasher
+    from app.database.course_catalog import course_catalog
+    db.startup()
+    course_catalog.start()
+    if settings.METRICS_ENABLED:
+        metrics.start(settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+    yield
+    metrics.stop()
+    course_catalog.stop()
+    await async_db.aclose()
+    db.shutdown()
+    password_hasher.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Learning Micro-Academy API",
     description="Backend API for Learning Micro-Academy platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Per-request profiling (added first so it only measures the app itself)
+if settings.PROFILING_ENABLED:
+    if settings.RAILWAY_ENVIRONMENT == "production":
+        logger.warning("PROFILING_ENABLED is ignored in production")
+    else:
+        app.add_middleware(
+            ProfilerMiddleware,
+            token=settings.PROFILING_TOKEN,
+            directory=settings.PROFILING_DIR,
+        )
+
+# Response compression (wraps inside CORS)
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=tuple(settings.compression_encodings_list),
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
 )
 
 # CORS middleware
@@ -43,11 +94,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics (added last so it is outermost and times everything)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(courses.router, prefix="/api/v1/courses", tags=["Courses"])
 app.include_router(goals.router, prefix="/api/v1/goals", tags=["Goals"])
+app.include_router(sync.router, prefix="/api/v1/sync", tags=["Sync"])
 
 @app.get("/")
 async def root():
@@ -63,15 +119,27 @@ async def health_check():
     """Detailed health check"""
     try:
         from app.database.database_adapter import db
+        from app.core.security import password_hasher, token_cache
+        from app.database.course_catalog import course_catalog
+        from app.database.slow_queries import slow_query_log
         # Test database connection
         if db.use_sqlite:
             # Test SQLite connection
-            if db.conn:
-                db.conn.execute("SELECT 1")
+            with db.get_connection().reader() as conn:
+                conn.execute("SELECT 1")
             return {
                 "status": "healthy",
                 "database": "sqlite",
-                "service": "Learning Micro-Academy API"
+                "service": "Learning Micro-Academy API",
+                "pool": db.pool_stats(),
+                "wal": db.checkpointer.stats() if db.checkpointer else None,
+                "password_hashing": password_hasher.stats(),
+                "cache": db.cache.stats(),
+                "course_catalog": course_catalog.stats(),
+                "token_cache": token_cache.stats(),
+                "slow_queries": slow_query_log.stats(),
+                "progress_buffer": db.progress_buffer.stats(),
+                "change_log": db.change_log_pruner.stats()
             }
         else:
             # Test Supabase connection
@@ -87,6 +155,21 @@ async def health_check():
             "error": str(e)
         }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint(request: Request):
+    """Prometheus metrics, aggregated across workers"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Response(content=metrics.exposition(), media_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -144,11 +144,33 @@ class ApiService {
     });
   }
 
+  // Sync
+  async sync(since?: string) {
+    return this.request(
+      since ? `/sync?since=${encodeURIComponent(since)}` : "/sync"
+    );
+  }
+
   // Courses
   async getCourses() {
     return this.request("/courses");
   }
 
+  async searchCourses(params: {
+    q?: string;
+    category?: string;
+    level?: string;
+    tag?: string;
+    limit?: number;
+    after?: string;
+  }) {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== "") query.set(key, String(value));
+    });
+    return this.request(`/courses/search?${query.toString()}`);
+  }
+
   async getCourse(courseId: string) {
     return this.request(`/courses/${courseId}`);
   }
@@ -66,8 +66,24 @@ CREATE TABLE IF NOT EXISTS user_course_progress (
     UNIQUE(user_id, course_id)
 );
 
+-- Learning goals
+CREATE TABLE IF NOT EXISTS goals (
+    id TEXT PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    virtue_id TEXT,
+    sdg_ids JSONB DEFAULT '[]'::jsonb,
+    progress INTEGER DEFAULT 0,
+    completed BOOLEAN DEFAULT FALSE,
+    target INTEGER DEFAULT 1,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+CREATE INDEX IF NOT EXISTS idx_goals_user_created ON goals(user_id, created_at, id);
 CREATE INDEX IF NOT EXISTS idx_user_course_progress_user_id ON user_course_progress(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_course_progress_course_id ON user_course_progress(course_id);
 
@@ -90,9 +106,152 @@ CREATE TRIGGER update_courses_updated_at BEFORE UPDATE ON courses
 CREATE TRIGGER update_user_course_progress_updated_at BEFORE UPDATE ON user_course_progress
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_goals_updated_at BEFORE UPDATE ON goals
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- RFC 7396 JSON merge patch: objects merge recursively, null removes a key
+CREATE OR REPLACE FUNCTION jsonb_merge_patch(target JSONB, patch JSONB)
+RETURNS JSONB AS $$
+BEGIN
+    IF jsonb_typeof(patch) <> 'object' THEN
+        RETURN patch;
+    END IF;
+    IF target IS NULL OR jsonb_typeof(target) <> 'object' THEN
+        target := '{}'::jsonb;
+    END IF;
+    RETURN (
+        SELECT COALESCE(jsonb_object_agg(key, value), '{}'::jsonb)
+        FROM (
+            SELECT key, value FROM jsonb_each(target)
+            WHERE NOT patch ? key
+            UNION ALL
+            SELECT key, jsonb_merge_patch(target -> key, value) FROM jsonb_each(patch)
+            WHERE jsonb_typeof(value) <> 'null'
+        ) merged
+    );
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Apply a merge patch to a user's preferences in one atomic UPDATE
+CREATE OR REPLACE FUNCTION patch_user_preferences(p_user_id UUID, p_patch JSONB)
+RETURNS JSONB AS $$
+    UPDATE users
+    SET preferences = jsonb_merge_patch(preferences, p_patch)
+    WHERE id = p_user_id
+    RETURNING preferences;
+$$ LANGUAGE sql;
+
+-- Catalog version stamp: bumped by every course write so API workers can tell their snapshot is stale
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO catalog_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_catalog_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER bump_catalog_version AFTER INSERT OR UPDATE OR DELETE ON courses
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+-- PUT /users/me: replace top-level preference keys and other profile fields in one UPDATE
+CREATE OR REPLACE FUNCTION update_user_profile(p_user_id UUID, p_updates JSONB, p_preference_keys JSONB)
+RETURNS SETOF users AS $$
+    UPDATE users
+    SET name = COALESCE(p_updates ->> 'name', name),
+        goals = COALESCE(p_updates -> 'goals', goals),
+        progress = COALESCE(p_updates -> 'progress', progress),
+        preferences = COALESCE(preferences, '{}'::jsonb) || COALESCE(p_preference_keys, '{}'::jsonb)
+    WHERE id = p_user_id
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- Change log for delta sync (GET /api/v1/sync): one row per user/goal change
+CREATE TABLE IF NOT EXISTS change_log (
+    seq BIGSERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    op TEXT NOT NULL,
+    fields JSONB,
+    changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_user_seq ON change_log(user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON change_log(changed_at);
+
+-- Highest pruned seq per user: a sync cursor below it gets a full resync
+CREATE TABLE IF NOT EXISTS change_log_pruned (
+    user_id TEXT PRIMARY KEY,
+    seq BIGINT NOT NULL
+);
+
+-- Delete change log rows older than the retention, returning the count
+CREATE OR REPLACE FUNCTION prune_change_log(p_retention_days DOUBLE PRECISION)
+RETURNS BIGINT AS $$
+DECLARE
+    cutoff TIMESTAMP WITH TIME ZONE := NOW() - make_interval(secs => p_retention_days * 86400);
+    pruned BIGINT;
+BEGIN
+    INSERT INTO change_log_pruned (user_id, seq)
+    SELECT user_id, MAX(seq) FROM change_log WHERE changed_at < cutoff GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET seq = GREATEST(change_log_pruned.seq, EXCLUDED.seq);
+    DELETE FROM change_log WHERE changed_at < cutoff;
+    GET DIAGNOSTICS pruned = ROW_COUNT;
+    RETURN pruned;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION log_user_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed JSONB := '[]'::jsonb;
+BEGIN
+    IF NEW.name IS DISTINCT FROM OLD.name THEN changed := changed || '"name"'; END IF;
+    IF NEW.email IS DISTINCT FROM OLD.email THEN changed := changed || '"email"'; END IF;
+    IF NEW.preferences IS DISTINCT FROM OLD.preferences THEN changed := changed || '"preferences"'; END IF;
+    IF NEW.goals IS DISTINCT FROM OLD.goals THEN changed := changed || '"goals"'; END IF;
+    IF NEW.progress IS DISTINCT FROM OLD.progress THEN changed := changed || '"progress"'; END IF;
+    IF jsonb_array_length(changed) > 0 THEN
+        INSERT INTO change_log (user_id, entity, entity_id, op, fields)
+        VALUES (NEW.id::text, 'user', NEW.id::text, 'upsert', changed);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION log_goal_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO change_log (user_id, entity, entity_id, op)
+        VALUES (OLD.user_id::text, 'goal', OLD.id::text, 'delete');
+        RETURN OLD;
+    END IF;
+    INSERT INTO change_log (user_id, entity, entity_id, op)
+    VALUES (NEW.user_id::text, 'goal', NEW.id::text, 'upsert');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER log_users_change AFTER UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION log_user_change();
+
+CREATE TRIGGER log_goals_change AFTER INSERT OR UPDATE OR DELETE ON goals
+    FOR EACH ROW EXECUTE FUNCTION log_goal_change();
+
 -- Row Level Security (RLS) Policies
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_course_progress ENABLE ROW LEVEL SECURITY;
+ALTER TABLE goals ENABLE ROW LEVEL SECURITY;
+ALTER TABLE change_log ENABLE ROW LEVEL SECURITY;
+ALTER TABLE change_log_pruned ENABLE ROW LEVEL SECURITY;
 
 -- Users can only see and update their own data
 CREATE POLICY "Users can view own profile" ON users
@@ -111,9 +270,34 @@ CREATE POLICY "Users can insert own progress" ON user_course_progress
 CREATE POLICY "Users can update own progress" ON user_course_progress
     FOR UPDATE USING (auth.uid() = user_id);
 
+-- Goal policies
+CREATE POLICY "Users can view own goals" ON goals
+    FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own goals" ON goals
+    FOR INSERT WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own goals" ON goals
+    FOR UPDATE USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own goals" ON goals
+    FOR DELETE USING (auth.uid() = user_id);
+
+-- Change log rows are written only by the triggers above
+CREATE POLICY "Users can view own changes" ON change_log
+    FOR SELECT USING (auth.uid()::text = user_id);
+
+CREATE POLICY "Users can view own pruned changes" ON change_log_pruned
+    FOR SELECT USING (auth.uid()::text = user_id);
+
 -- Courses are publicly readable
 ALTER TABLE courses ENABLE ROW LEVEL SECURITY;
 
 CREATE POLICY "Courses are publicly readable" ON courses
     FOR SELECT USING (true);
 
+ALTER TABLE catalog_version ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Catalog version is publicly readable" ON catalog_version
+    FOR SELECT USING (true);
+